@@ -1,11 +1,23 @@
 from abc import ABC, abstractmethod
+from contextvars import ContextVar
 from app.models.agent_config import AgentConfig
 from app.models.agent_communication import AgentRequest, AgentResponse
 
+# Shared analyses the orchestrator already ran for the request being processed;
+# one still empty on the AgentRequest failed or timed out upstream
+attempted_analyses: ContextVar[frozenset[str]] = ContextVar("attempted_analyses", default=frozenset())
+
 class BaseAgent(ABC):
+    # Shared analyses (AgentRequest fields) the orchestrator should fill in first
+    requires: tuple[str, ...] = ()
+
     def __init__(self, config: AgentConfig):
         self.config = config
 
+    def needs_analysis(self, request: AgentRequest, name: str) -> bool:
+        """Whether the agent should compute a shared analysis itself."""
+        return getattr(request, name) is None and name not in attempted_analyses.get()
+
     @abstractmethod
     async def process_request(self, request: AgentRequest) -> AgentResponse:
         pass
\ No newline at end of file
@@ -1,16 +1,114 @@
+import asyncio
+from typing import Any
 from .base_agent import BaseAgent
+from app.config import get_settings, AgentTypeAnalysis
 from app.models.agent_communication import AgentRequest, AgentResponse
-from app.services.sentiment_analysis import analyze_sentiment
+from app.models.base import AgentType
+from app.services.sentiment_analysis import SentimentAnalysis, analyze_sentiment
 from app.services.agent_type_analysis import analyze_agent_types
+from app.services.combined_analysis import CombinedAnalysis, analyze_combined
 from app.models.agent_config import AgentConfig
 from app.models.user_input import UserInput
 
+settings = get_settings()
+
 class CaddieAgent(BaseAgent):
+    requires = ("sentiment_analysis", "agent_type_analysis")
+
     def __init__(self, config: AgentConfig):
         super().__init__(config)
 
+    async def run_sentiment_analysis(self, text: str) -> SentimentAnalysis:
+        return await analyze_sentiment(text)
+
+    async def run_agent_type_analysis(self, user_input: UserInput) -> AgentTypeAnalysis:
+        return await analyze_agent_types(user_input)
+
+    async def run_combined_analysis(self, user_input: UserInput) -> CombinedAnalysis:
+        return await analyze_combined(user_input)
+
     async def process_request(self, request: AgentRequest) -> list[AgentResponse]:
-        sentiment_result = await self.run_sentiment_analysis(request.user_input.content)
-        agent_type_result = await self.run_agent_type_analysis(request.user_input)
+        # The analyses are independent, so start both at once. Each has its own
+        # timeout and the request has an overall deadline; a missed deadline
+        # yields a partial response instead of failing the request.
+        # Analyses the orchestrator already ran are reused, and not retried if
+        # they failed: that would double the load on a struggling provider.
+        need_sentiment = self.needs_analysis(request, "sentiment_analysis")
+        need_agent_types = self.needs_analysis(request, "agent_type_analysis")
+        tasks = {}
+        if settings.USE_COMBINED_ANALYSIS and need_sentiment and need_agent_types:
+            # One call answers both analyses
+            tasks["combined_analysis"] = asyncio.create_task(asyncio.wait_for(
+                self.run_combined_analysis(request.user_input),
+                settings.CADDIE_AGENT_TYPE_TIMEOUT,
+            ))
+        elif need_sentiment:
+            tasks["sentiment_analysis"] = asyncio.create_task(asyncio.wait_for(
+                self.run_sentiment_analysis(request.user_input.content),
+                settings.CADDIE_SENTIMENT_TIMEOUT,
+            ))
+        if need_agent_types and "combined_analysis" not in tasks:
+            tasks["agent_type_analysis"] = asyncio.create_task(asyncio.wait_for(
+                self.run_agent_type_analysis(request.user_input),
+                settings.CADDIE_AGENT_TYPE_TIMEOUT,
+            ))
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.CADDIE_REQUEST_DEADLINE
+        pending = set(tasks.values())
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0, deadline - loop.time()), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                # Retrieve every finished task's outcome before raising any of them
+                errors = [task.exception() for task in done]
+                for error in errors:
+                    if error is not None and not isinstance(error, asyncio.TimeoutError):
+                        raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        results: dict[str, Any] = {
+            "sentiment_analysis": request.sentiment_analysis,
+            "agent_type_analysis": request.agent_type_analysis,
+        }
+        # Attempted upstream but not delivered
+        timed_out = [
+            name for name in self.requires
+            if getattr(request, name) is None and not self.needs_analysis(request, name)
+        ]
+        for name, task in tasks.items():
+            if task in pending or task.exception() is not None:
+                timed_out.extend(("sentiment_analysis", "agent_type_analysis") if name == "combined_analysis" else (name,))
+            elif name == "combined_analysis":
+                results["sentiment_analysis"] = task.result().sentiment
+                results["agent_type_analysis"] = task.result().agent_types
+            else:
+                results[name] = task.result()
+
+        sentiment_result = results.get("sentiment_analysis")
+        agent_type_result = results.get("agent_type_analysis")
+        return [AgentResponse(
+            agent_type=self.config.agent_type,
+            result=self._summarize(sentiment_result, agent_type_result),
+            metadata={
+                "sentiment_analysis": sentiment_result.model_dump(mode="json") if sentiment_result else None,
+                "agent_type_analysis": agent_type_result.model_dump(mode="json") if agent_type_result else None,
+                "partial": bool(timed_out),
+                "timed_out": timed_out,
+            },
+        )]
 
-        return [AgentResponse(...)]  # Return list of AgentResponse objects
\ No newline at end of file
+    def _summarize(self, sentiment_result: SentimentAnalysis | None, agent_type_result: AgentTypeAnalysis | None) -> str:
+        parts = []
+        if sentiment_result is not None:
+            parts.append(f"Sentiment: {sentiment_result.sentiment} ({sentiment_result.confidence:.2f}).")
+        if agent_type_result is not None:
+            best = max(AgentType, key=lambda agent_type: getattr(agent_type_result, agent_type.value.lower()).confidence)
+            relevance = getattr(agent_type_result, best.value.lower())
+            parts.append(f"Best suited agent: {best.value} ({relevance.confidence:.2f}).")
+        return " ".join(parts) or "Analysis did not complete in time."
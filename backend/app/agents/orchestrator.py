@@ -0,0 +1,370 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from contextlib import aclosing
+from dataclasses import dataclass
+from graphlib import TopologicalSorter
+from typing import Any
+
+from app.agents.base_agent import BaseAgent, attempted_analyses
+from app.config import AgentTypeAnalysis, get_settings
+from app.core.tracing import tracer
+from app.models.agent_communication import AgentRequest, AgentResponse
+from app.models.base import AgentType
+from app.services.agent_type_analysis import analyze_agent_types
+from app.services.combined_analysis import analyze_combined
+from app.services.governor import LLMOverloadedError
+from app.services.sentiment_analysis import analyze_sentiment
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+NodeFn = Callable[[AgentRequest, dict[str, Any]], Awaitable[Any]]
+
+
+@dataclass(frozen=True)
+class Node:
+    name: str
+    run: NodeFn
+    depends_on: tuple[str, ...] = ()
+    timeout: float | None = None
+
+
+@dataclass
+class NodeOutcome:
+    result: Any = None
+    error: BaseException | None = None
+
+    @property
+    def timed_out(self) -> bool:
+        return isinstance(self.error, asyncio.TimeoutError)
+
+
+async def _run_sentiment_node(request: AgentRequest, _inputs: dict[str, Any]) -> Any:
+    return await analyze_sentiment(request.user_input.content)
+
+
+async def _run_agent_type_node(request: AgentRequest, _inputs: dict[str, Any]) -> Any:
+    return await analyze_agent_types(request.user_input)
+
+
+async def _run_combined_node(request: AgentRequest, _inputs: dict[str, Any]) -> Any:
+    return await analyze_combined(request.user_input)
+
+
+# Analyses shared between agents, keyed by the AgentRequest field they fill
+SHARED_ANALYSES: dict[str, NodeFn] = {
+    "sentiment_analysis": _run_sentiment_node,
+    "agent_type_analysis": _run_agent_type_node,
+    "combined_analysis": _run_combined_node,
+}
+# Fields the combined analysis fills from a single call
+COMBINED_FIELDS = ("sentiment_analysis", "agent_type_analysis")
+
+
+_node_slots: asyncio.Semaphore | None = None
+
+
+def get_node_slots() -> asyncio.Semaphore:
+    """The process-wide semaphore capping orchestrator nodes across requests."""
+    global _node_slots
+    if _node_slots is None:
+        _node_slots = asyncio.Semaphore(settings.ORCHESTRATOR_MAX_CONCURRENCY)
+    return _node_slots
+
+
+class AgentOrchestrator:
+    """
+    Runs a request as a dependency graph.
+
+    Shared analyses that any selected agent `requires` run once, up front and
+    concurrently. Each agent starts as soon as its own dependencies finish and
+    receives their results on its AgentRequest. Every node has a timeout, and
+    `node_slots` caps how many nodes run at once; orchestrators built with
+    `from_settings` share one process-wide semaphore, so the cap holds across
+    concurrent requests rather than per request. A failed or timed-out analysis
+    leaves its field empty rather than failing the agents that depend on it,
+    and the agents answer without it instead of running it again.
+    """
+
+    def __init__(
+        self,
+        agents: dict[AgentType, BaseAgent],
+        *,
+        max_concurrency: int = 8,
+        analysis_timeout: float | None = 10.0,
+        agent_timeout: float | None = 15.0,
+        combined_analysis: bool = False,
+        node_slots: asyncio.Semaphore | None = None,
+    ) -> None:
+        self.agents = agents
+        self.combined_analysis = combined_analysis
+        self.max_concurrency = max_concurrency
+        self.node_slots = node_slots or asyncio.Semaphore(max_concurrency)
+        self.analysis_timeout = analysis_timeout
+        self.agent_timeout = agent_timeout
+
+    @classmethod
+    def from_settings(cls, agents: dict[AgentType, BaseAgent]) -> "AgentOrchestrator":
+        return cls(
+            agents,
+            max_concurrency=settings.ORCHESTRATOR_MAX_CONCURRENCY,
+            analysis_timeout=settings.ORCHESTRATOR_ANALYSIS_TIMEOUT,
+            agent_timeout=settings.ORCHESTRATOR_AGENT_TIMEOUT,
+            combined_analysis=settings.USE_COMBINED_ANALYSIS,
+            node_slots=get_node_slots(),
+        )
+
+    def build_graph(
+        self, agent_types: Sequence[AgentType], request: AgentRequest
+    ) -> dict[str, Node]:
+        nodes: dict[str, Node] = {}
+        for agent_type in agent_types:
+            agent = self.agents[agent_type]
+            # Analyses already on the request are not recomputed
+            missing = tuple(
+                name for name in agent.requires if getattr(request, name) is None
+            )
+            if self.combined_analysis and set(COMBINED_FIELDS) <= set(missing):
+                missing = (
+                    *(name for name in missing if name not in COMBINED_FIELDS),
+                    "combined_analysis",
+                )
+            for name in missing:
+                nodes.setdefault(
+                    name,
+                    Node(name, SHARED_ANALYSES[name], timeout=self.analysis_timeout),
+                )
+            nodes[agent_type.value] = Node(
+                agent_type.value,
+                self._agent_node(agent, missing),
+                depends_on=missing,
+                timeout=self.agent_timeout,
+            )
+        return nodes
+
+    def _agent_node(self, agent: BaseAgent, analyses: tuple[str, ...]) -> NodeFn:
+        attempted = frozenset(
+            field
+            for name in analyses
+            for field in (COMBINED_FIELDS if name == "combined_analysis" else (name,))
+        )
+
+        async def run(request: AgentRequest, inputs: dict[str, Any]) -> Any:
+            combined = inputs.pop("combined_analysis", None)
+            if combined is not None:
+                inputs.update(
+                    sentiment_analysis=combined.sentiment,
+                    agent_type_analysis=combined.agent_types,
+                )
+            agent_request = request.model_copy(
+                update={"agent_config": agent.config, **inputs}
+            )
+            # Analyses that failed here stay empty; the agent must not redo them
+            token = attempted_analyses.set(attempted)
+            try:
+                with tracer.start_as_current_span(
+                    "agent.process_request",
+                    attributes={"agent.type": agent.config.agent_type.value},
+                ):
+                    return await agent.process_request(agent_request)
+            finally:
+                attempted_analyses.reset(token)
+
+        return run
+
+    async def iter_graph(
+        self, nodes: dict[str, Node], request: AgentRequest
+    ) -> AsyncIterator[tuple[str, NodeOutcome]]:
+        """
+        Yield each node's outcome as soon as it finishes. Closing the iterator
+        early cancels every node still running and waits for them to unwind.
+
+        An agent node failing with LLMOverloadedError (a full provider queue or
+        an open circuit) is raised instead, cancelling the rest, so the caller
+        can shed the request with a 503 rather than answer with empty results.
+        A shared analysis failing the same way degrades like any other failed
+        analysis, and the agents that depend on it answer without it.
+        """
+        order = TopologicalSorter(
+            {name: node.depends_on for name, node in nodes.items()}
+        ).static_order()
+        tasks: dict[str, asyncio.Task[Any]] = {}
+
+        async def run_node(node: Node) -> Any:
+            dependencies = [tasks[name] for name in node.depends_on]
+            if dependencies:
+                await asyncio.wait(dependencies)
+            inputs = {
+                name: task.result()
+                for name, task in zip(node.depends_on, dependencies, strict=True)
+                if not task.cancelled() and task.exception() is None
+            }
+            async with self.node_slots:
+                with tracer.start_as_current_span(
+                    "orchestrator.node", attributes={"orchestrator.node": node.name}
+                ):
+                    return await asyncio.wait_for(
+                        node.run(request, inputs), node.timeout
+                    )
+
+        for name in order:
+            tasks[name] = asyncio.create_task(run_node(nodes[name]))
+        names = {task: name for name, task in tasks.items()}
+        pending = set(tasks.values())
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                outcomes: dict[str, NodeOutcome] = {}
+                for task in done:
+                    error = task.exception()
+                    outcomes[names[task]] = (
+                        NodeOutcome(error=error)
+                        if error is not None
+                        else NodeOutcome(result=task.result())
+                    )
+                for name, outcome in outcomes.items():
+                    if name not in SHARED_ANALYSES and isinstance(
+                        outcome.error, LLMOverloadedError
+                    ):
+                        raise outcome.error
+                for name, outcome in outcomes.items():
+                    if outcome.error is not None:
+                        logger.warning(
+                            f"Orchestrator node {name} failed: {outcome.error!r}"
+                        )
+                    yield name, outcome
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    async def run_graph(
+        self, nodes: dict[str, Node], request: AgentRequest
+    ) -> dict[str, NodeOutcome]:
+        return {
+            name: outcome async for name, outcome in self.iter_graph(nodes, request)
+        }
+
+    @staticmethod
+    def _responses(agent_type: AgentType, outcome: NodeOutcome) -> list[AgentResponse]:
+        if outcome.error is not None:
+            return [
+                AgentResponse(
+                    agent_type=agent_type,
+                    result="",
+                    metadata={
+                        "error": str(outcome.error) or type(outcome.error).__name__,
+                        "timed_out": outcome.timed_out,
+                    },
+                )
+            ]
+        if isinstance(outcome.result, list):
+            return outcome.result
+        return [outcome.result]
+
+    async def run(
+        self, request: AgentRequest, agent_types: Sequence[AgentType] | None = None
+    ) -> list[AgentResponse]:
+        if agent_types is None:
+            agent_types = list(self.agents)
+        outcomes = await self.run_graph(self.build_graph(agent_types, request), request)
+        return [
+            response
+            for agent_type in agent_types
+            for response in self._responses(agent_type, outcomes[agent_type.value])
+        ]
+
+    async def stream(
+        self, request: AgentRequest, agent_types: Sequence[AgentType] | None = None
+    ) -> AsyncIterator[AgentResponse]:
+        """Like `run`, but yields each agent's responses the moment they are ready."""
+        if agent_types is None:
+            agent_types = list(self.agents)
+        by_name = {agent_type.value: agent_type for agent_type in agent_types}
+        outcomes = self.iter_graph(self.build_graph(agent_types, request), request)
+        async with aclosing(outcomes):
+            async for name, outcome in outcomes:
+                if name in by_name:
+                    for response in self._responses(by_name[name], outcome):
+                        yield response
+
+    def select_agents(
+        self, analysis: AgentTypeAnalysis, *, threshold: float, top_k: int
+    ) -> list[tuple[AgentType, float]]:
+        """
+        Registered agents whose relevance reaches `threshold`, most relevant
+        first, at most `top_k`. Falls back to the single most relevant agent
+        so a request is never left unanswered.
+        """
+        ranked = sorted(
+            (
+                (agent_type, getattr(analysis, agent_type.value.lower()).confidence)
+                for agent_type in self.agents
+            ),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        selected = [item for item in ranked if item[1] >= threshold][:top_k]
+        return selected or ranked[:1]
+
+    async def plan_dispatch(
+        self, request: AgentRequest, *, threshold: float, top_k: int
+    ) -> tuple[AgentRequest, list[tuple[AgentType, float]]]:
+        """
+        Make sure the request carries an agent-type analysis and pick the agents
+        it finds relevant.
+        """
+        if request.agent_type_analysis is None and self.combined_analysis:
+            combined = await asyncio.wait_for(
+                analyze_combined(request.user_input), self.analysis_timeout
+            )
+            request = request.model_copy(
+                update={
+                    "sentiment_analysis": request.sentiment_analysis
+                    or combined.sentiment,
+                    "agent_type_analysis": combined.agent_types,
+                }
+            )
+        elif request.agent_type_analysis is None:
+            analysis = await asyncio.wait_for(
+                analyze_agent_types(request.user_input), self.analysis_timeout
+            )
+            request = request.model_copy(update={"agent_type_analysis": analysis})
+        selected = self.select_agents(
+            request.agent_type_analysis, threshold=threshold, top_k=top_k
+        )
+        return request, selected
+
+    async def dispatch(
+        self,
+        request: AgentRequest,
+        *,
+        threshold: float,
+        top_k: int,
+    ) -> list[AgentResponse]:
+        """
+        Run only the agents the agent-type analysis finds relevant, concurrently,
+        and return their responses ordered by that relevance.
+        """
+        request, selected = await self.plan_dispatch(
+            request, threshold=threshold, top_k=top_k
+        )
+        relevance = dict(selected)
+        responses = await self.run(request, [agent_type for agent_type, _ in selected])
+        for response in responses:
+            with_relevance(response, relevance)
+        return responses
+
+
+def with_relevance(
+    response: AgentResponse, relevance: dict[AgentType, float]
+) -> AgentResponse:
+    response.metadata = {
+        **(response.metadata or {}),
+        "relevance": relevance.get(response.agent_type),
+    }
+    return response
@@ -0,0 +1,145 @@
+import asyncio
+import threading
+from dataclasses import dataclass
+
+from app.agents.base_agent import BaseAgent
+from app.agents.caddie_agent import CaddieAgent
+from app.agents.coach_agent import CoachAgent
+from app.agents.skill_agent import SkillAgent
+from app.config import Settings, get_settings
+from app.models.agent_config import AgentConfig
+from app.models.base import AgentType
+from app.services.llm_clients import (
+    LLMClientRegistry,
+    LLMProvider,
+    replace_client_registry,
+)
+
+AGENT_CLASSES: dict[AgentType, type[BaseAgent]] = {
+    AgentType.CADDIE: CaddieAgent,
+    AgentType.COACH: CoachAgent,
+    AgentType.SKILL: SkillAgent,
+}
+
+
+@dataclass(frozen=True)
+class AgentSettingsSnapshot:
+    """The settings agents and their provider clients are built from, resolved once."""
+
+    openai_api_key: str | None
+    groq_api_key: str | None
+    user_context: str = "Golf assistant"
+    openai_base_url: str | None = None
+    groq_base_url: str | None = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "AgentSettingsSnapshot":
+        return cls(
+            openai_api_key=settings.OPENAI_API_KEY,
+            groq_api_key=settings.GROQ_API_KEY,
+            openai_base_url=settings.OPENAI_BASE_URL,
+            groq_base_url=settings.GROQ_BASE_URL,
+        )
+
+    def client_registry(self) -> LLMClientRegistry:
+        return LLMClientRegistry.from_settings(
+            api_keys={
+                LLMProvider.GROQ: self.groq_api_key,
+                LLMProvider.OPENAI: self.openai_api_key,
+            },
+            base_urls={
+                LLMProvider.GROQ: self.groq_base_url,
+                LLMProvider.OPENAI: self.openai_base_url,
+            },
+        )
+
+
+class AgentRegistry:
+    """
+    One agent instance per implemented AgentType, shared by all requests.
+
+    `reload` builds a complete new set and swaps it in at once, so requests
+    already holding the old agents finish with them undisturbed. It also swaps
+    the provider clients, so new API keys and base URLs take effect for every
+    LLM call; rate limits, timeouts and the other settings services read at
+    import still need a restart.
+    """
+
+    def __init__(self, snapshot: AgentSettingsSnapshot) -> None:
+        self._lock = threading.Lock()
+        self.version = 0
+        self._install(snapshot)
+
+    @classmethod
+    def from_settings(cls, settings: Settings | None = None) -> "AgentRegistry":
+        return cls(AgentSettingsSnapshot.from_settings(settings or get_settings()))
+
+    @staticmethod
+    def build(snapshot: AgentSettingsSnapshot) -> dict[AgentType, BaseAgent]:
+        return {
+            agent_type: agent_class(
+                AgentConfig(
+                    agent_type=agent_type,
+                    user_context=snapshot.user_context,
+                    openai_api_key=snapshot.openai_api_key,
+                    groq_api_key=snapshot.groq_api_key,
+                )
+            )
+            for agent_type, agent_class in AGENT_CLASSES.items()
+        }
+
+    def _install(self, snapshot: AgentSettingsSnapshot) -> None:
+        agents = self.build(snapshot)
+        with self._lock:
+            self.snapshot = snapshot
+            self._agents = agents
+            self.version += 1
+
+    @property
+    def agents(self) -> dict[AgentType, BaseAgent]:
+        return self._agents
+
+    def get(self, agent_type: AgentType) -> BaseAgent:
+        return self._agents[agent_type]
+
+    def reload(
+        self, snapshot: AgentSettingsSnapshot | None = None
+    ) -> LLMClientRegistry | None:
+        """
+        Rebuild every agent and the provider clients, re-reading settings from
+        the environment by default. Returns the previous client registry, for
+        the caller to close once calls in flight on it are done.
+        """
+        snapshot = snapshot or AgentSettingsSnapshot.from_settings(Settings())
+        self._install(snapshot)
+        return replace_client_registry(snapshot.client_registry())
+
+
+_registry: AgentRegistry | None = None
+# Retired client registries waiting for their in-flight calls
+_closing: set[asyncio.Task[None]] = set()
+
+
+def get_agent_registry() -> AgentRegistry:
+    global _registry
+    if _registry is None:
+        _registry = AgentRegistry.from_settings()
+    return _registry
+
+
+async def _close_after(clients: LLMClientRegistry, delay: float) -> None:
+    await asyncio.sleep(delay)
+    await clients.aclose()
+
+
+async def reload_agent_registry(
+    snapshot: AgentSettingsSnapshot | None = None,
+) -> AgentRegistry:
+    registry = get_agent_registry()
+    previous = registry.reload(snapshot)
+    if previous is not None:
+        # No call on the old clients outlives the provider timeout
+        task = asyncio.create_task(_close_after(previous, get_settings().LLM_TIMEOUT))
+        _closing.add(task)
+        task.add_done_callback(_closing.discard)
+    return registry
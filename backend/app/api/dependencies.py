@@ -1,9 +1,6 @@
 from fastapi import Depends, HTTPException, status
-from app.config import get_settings, Settings
-from app.agents.caddie_agent import CaddieAgent
-from app.agents.coach_agent import CoachAgent
-from app.agents.skill_agent import SkillAgent
-from app.models.agent_config import AgentConfig
+from app.agents.orchestrator import AgentOrchestrator
+from app.agents.registry import AgentRegistry, get_agent_registry
 from app.models.user_input import UserInput
 from app.models.base import AgentType
 
@@ -21,6 +18,8 @@ from sqlmodel import Session
 from app.core import security
 from app.core.config import settings
 from app.core.db import engine
+from app.core.metrics import db_pool_checkout_wait
+from app.core.tracing import traced_dependency, tracer
 from app.models import TokenPayload, User
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -30,6 +29,9 @@ reusable_oauth2 = OAuth2PasswordBearer(
 
 def get_db() -> Generator[Session, None, None]:
     with Session(engine) as session:
+        # Check the connection out up front so the wait for the pool is measured
+        with db_pool_checkout_wait.time(), tracer.start_as_current_span("db.checkout"):
+            session.connection()
         yield session
 
 
@@ -37,6 +39,7 @@ SessionDep = Annotated[Session, Depends(get_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
+@traced_dependency
 def get_current_user(session: SessionDep, token: TokenDep) -> User:
     try:
         payload = jwt.decode(
@@ -59,6 +62,7 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
+@traced_dependency
 def get_current_active_superuser(current_user: CurrentUser) -> User:
     if not current_user.is_superuser:
         raise HTTPException(
@@ -66,22 +70,22 @@ def get_current_active_superuser(current_user: CurrentUser) -> User:
         )
     return current_user
 
-async def get_agent(agent_type: AgentType, settings: Settings = Depends(get_settings)):
-    agent_config = AgentConfig(
-        agent_type=agent_type,
-        openai_api_key=settings.OPENAI_API_KEY,
-        groq_api_key=settings.GROQ_API_KEY,
-        user_context="Golf assistant"
-    )
-    if agent_type == AgentType.CADDIE:
-        return CaddieAgent(config=agent_config)
-    elif agent_type == AgentType.COACH:
-        return CoachAgent(config=agent_config)
-    elif agent_type == AgentType.SKILL:
-        return SkillAgent(config=agent_config)
-    else:
+@traced_dependency
+def get_registry() -> AgentRegistry:
+    return get_agent_registry()
+
+@traced_dependency
+async def get_agent(agent_type: AgentType, registry: AgentRegistry = Depends(get_registry)):
+    try:
+        return registry.get(agent_type)
+    except KeyError:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid agent type")
 
+@traced_dependency
+async def get_orchestrator(registry: AgentRegistry = Depends(get_registry)) -> AgentOrchestrator:
+    return AgentOrchestrator.from_settings(registry.agents)
+
+@traced_dependency
 async def validate_user_input(user_input: UserInput) -> UserInput:
     if user_input.input_type == "file" and not user_input.file_path:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File path is required for file input type")
@@ -0,0 +1,54 @@
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable
+from typing import TypeVar
+
+from fastapi import HTTPException, Request
+
+from app.config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+# nginx's "client closed request"; never seen by the client, but shows in access logs
+CLIENT_CLOSED_REQUEST = 499
+
+# Requests whose work was cancelled because the client went away, per endpoint
+cancelled_requests: Counter[str] = Counter()
+
+
+class ClientDisconnected(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request"
+        )
+
+
+async def cancel_on_disconnect(
+    request: Request,
+    work: Awaitable[T],
+    *,
+    name: str,
+    poll_interval: float | None = None,
+) -> T:
+    """
+    Await `work`, polling the connection meanwhile. If the client disconnects,
+    `work` is cancelled, which unwinds agents and in-flight provider calls,
+    and ClientDisconnected is raised.
+    """
+    if poll_interval is None:
+        poll_interval = settings.CLIENT_DISCONNECT_POLL_SECONDS
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                await asyncio.wait({task})
+                cancelled_requests[name] += 1
+                raise ClientDisconnected()
+    finally:
+        task.cancel()
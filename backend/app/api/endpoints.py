@@ -1,13 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+import time
+from contextlib import aclosing
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from app.models.user_input import UserInput
 from app.models.agent_communication import AgentRequest, AgentResponse
-from app.agents.base_agent import BaseAgent
+from app.agents.orchestrator import AgentOrchestrator, with_relevance
 from app.models.base import AgentType
-from .dependencies import get_agent, validate_user_input
+from .disconnect import ClientDisconnected, cancel_on_disconnect, cancelled_requests
+from .dependencies import get_current_active_superuser, get_orchestrator, validate_user_input
+from app.agents.registry import reload_agent_registry
 from app.services.agent_type_analysis import analyze_agent_types
-from app.services.sentiment_analysis import analyze_sentiment
+from app.services.cascade import cascade_snapshot
+from app.services.circuit_breaker import circuit_breaker_snapshot
+from app.services.compaction import token_stats
+from app.services.completions import cancelled_calls
+from app.services.governor import LLMOverloadedError, governor_snapshot
+from app.services.repair import repair_snapshot
+from app.services.sentiment_analysis import analyze_sentiment, analyze_sentiment_batch
 from app.api.routes import items, login, users, utils
+from app.config import get_settings
 
+settings = get_settings()
 
 api_router = APIRouter()
 api_router.include_router(login.router, tags=["login"])
@@ -15,34 +31,153 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(utils.router, prefix="/utils", tags=["utils"])
 api_router.include_router(items.router, prefix="/items", tags=["items"])
 
+def overloaded_http_exception(e: LLMOverloadedError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": str(max(1, round(e.retry_after)))},
+    )
+
 @api_router.post("/analyze", response_model=list[AgentResponse])
 async def analyze_golf_situation(
+    http_request: Request,
     user_input: UserInput = Depends(validate_user_input),
-    caddie_agent: BaseAgent = Depends(lambda: get_agent(AgentType.CADDIE))
+    agents: list[AgentType] | None = Query(None),
+    dispatch: Literal["all", "confidence"] | None = Query(None),
+    orchestrator: AgentOrchestrator = Depends(get_orchestrator)
 ):
+    unsupported = [agent_type.value for agent_type in agents or [] if agent_type not in orchestrator.agents]
+    if unsupported:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported agent types: {', '.join(unsupported)}")
     try:
-        agent_request = AgentRequest(user_input=user_input, agent_config=caddie_agent.config)
-        responses = await caddie_agent.process_request(agent_request)
+        caddie_config = orchestrator.agents[AgentType.CADDIE].config
+        agent_request = AgentRequest(user_input=user_input, agent_config=caddie_config)
+        if agents is None and (dispatch or settings.ANALYZE_DISPATCH_MODE) == "confidence":
+            work = orchestrator.dispatch(
+                agent_request,
+                threshold=settings.DISPATCH_CONFIDENCE_THRESHOLD,
+                top_k=settings.DISPATCH_TOP_K,
+            )
+        else:
+            work = orchestrator.run(agent_request, agents)
+        responses = await cancel_on_disconnect(http_request, work, name="analyze")
         return responses
+    except ClientDisconnected:
+        raise
+    except LLMOverloadedError as e:
+        raise overloaded_http_exception(e)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@api_router.post("/analyze/stream")
+async def analyze_golf_situation_stream(
+    user_input: UserInput = Depends(validate_user_input),
+    agents: list[AgentType] | None = Query(None),
+    dispatch: Literal["all", "confidence"] | None = Query(None),
+    orchestrator: AgentOrchestrator = Depends(get_orchestrator)
+):
+    unsupported = [agent_type.value for agent_type in agents or [] if agent_type not in orchestrator.agents]
+    if unsupported:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported agent types: {', '.join(unsupported)}")
+    caddie_config = orchestrator.agents[AgentType.CADDIE].config
+    agent_request = AgentRequest(user_input=user_input, agent_config=caddie_config)
+    confidence_dispatch = agents is None and (dispatch or settings.ANALYZE_DISPATCH_MODE) == "confidence"
+
+    async def events():
+        # Sent before any agent work so headers and first byte go out immediately
+        yield ": stream opened\n\n"
+        start = time.perf_counter()
+        count = errors = 0
+        try:
+            request, agent_types, relevance = agent_request, agents, {}
+            if confidence_dispatch:
+                request, selected = await orchestrator.plan_dispatch(
+                    agent_request,
+                    threshold=settings.DISPATCH_CONFIDENCE_THRESHOLD,
+                    top_k=settings.DISPATCH_TOP_K,
+                )
+                agent_types, relevance = [agent_type for agent_type, _ in selected], dict(selected)
+            # Closing this generator (client gone) closes the stream, which cancels pending agents
+            async with aclosing(orchestrator.stream(request, agent_types)) as responses:
+                async for response in responses:
+                    if relevance:
+                        with_relevance(response, relevance)
+                    count += 1
+                    errors += bool(response.metadata and response.metadata.get("error"))
+                    yield sse_event("agent_response", response.model_dump(mode="json"))
+        except (asyncio.CancelledError, GeneratorExit):
+            cancelled_requests["analyze_stream"] += 1
+            raise
+        except LLMOverloadedError as e:
+            yield sse_event("error", {"detail": str(e), "retry_after": e.retry_after})
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+        yield sse_event("summary", {"responses": count, "errors": errors, "elapsed_seconds": round(time.perf_counter() - start, 3)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @api_router.post("/agent_type_analysis")
-async def perform_agent_type_analysis(user_input: UserInput = Depends(validate_user_input)):
+async def perform_agent_type_analysis(http_request: Request, user_input: UserInput = Depends(validate_user_input)):
     try:
-        analysis = await analyze_agent_types(user_input)
+        analysis = await cancel_on_disconnect(http_request, analyze_agent_types(user_input), name="agent_type_analysis")
         return analysis
+    except ClientDisconnected:
+        raise
+    except LLMOverloadedError as e:
+        raise overloaded_http_exception(e)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @api_router.post("/sentiment_analysis")
-async def perform_sentiment_analysis(user_input: UserInput = Depends(validate_user_input)):
+async def perform_sentiment_analysis(http_request: Request, user_input: UserInput = Depends(validate_user_input)):
     try:
-        sentiment = await analyze_sentiment(user_input.content)
+        sentiment = await cancel_on_disconnect(http_request, analyze_sentiment(user_input.content), name="sentiment_analysis")
         return sentiment
+    except ClientDisconnected:
+        raise
+    except LLMOverloadedError as e:
+        raise overloaded_http_exception(e)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+@api_router.post("/sentiment_analysis/batch")
+async def perform_batch_sentiment_analysis(user_inputs: list[UserInput]):
+    for user_input in user_inputs:
+        await validate_user_input(user_input)
+
+    async def ndjson_lines():
+        async for index, result in analyze_sentiment_batch([user_input.content for user_input in user_inputs]):
+            if isinstance(result, Exception):
+                line = {"index": index, "error": str(result)}
+            else:
+                line = {"index": index, "result": result.model_dump(mode="json")}
+            yield json.dumps(line) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
 @api_router.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@api_router.get("/health/llm")
+async def llm_health_check():
+    return {
+        "circuit_breakers": circuit_breaker_snapshot(),
+        "governors": governor_snapshot(),
+        "cascade": cascade_snapshot(),
+        "repairs": repair_snapshot(),
+        "tokens": token_stats.snapshot(),
+        "cancellations": {"requests": dict(cancelled_requests), "provider_calls": dict(cancelled_calls)},
+    }
+
+@api_router.post("/agents/reload", dependencies=[Depends(get_current_active_superuser)])
+async def reload_agents():
+    registry = await reload_agent_registry()
+    return {"version": registry.version, "agents": [agent_type.value for agent_type in registry.agents]}
\ No newline at end of file
@@ -0,0 +1,4 @@
+"""
+Benchmarks: HTTP load runs and microbenchmarks with baselines that are saved
+to `app/benchmarks/baselines/` so regressions show up as a diff.
+"""
@@ -0,0 +1,230 @@
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+
+def percentile(samples: Sequence[float], quantile: float) -> float | None:
+    """Nearest-rank percentile of unsorted `samples`."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(quantile * len(ordered)) - 1)]
+
+
+def summarize(samples: Sequence[float]) -> dict[str, float | int | None]:
+    """Count, mean and tail percentiles of latencies in seconds, reported in ms."""
+
+    def ms(value: float | None) -> float | None:
+        return None if value is None else round(value * 1000, 3)
+
+    return {
+        "count": len(samples),
+        "mean_ms": ms(sum(samples) / len(samples)) if samples else None,
+        "p50_ms": ms(percentile(samples, 0.5)),
+        "p95_ms": ms(percentile(samples, 0.95)),
+        "p99_ms": ms(percentile(samples, 0.99)),
+    }
+
+
+def measure(
+    fn: Callable[[], object],
+    *,
+    warmup: int = 1,
+    repeat: int = 7,
+    min_time: float = 0.05,
+) -> list[float]:
+    """
+    Per-call seconds of `fn` over `repeat` timed rounds. Each round loops `fn`
+    enough times to take at least `min_time`, with GC disabled as in timeit;
+    calibrating and `warmup` extra rounds run untimed first.
+    """
+    timer = timeit.Timer(fn)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    for _ in range(warmup):
+        timer.timeit(number)
+    return [t / number for t in timer.repeat(repeat=repeat, number=number)]
+
+
+def summarize_calls(samples: Sequence[float]) -> dict[str, float | int]:
+    """Spread of per-call timings in microseconds; the median is the stable figure."""
+
+    def us(value: float) -> float:
+        return round(value * 1e6, 3)
+
+    return {
+        "rounds": len(samples),
+        "min_us": us(min(samples)),
+        "median_us": us(statistics.median(samples)),
+        "stdev_us": us(statistics.stdev(samples)) if len(samples) > 1 else 0.0,
+    }
+
+
+def environment() -> dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def baseline_path(name: str) -> Path:
+    path = Path(name)
+    return path if path.suffix == ".json" else BASELINE_DIR / f"{name}.json"
+
+
+def save_baseline(name: str, results: dict[str, Any]) -> Path:
+    path = baseline_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    return path
+
+
+def load_baseline(name: str) -> dict[str, Any]:
+    return json.loads(baseline_path(name).read_text())
+
+
+def compare(
+    current: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    metric: str,
+    max_regression: float,
+) -> list[str]:
+    """
+    One line per benchmark present in both runs with the relative change in
+    `metric` (higher is worse), flagging changes beyond `max_regression`.
+    """
+    lines = []
+    for name in sorted(current.keys() & baseline.keys()):
+        now, before = current[name].get(metric), baseline[name].get(metric)
+        if not now or not before:
+            continue
+        change = (now - before) / before
+        flag = "  REGRESSION" if change > max_regression else ""
+        lines.append(f"{name}: {metric} {before} -> {now} ({change:+.1%}){flag}")
+    return lines
+
+
+def add_baseline_arguments(
+    parser: argparse.ArgumentParser,
+    metrics: Sequence[str],
+    max_regression: float,
+) -> None:
+    parser.add_argument("--save-baseline", metavar="NAME")
+    parser.add_argument("--compare", metavar="NAME")
+    parser.add_argument("--metric", default=metrics[0], choices=metrics)
+    parser.add_argument("--max-regression", type=float, default=max_regression)
+
+
+def finish(
+    args: argparse.Namespace,
+    results: dict[str, dict[str, Any]],
+    config: dict[str, Any],
+) -> None:
+    """Save and/or compare against a baseline; exit 1 on a regression."""
+    if args.save_baseline:
+        path = save_baseline(
+            args.save_baseline,
+            {"environment": environment(), "config": config, "results": results},
+        )
+        print(f"Saved baseline to {path}")
+    if args.compare:
+        baseline = load_baseline(args.compare)["results"]
+        lines = compare(results, baseline, args.metric, args.max_regression)
+        print("\n".join(lines))
+        if any(line.endswith("REGRESSION") for line in lines):
+            sys.exit(1)
+
+
+def format_table(rows: list[dict[str, Any]], columns: Sequence[str]) -> str:
+    widths = {
+        c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) if rows else len(c)
+        for c in columns
+    }
+    lines = ["  ".join(c.ljust(widths[c]) for c in columns)]
+    lines += [
+        "  ".join(str(r.get(c, "")).ljust(widths[c]) for c in columns) for r in rows
+    ]
+    return "\n".join(lines)
+
+
+def _wait_until_up(url: str, process: subprocess.Popen[bytes], timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(map(str, process.args))} exited early")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+@contextmanager
+def running(
+    command: list[str],
+    ready_url: str,
+    *,
+    env: dict[str, str] | None = None,
+    timeout: float = 30.0,
+) -> Iterator[subprocess.Popen[bytes]]:
+    """Run `command` until the block exits, once `ready_url` answers."""
+    process = subprocess.Popen(command, env=env)
+    try:
+        _wait_until_up(ready_url, process, timeout)
+        yield process
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+@contextmanager
+def standin_server(port: int, latency: str | None = None) -> Iterator[str]:
+    """Run the LLM stand-in in synthesize mode; yield its URL."""
+    command = [sys.executable, "-m", "app.llm_standin", "--mode", "synthesize"]
+    command += ["--port", str(port)]
+    if latency:
+        command += ["--latency", latency]
+    url = f"http://127.0.0.1:{port}"
+    with running(command, f"{url}/docs"):
+        yield url
+
+
+def standin_env(url: str) -> dict[str, str]:
+    """Settings that point the provider clients at a stand-in at `url`."""
+    return {
+        "OPENAI_BASE_URL": f"{url}/v1",
+        "GROQ_BASE_URL": url,
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "standin"),
+        "GROQ_API_KEY": os.environ.get("GROQ_API_KEY", "standin"),
+    }
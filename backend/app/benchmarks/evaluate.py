@@ -0,0 +1,300 @@
+"""
+Offline evaluation of the sentiment and agent-type analyses over a corpus.
+
+Each line of the corpus is a JSON object with a `text` and optional labels:
+`sentiment` (positive/neutral/negative) and `agent` (e.g. CaddieAgent). Every
+configuration runs the corpus through `analyze_sentiment` and
+`analyze_agent_types`, reporting accuracy against the labels, throughput,
+latency percentiles, provider-reported tokens and estimated cost:
+
+    python -m app.benchmarks.evaluate --standin
+    python -m app.benchmarks.evaluate --config groq:llama3-8b-8192 \\
+        --config openai:gpt-4o-mini --concurrency 8
+
+`default` evaluates the analyses as configured (local tier, cascade, routing).
+`provider:model` sends every input to that model alone. --standin runs against
+the local LLM stand-in; otherwise the real providers are called. The analysis
+cache is disabled so every input is a fresh call.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from app.benchmarks.common import (
+    add_baseline_arguments,
+    finish,
+    format_table,
+    standin_env,
+    standin_server,
+    summarize,
+)
+from app.config import AgentTypeAnalysis, CascadeTier, get_settings
+from app.models.base import AgentType
+from app.models.user_input import UserInput
+from app.services.agent_type_analysis import analyze_agent_types
+from app.services.compaction import token_stats
+from app.services.sentiment_analysis import analyze_sentiment
+
+settings = get_settings()
+
+DEFAULT_CORPUS = Path(__file__).parent / "corpus" / "golf_inputs.jsonl"
+TASKS = ("sentiment", "agent_types")
+# USD per million (prompt, completion) tokens at list price; override with --price
+PRICES: dict[str, tuple[float, float]] = {
+    "gpt-4": (30.0, 60.0),
+    "gpt-4o": (5.0, 15.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "llama3-70b-8192": (0.59, 0.79),
+    "llama3-8b-8192": (0.05, 0.08),
+}
+COLUMNS = (
+    "run",
+    "count",
+    "errors",
+    "accuracy",
+    "items_per_s",
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "prompt_tokens",
+    "completion_tokens",
+    "cost_usd",
+)
+
+
+@dataclass(frozen=True)
+class Example:
+    text: str
+    sentiment: str | None = None
+    agent: str | None = None
+
+
+def load_corpus(path: Path, limit: int | None = None) -> list[Example]:
+    examples = []
+    for line in path.read_text().splitlines():
+        if line.strip():
+            data = json.loads(line)
+            examples.append(
+                Example(data["text"], data.get("sentiment"), data.get("agent"))
+            )
+    return examples[:limit]
+
+
+def top_agent(analysis: AgentTypeAnalysis) -> str:
+    return max(
+        AgentType, key=lambda t: getattr(analysis, t.value.lower()).confidence
+    ).value
+
+
+async def _predict_sentiment(example: Example) -> tuple[str, str | None]:
+    result = await analyze_sentiment(example.text)
+    return str(result.sentiment.value), example.sentiment
+
+
+async def _predict_agent(example: Example) -> tuple[str, str | None]:
+    result = await analyze_agent_types(
+        UserInput(input_type="text", content=example.text)
+    )
+    return top_agent(result), example.agent
+
+
+PREDICTORS: dict[str, Callable[[Example], Awaitable[tuple[str, str | None]]]] = {
+    "sentiment": _predict_sentiment,
+    "agent_types": _predict_agent,
+}
+
+
+def _usage_totals() -> dict[str, tuple[int, int]]:
+    return {
+        route: (usage["actual_prompt"], usage["completion"])
+        for route, usage in token_stats.snapshot()["usage"].items()
+    }
+
+
+def cost_usd(
+    usage: dict[str, tuple[int, int]], prices: dict[str, tuple[float, float]]
+) -> float | None:
+    """Price per-route token usage; None when a route's model has no known price."""
+    total = 0.0
+    for route, (prompt, completion) in usage.items():
+        model = route.partition(":")[2]
+        if model not in prices:
+            return None
+        prompt_price, completion_price = prices[model]
+        total += (prompt * prompt_price + completion * completion_price) / 1e6
+    return round(total, 6)
+
+
+async def evaluate_task(
+    task: str,
+    examples: list[Example],
+    *,
+    concurrency: int,
+    prices: dict[str, tuple[float, float]],
+) -> dict[str, Any]:
+    predict = PREDICTORS[task]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    correct = labelled = errors = 0
+
+    async def run_one(example: Example) -> None:
+        nonlocal correct, labelled, errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                predicted, label = await predict(example)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+        if label is not None:
+            labelled += 1
+            correct += predicted.lower() == label.lower()
+
+    before = _usage_totals()
+    start = time.perf_counter()
+    await asyncio.gather(*(run_one(example) for example in examples))
+    elapsed = time.perf_counter() - start
+    usage = {}
+    for route, (prompt, completion) in _usage_totals().items():
+        prompt_before, completion_before = before.get(route, (0, 0))
+        if (prompt, completion) != (prompt_before, completion_before):
+            usage[route] = (prompt - prompt_before, completion - completion_before)
+    return {
+        **summarize(latencies),
+        "errors": errors,
+        "labelled": labelled,
+        "accuracy": round(correct / labelled, 4) if labelled else None,
+        "items_per_s": round(len(latencies) / elapsed, 2),
+        "prompt_tokens": sum(prompt for prompt, _ in usage.values()),
+        "completion_tokens": sum(completion for _, completion in usage.values()),
+        "cost_usd": cost_usd(usage, prices),
+    }
+
+
+@contextmanager
+def configured(spec: str) -> Iterator[None]:
+    """
+    Apply a configuration for the duration of the block: `default` leaves the
+    settings alone, `provider:model` routes both analyses to that model through
+    a one-tier cascade, with the local sentiment tier off.
+    """
+    if spec == "default":
+        yield
+        return
+    provider, _, model = spec.partition(":")
+    tiers = [CascadeTier(provider=provider, model=model)]  # type: ignore[arg-type]
+    sentiment, agent_types = settings.sentiment_analysis, settings.agent_type_analysis
+    settings.sentiment_analysis = sentiment.model_copy(
+        update={
+            "cascade_enabled": True,
+            "cascade": tiers,
+            "local_classifier_enabled": False,
+        }
+    )
+    settings.agent_type_analysis = agent_types.model_copy(
+        update={"cascade_enabled": True, "cascade": tiers}
+    )
+    try:
+        yield
+    finally:
+        settings.sentiment_analysis = sentiment
+        settings.agent_type_analysis = agent_types
+
+
+async def evaluate(
+    examples: list[Example],
+    configs: list[str],
+    tasks: list[str],
+    *,
+    concurrency: int,
+    prices: dict[str, tuple[float, float]],
+) -> dict[str, dict[str, Any]]:
+    results = {}
+    for spec in configs:
+        with configured(spec):
+            for task in tasks:
+                results[f"{spec}/{task}"] = await evaluate_task(
+                    task, examples, concurrency=concurrency, prices=prices
+                )
+    return results
+
+
+def parse_price(spec: str) -> tuple[str, tuple[float, float]]:
+    model, _, values = spec.partition("=")
+    prompt, _, completion = values.partition(",")
+    return model, (float(prompt), float(completion or prompt))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--limit", type=int, help="Only use the first N examples")
+    parser.add_argument(
+        "--config",
+        action="append",
+        help="default or provider:model (repeatable; default: default)",
+    )
+    parser.add_argument("--task", action="append", choices=TASKS)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--price",
+        action="append",
+        type=parse_price,
+        default=[],
+        help="MODEL=PROMPT,COMPLETION in USD per million tokens (repeatable)",
+    )
+    parser.add_argument(
+        "--standin", action="store_true", help="Call the local LLM stand-in"
+    )
+    parser.add_argument("--standin-port", type=int, default=8900)
+    parser.add_argument("--standin-latency", default="lognormal:0.3,0.4")
+    add_baseline_arguments(
+        parser, ("p95_ms", "p50_ms", "p99_ms", "cost_usd"), max_regression=0.2
+    )
+    args = parser.parse_args()
+
+    examples = load_corpus(args.corpus, args.limit)
+    prices = {**PRICES, **dict(args.price)}
+    settings.LLM_CACHE_ENABLED = False
+    server = (
+        standin_server(args.standin_port, args.standin_latency)
+        if args.standin
+        else nullcontext(None)
+    )
+    with server as standin_url:
+        if standin_url:
+            for name, value in standin_env(standin_url).items():
+                setattr(settings, name, value)
+        results = asyncio.run(
+            evaluate(
+                examples,
+                args.config or ["default"],
+                args.task or list(TASKS),
+                concurrency=args.concurrency,
+                prices=prices,
+            )
+        )
+
+    print(format_table([{"run": n, **r} for n, r in results.items()], COLUMNS))
+    finish(
+        args,
+        results,
+        {
+            "corpus": str(args.corpus),
+            "examples": len(examples),
+            "concurrency": args.concurrency,
+            "standin": args.standin,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+HTTP load benchmark for the auth, items and agent endpoints.
+
+By default it starts the LLM stand-in and the backend as subprocesses, drives
+a weighted mix of requests at a fixed concurrency for a fixed duration, and
+prints throughput and latency percentiles per route:
+
+    python -m app.benchmarks.load --concurrency 16 --duration 30
+    python -m app.benchmarks.load --save-baseline load
+    python -m app.benchmarks.load --compare load --max-regression 0.2
+
+Pass --base-url to load an already running server instead. The database the
+backend uses must be migrated and hold the first superuser.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+from app.benchmarks.common import (
+    add_baseline_arguments,
+    finish,
+    format_table,
+    running,
+    standin_env,
+    standin_server,
+    summarize,
+)
+
+API = "/api/v1"
+ANALYZE_TEXT = (
+    "I'm 150 yards out in light rough with the wind behind me and the pin is "
+    "tucked back left. I keep pulling my irons lately. What club should I hit?"
+)
+DEFAULT_MIX = "items=4,users_me=3,analyze=2,login=1"
+COLUMNS = ("route", "count", "errors", "rps", "mean_ms", "p50_ms", "p95_ms", "p99_ms")
+
+
+@dataclass
+class Recorder:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        route: str,
+        method: str,
+        url: str,
+        **kwargs: Any,
+    ) -> httpx.Response | None:
+        """Time one request under `route`, counting transport errors and non-2xx."""
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[route] += 1
+            return None
+        self.latencies[route].append(time.perf_counter() - start)
+        if not response.is_success:
+            self.errors[route] += 1
+            return None
+        return response
+
+    def results(self, elapsed: float) -> dict[str, dict[str, Any]]:
+        routes = sorted(self.latencies.keys() | self.errors.keys())
+        return {
+            route: {
+                **summarize(self.latencies[route]),
+                "errors": self.errors[route],
+                "rps": round(len(self.latencies[route]) / elapsed, 2),
+            }
+            for route in routes
+        }
+
+
+@dataclass
+class Session:
+    client: httpx.AsyncClient
+    recorder: Recorder
+    username: str
+    password: str
+    rng: random.Random
+    token: str | None = None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+    async def login(self) -> None:
+        response = await self.recorder.request(
+            self.client,
+            "POST /login/access-token",
+            "POST",
+            f"{API}/login/access-token",
+            data={"username": self.username, "password": self.password},
+        )
+        if response is not None:
+            self.token = response.json()["access_token"]
+
+    async def users_me(self) -> None:
+        await self.recorder.request(
+            self.client, "GET /users/me", "GET", f"{API}/users/me", headers=self.headers
+        )
+
+    async def items(self) -> None:
+        """Create, read, update, list and delete one item."""
+        record, client, headers = self.recorder.request, self.client, self.headers
+        created = await record(
+            client,
+            "POST /items/",
+            "POST",
+            f"{API}/items/",
+            json={"title": f"bench-{self.rng.getrandbits(32):08x}"},
+            headers=headers,
+        )
+        if created is None:
+            return
+        url = f"{API}/items/{created.json()['id']}"
+        await record(client, "GET /items/{id}", "GET", url, headers=headers)
+        await record(
+            client,
+            "PUT /items/{id}",
+            "PUT",
+            url,
+            json={"description": "updated by load benchmark"},
+            headers=headers,
+        )
+        await record(
+            client,
+            "GET /items/",
+            "GET",
+            f"{API}/items/",
+            params={"limit": 20},
+            headers=headers,
+        )
+        await record(client, "DELETE /items/{id}", "DELETE", url, headers=headers)
+
+    async def analyze(self) -> None:
+        await self.recorder.request(
+            self.client,
+            "POST /analyze",
+            "POST",
+            f"{API}/analyze",
+            json={"input_type": "text", "content": ANALYZE_TEXT},
+            headers=self.headers,
+        )
+
+
+def parse_mix(spec: str) -> dict[str, int]:
+    mix: dict[str, int] = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("login", "users_me", "items", "analyze"):
+            raise ValueError(f"Unknown scenario {name!r} in mix {spec!r}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+async def worker(session: Session, mix: dict[str, int], deadline: float) -> None:
+    await session.login()
+    scenarios: list[Callable[[], Awaitable[None]]] = [
+        getattr(session, name) for name in mix
+    ]
+    weights = list(mix.values())
+    while time.perf_counter() < deadline:
+        if session.token is None:
+            await session.login()
+            continue
+        await session.rng.choices(scenarios, weights)[0]()
+
+
+async def run_load(
+    base_url: str,
+    *,
+    username: str,
+    password: str,
+    concurrency: int,
+    duration: float,
+    mix: dict[str, int],
+    seed: int = 0,
+    timeout: float = 60.0,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> dict[str, dict[str, Any]]:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=timeout, limits=limits, transport=transport
+    ) as client:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(
+            *(
+                worker(
+                    Session(
+                        client, recorder, username, password, random.Random(seed + i)
+                    ),
+                    mix,
+                    deadline,
+                )
+                for i in range(concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - start
+    return recorder.results(elapsed)
+
+
+@contextmanager
+def local_servers(
+    app_port: int, standin_port: int, standin_latency: str | None
+) -> Iterator[str]:
+    """Run the stand-in and the backend pointed at it; yield the backend URL."""
+    app_cmd = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--port",
+        str(app_port),
+        "--log-level",
+        "warning",
+    ]
+    app_url = f"http://127.0.0.1:{app_port}"
+    with standin_server(standin_port, standin_latency) as standin_url:
+        env = {**os.environ, **standin_env(standin_url)}
+        with running(app_cmd, f"{app_url}{API}/health", env=env, timeout=60):
+            yield app_url
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--base-url", help="Load this server instead of starting one")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds")
+    parser.add_argument(
+        "--mix",
+        default=DEFAULT_MIX,
+        help="Scenario weights, e.g. " + DEFAULT_MIX,
+    )
+    parser.add_argument("--username", default=os.environ.get("FIRST_SUPERUSER"))
+    parser.add_argument(
+        "--password", default=os.environ.get("FIRST_SUPERUSER_PASSWORD")
+    )
+    parser.add_argument("--app-port", type=int, default=8100)
+    parser.add_argument("--standin-port", type=int, default=8900)
+    parser.add_argument(
+        "--standin-latency",
+        default="lognormal:0.3,0.4",
+        help="Latency model for the LLM stand-in (see python -m app.llm_standin -h)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    add_baseline_arguments(
+        parser, ("p95_ms", "p50_ms", "p99_ms", "mean_ms"), max_regression=0.2
+    )
+    args = parser.parse_args()
+    if not args.username or not args.password:
+        parser.error("Set --username/--password or FIRST_SUPERUSER(_PASSWORD)")
+
+    def run(base_url: str) -> dict[str, dict[str, Any]]:
+        return asyncio.run(
+            run_load(
+                base_url,
+                username=args.username,
+                password=args.password,
+                concurrency=args.concurrency,
+                duration=args.duration,
+                mix=parse_mix(args.mix),
+                seed=args.seed,
+            )
+        )
+
+    if args.base_url:
+        routes = run(args.base_url)
+    else:
+        with local_servers(
+            args.app_port, args.standin_port, args.standin_latency
+        ) as base_url:
+            routes = run(base_url)
+
+    print(format_table([{"route": r, **s} for r, s in routes.items()], COLUMNS))
+    finish(
+        args,
+        routes,
+        {
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "mix": args.mix,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
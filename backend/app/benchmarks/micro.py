@@ -0,0 +1,166 @@
+"""
+Microbenchmarks for the helpers every request goes through: password hashing,
+JWTs, the user lookup, email rendering and the text helpers.
+
+    python -m app.benchmarks.micro
+    python -m app.benchmarks.micro --save-baseline micro
+    python -m app.benchmarks.micro --compare micro --max-regression 0.1
+    python -m app.benchmarks.micro --filter jwt --repeat 15
+
+The user lookup runs against an in-memory SQLite database seeded with users,
+so it measures query building and ORM overhead rather than the network.
+"""
+
+import argparse
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
+
+import jwt
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from app import crud
+from app.benchmarks.common import (
+    add_baseline_arguments,
+    finish,
+    format_table,
+    measure,
+    summarize_calls,
+)
+from app.core import security
+from app.core.config import settings
+from app.models import Item, User
+from app.utils import (
+    extract_key_entities,
+    generate_password_reset_token,
+    is_valid_golf_input,
+    render_email_template,
+    sanitize_input,
+    verify_password_reset_token,
+)
+
+PASSWORD = "correct horse battery staple"
+SEEDED_USERS = 1000
+GOLF_TEXT = (
+    "Hit my drive into the left bunker on the 7th hole, then chunked the "
+    "wedge. Par 4, 410 yards, wind into us. How do I stop fatting my chips?"
+)
+OFF_TOPIC_TEXT = "What's a good recipe for banana bread with walnuts? " * 4
+NER_RESULTS = {
+    "CLUB": ["driver", "7 iron", "sand wedge"],
+    "DISTANCE": ["410 yards", "150 yards"],
+    "LOCATION": ["bunker", "fairway", "green"],
+}
+COLUMNS = ("benchmark", "rounds", "min_us", "median_us", "stdev_us")
+
+
+def user_lookup_session(users: int = SEEDED_USERS) -> Session:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine, tables=[User.__table__, Item.__table__])  # type: ignore[list-item]
+    session = Session(engine)
+    hashed_password = security.get_password_hash(PASSWORD)
+    session.add_all(
+        User(email=f"user{i}@example.com", hashed_password=hashed_password)
+        for i in range(users)
+    )
+    session.commit()
+    return session
+
+
+def build_suite() -> dict[str, Callable[[], object]]:
+    hashed_password = security.get_password_hash(PASSWORD)
+    access_token = security.create_access_token("42", timedelta(minutes=30))
+    reset_token = generate_password_reset_token("user@example.com")
+    session = user_lookup_session()
+    lookup_email = f"user{SEEDED_USERS // 2}@example.com"
+    email_context = {
+        "project_name": settings.PROJECT_NAME,
+        "username": "user@example.com",
+        "password": PASSWORD,
+        "email": "user@example.com",
+        "link": settings.server_host,
+    }
+    return {
+        "security.get_password_hash": lambda: security.get_password_hash(PASSWORD),
+        "security.verify_password": lambda: security.verify_password(
+            PASSWORD, hashed_password
+        ),
+        "security.create_access_token": lambda: security.create_access_token(
+            "42", timedelta(minutes=30)
+        ),
+        # What get_current_user does with every bearer token
+        "jwt.decode_access_token": lambda: jwt.decode(
+            access_token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
+        ),
+        "utils.generate_password_reset_token": lambda: generate_password_reset_token(
+            "user@example.com"
+        ),
+        "utils.verify_password_reset_token": lambda: verify_password_reset_token(
+            reset_token
+        ),
+        "crud.get_user_by_email": lambda: crud.get_user_by_email(
+            session=session, email=lookup_email
+        ),
+        "utils.render_email_template": lambda: render_email_template(
+            template_name="new_account.html", context=email_context
+        ),
+        "utils.sanitize_input": lambda: sanitize_input(GOLF_TEXT),
+        "utils.is_valid_golf_input.match": lambda: is_valid_golf_input(GOLF_TEXT),
+        "utils.is_valid_golf_input.miss": lambda: is_valid_golf_input(OFF_TOPIC_TEXT),
+        "utils.extract_key_entities": lambda: extract_key_entities(NER_RESULTS),
+    }
+
+
+def run_suite(
+    suite: dict[str, Callable[[], object]],
+    *,
+    warmup: int,
+    repeat: int,
+    min_time: float,
+) -> dict[str, dict[str, Any]]:
+    return {
+        name: summarize_calls(
+            measure(fn, warmup=warmup, repeat=repeat, min_time=min_time)
+        )
+        for name, fn in suite.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed rounds")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed rounds")
+    parser.add_argument(
+        "--min-time", type=float, default=0.05, help="Minimum seconds per round"
+    )
+    add_baseline_arguments(parser, ("median_us", "min_us"), max_regression=0.1)
+    args = parser.parse_args()
+
+    suite = {
+        name: fn
+        for name, fn in build_suite().items()
+        if not args.filter or args.filter in name
+    }
+    results = run_suite(
+        suite, warmup=args.warmup, repeat=args.repeat, min_time=args.min_time
+    )
+    print(format_table([{"benchmark": n, **r} for n, r in results.items()], COLUMNS))
+    finish(
+        args,
+        results,
+        {
+            "warmup": args.warmup,
+            "repeat": args.repeat,
+            "min_time": args.min_time,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
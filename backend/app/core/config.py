@@ -2,7 +2,7 @@ import secrets
 import warnings
 from typing import Annotated, Any, Literal
 from pydantic_settings import BaseSettings
-from pydantic import Field
+from pydantic import BaseModel, Field
 from functools import lru_cache
 from typing import List
 from app.models.nlp_tags import SentimentTag
@@ -28,20 +28,68 @@ def parse_cors(v: Any) -> list[str] | str:
         return v
     raise ValueError(v)
 
+class ProviderLimits(BaseModel):
+    max_concurrency: int = Field(16, ge=1)
+    # Callers waiting for a slot beyond this are rejected with a 503
+    max_queue: int = Field(64, ge=0)
+    requests_per_minute: int = Field(500, ge=1)
+    tokens_per_minute: int = Field(200_000, ge=1)
+
+class CascadeTier(BaseModel):
+    provider: Literal["groq", "openai"]
+    model: str
+    # Answers below this confidence escalate to the next tier; the last tier always answers
+    min_confidence: float = Field(0.0, ge=0, le=1)
+
 class SentimentAnalysisConfig(BaseSettings):
     prompt_template: str = "Analyze the sentiment of the following text and provide a brief explanation:\n\n{text}"
     groq_model: str = "llama3-70b-8192"
     openai_model: str = "gpt-4"
     temperature: float = Field(0.2, ge=0, le=1)
     max_tokens: int = 500
+    # Inputs are compacted to this many tokens; defaults to max_tokens * LLM_INPUT_TOKEN_RATIO
+    max_input_tokens: int | None = None
     system_message: str = "You are a sentiment analysis expert. Provide sentiment analysis with high accuracy."
+    batch_prompt_template: str = "Analyze the sentiment of each numbered text below. Return exactly one result per text, in the same order:\n\n{texts}"
+    batch_size: int = Field(8, ge=1)
+    batch_concurrency: int = Field(4, ge=1)
+    local_classifier_enabled: bool = True
+    # Local lexicon answers are used only at or above this confidence
+    local_confidence_threshold: float = Field(0.85, ge=0, le=1)
+    # "fixed" follows use_groq; "latency" sends each call to the faster provider
+    routing_mode: Literal["fixed", "latency"] = "fixed"
+    hedge_requests: bool = True
+    hedge_percentile: float = Field(0.95, gt=0, le=1)
+    hedge_min_samples: int = Field(20, ge=1)
+    # Smallest model first; escalate only on low confidence
+    cascade_enabled: bool = False
+    cascade: list[CascadeTier] = [
+        CascadeTier(provider="groq", model="llama3-8b-8192", min_confidence=0.8),
+        CascadeTier(provider="groq", model="llama3-70b-8192", min_confidence=0.7),
+        CascadeTier(provider="openai", model="gpt-4"),
+    ]
 
 class AgentTypeAnalysisConfig(BaseSettings):
     prompt_template: str = "Analyze the following golf-related input and determine the relevance to each agent type:\n\n{text}"
     openai_model: str = "gpt-4o"
     temperature: float = Field(0.2, ge=0, le=1)
     max_tokens: int = 1000
+    max_input_tokens: int | None = None
     system_message: str = "You are an expert in golf and AI agents. Analyze the input for relevance to each agent type."
+    # Escalation is driven by the highest agent relevance in the answer
+    cascade_enabled: bool = False
+    cascade: list[CascadeTier] = [
+        CascadeTier(provider="openai", model="gpt-4o-mini", min_confidence=0.7),
+        CascadeTier(provider="openai", model="gpt-4o"),
+    ]
+
+class CombinedAnalysisConfig(BaseSettings):
+    prompt_template: str = "Analyze the following golf-related input. Give its overall sentiment with a brief explanation, and its relevance to each agent type:\n\n{text}"
+    openai_model: str = "gpt-4o"
+    temperature: float = Field(0.2, ge=0, le=1)
+    max_tokens: int = 1200
+    max_input_tokens: int | None = None
+    system_message: str = "You are an expert in golf, sentiment analysis and AI agents. Analyze the input's sentiment and its relevance to each agent type."
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -116,6 +164,80 @@ class Settings(BaseSettings):
     FIRST_SUPERUSER_PASSWORD: str
     USERS_OPEN_REGISTRATION: bool = False
 
+    # Point the provider clients elsewhere, e.g. at the stand-in server
+    # (python -m app.llm_standin): http://localhost:8900/v1 and http://localhost:8900
+    OPENAI_BASE_URL: str | None = None
+    GROQ_BASE_URL: str | None = None
+    # Connection pools shared by the LLM provider clients
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_CONNECT_TIMEOUT: float = 5.0
+    LLM_TIMEOUT: float = 60.0
+    # Number of recent call latencies kept per provider/model for routing
+    LLM_LATENCY_WINDOW: int = 200
+
+    # Outbound budgets per provider/model; LLM_LIMITS keys look like "groq:llama3-70b-8192"
+    LLM_DEFAULT_LIMITS: ProviderLimits = ProviderLimits()
+    LLM_LIMITS: dict[str, ProviderLimits] = {}
+    LLM_MAX_RETRIES: int = 3
+    LLM_RETRY_BACKOFF_BASE: float = 0.5
+    LLM_RETRY_BACKOFF_MAX: float = 20.0
+    # Re-asks after a response that local repair could not make valid
+    LLM_REASK_RETRIES: int = Field(1, ge=0)
+    # Default input budget for an analysis, as a multiple of its max_tokens
+    LLM_INPUT_TOKEN_RATIO: float = Field(4.0, gt=0)
+
+    # Circuit breaker per provider/model, evaluated over the last LLM_BREAKER_WINDOW calls
+    LLM_BREAKER_FAILURE_RATE: float = 0.5
+    # Below the analysis deadlines (CADDIE_*_TIMEOUT, ORCHESTRATOR_ANALYSIS_TIMEOUT)
+    # so a call those deadlines cancel can still count as slow
+    LLM_BREAKER_SLOW_CALL_SECONDS: float = 5.0
+    LLM_BREAKER_SLOW_CALL_RATE: float = 0.8
+    LLM_BREAKER_WINDOW: int = 20
+    LLM_BREAKER_MIN_CALLS: int = 10
+    LLM_BREAKER_OPEN_SECONDS: float = 30.0
+    LLM_BREAKER_HALF_OPEN_CALLS: int = 2
+
+    # CaddieAgent runs its analyses concurrently; each has a timeout and the
+    # request as a whole has a deadline, after which partial results are returned
+    CADDIE_SENTIMENT_TIMEOUT: float = 8.0
+    CADDIE_AGENT_TYPE_TIMEOUT: float = 10.0
+    CADDIE_REQUEST_DEADLINE: float = 12.0
+
+    # Agent orchestration behind /analyze
+    ORCHESTRATOR_MAX_CONCURRENCY: int = 8
+    ORCHESTRATOR_ANALYSIS_TIMEOUT: float = 10.0
+    ORCHESTRATOR_AGENT_TIMEOUT: float = 15.0
+    # "all" runs every implemented agent; "confidence" runs only the agents the
+    # agent-type analysis rates at or above the threshold, at most top-k of them
+    ANALYZE_DISPATCH_MODE: Literal["all", "confidence"] = "all"
+    DISPATCH_CONFIDENCE_THRESHOLD: float = Field(0.5, ge=0, le=1)
+    DISPATCH_TOP_K: int = Field(2, ge=1)
+    # How often long-running endpoints check whether the client is still there
+    CLIENT_DISCONNECT_POLL_SECONDS: float = Field(0.5, gt=0)
+    # Get sentiment and agent-type relevance from one LLM call instead of two
+    USE_COMBINED_ANALYSIS: bool = False
+    combined_analysis: CombinedAnalysisConfig = CombinedAnalysisConfig()
+
+    # Serve Prometheus metrics at /metrics; set PROMETHEUS_MULTIPROC_DIR when
+    # running several workers so their samples are merged
+    METRICS_ENABLED: bool = True
+
+    # OpenTelemetry tracing; TRACING_SAMPLE_RATIO of traces are kept unless the
+    # caller's traceparent already decided
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: Literal["otlp", "file"] = "otlp"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_FILE_PATH: str = "traces.jsonl"
+    TRACING_SAMPLE_RATIO: float = Field(0.1, ge=0, le=1)
+
+    # Cache of validated LLM analyses; the disk tier is off unless a path is set
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    LLM_CACHE_TTL_SECONDS: float = 60 * 60
+    LLM_CACHE_DISK_PATH: str | None = None
+
     def _check_default_secret(self, var_name: str, value: str | None) -> None:
         if value == "changethis":
             message = (
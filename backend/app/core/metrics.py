@@ -0,0 +1,150 @@
+"""
+Prometheus metrics for routes, LLM calls, the database pool and the analysis
+cache, served at /metrics.
+
+With several worker processes (gunicorn), set PROMETHEUS_MULTIPROC_DIR to a
+directory that is emptied before the workers start; every worker then writes
+its samples there and /metrics merges them.
+"""
+
+import os
+import time
+from typing import Any
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import Engine, event
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if MULTIPROC_DIR:
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+DB_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+
+http_requests = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code.",
+    ["method", "route", "status"],
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time to the end of the response body, by route template.",
+    ["method", "route"],
+    buckets=HTTP_BUCKETS,
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests being served.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+llm_requests = Counter(
+    "llm_requests_total",
+    "Provider calls by outcome: success, error or cancelled.",
+    ["provider", "model", "outcome"],
+)
+llm_request_duration = Histogram(
+    "llm_request_duration_seconds",
+    "Provider call latency, including time queued by the governor.",
+    ["provider", "model"],
+    buckets=LLM_BUCKETS,
+)
+llm_tokens = Counter(
+    "llm_tokens_total",
+    "Provider-reported tokens by kind: prompt or completion.",
+    ["provider", "model", "kind"],
+)
+llm_cache_lookups = Counter(
+    "llm_cache_lookups_total",
+    "Analysis cache lookups by result: memory_hit, disk_hit or miss.",
+    ["result"],
+)
+db_pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time a request waited for a pooled database connection.",
+    buckets=DB_BUCKETS,
+)
+db_pool_connections_in_use = Gauge(
+    "db_pool_connections_in_use",
+    "Database connections checked out of the pool.",
+    multiprocess_mode="livesum",
+)
+
+
+def observe_llm_call(provider: str, model: str, outcome: str, seconds: float) -> None:
+    llm_requests.labels(provider, model, outcome).inc()
+    if outcome == "success":
+        llm_request_duration.labels(provider, model).observe(seconds)
+
+
+class MetricsMiddleware:
+    """
+    Count, time and track in-flight HTTP requests. Routes are labelled by
+    their template (/api/v1/items/{id}) so label values stay bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = 500
+        in_flight = http_requests_in_flight.labels(method)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            http_requests.labels(method, template, str(status)).inc()
+            http_request_duration.labels(method, template).observe(elapsed)
+
+
+def instrument_engine(engine: Engine) -> None:
+    @event.listens_for(engine, "checkout")
+    def _checkout(*_args: Any) -> None:
+        db_pool_connections_in_use.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(*_args: Any) -> None:
+        db_pool_connections_in_use.dec()
+
+
+def mark_process_dead(pid: int) -> None:
+    """gunicorn `child_exit` hook: drop a dead worker's live gauges."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
+
+
+async def metrics_endpoint(_request: Request) -> Response:
+    registry = REGISTRY
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
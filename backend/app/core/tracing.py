@@ -0,0 +1,200 @@
+"""
+OpenTelemetry tracing for requests, API dependencies, agents, LLM calls and SQL.
+
+Off unless TRACING_ENABLED is set. Spans are sampled per trace at
+TRACING_SAMPLE_RATIO (an incoming `traceparent` decides for its trace) and
+exported in batches over OTLP/HTTP or as JSON lines to a file. Unsampled spans
+are non-recording, so instrumented code only pays for creating them.
+"""
+
+import functools
+import inspect
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from typing import Any, TextIO, TypeVar
+
+from opentelemetry import propagate, trace
+from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import Span, SpanKind, Status, StatusCode
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import Settings
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+tracer = trace.get_tracer("app")
+_provider: TracerProvider | None = None
+_trace_file: TextIO | None = None
+
+# Longer statements are truncated on the span; values are never included
+MAX_STATEMENT_LENGTH = 1000
+
+
+def _file_exporter(path: str) -> SpanExporter:
+    global _trace_file
+    _trace_file = open(path, "a")  # noqa: SIM115 - closed in shutdown_tracing
+    return ConsoleSpanExporter(
+        out=_trace_file,
+        formatter=lambda span: span.to_json(indent=None) + "\n",
+    )
+
+
+def configure_tracing(settings: Settings) -> None:
+    global _provider
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.PROJECT_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    if settings.TRACING_EXPORTER == "file":
+        exporter = _file_exporter(settings.TRACING_FILE_PATH)
+    else:
+        exporter = OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _provider = provider
+
+
+def shutdown_tracing() -> None:
+    """Flush pending spans."""
+    global _trace_file
+    if _provider is not None:
+        _provider.shutdown()
+    if _trace_file is not None:
+        _trace_file.close()
+        _trace_file = None
+
+
+class TracingMiddleware:
+    """
+    One server span per HTTP request, continuing the caller's trace when a
+    `traceparent` header is sent, named after the matched route template.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        headers = {
+            k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]
+        }
+        with tracer.start_as_current_span(
+            method,
+            context=propagate.extract(headers),
+            kind=SpanKind.SERVER,
+            attributes={"http.request.method": method, "url.path": scope["path"]},
+        ) as span:
+
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    span.set_attribute("http.response.status_code", status)
+                    if status >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.update_name(f"{method} {route}")
+                    span.set_attribute("http.route", route)
+
+
+def traced_dependency(fn: F) -> F:
+    """Wrap a FastAPI dependency in a span; the signature FastAPI sees is unchanged."""
+    name = f"dependency {fn.__name__}"
+    attributes = {"fastapi.dependency": fn.__name__}
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with tracer.start_as_current_span(name, attributes=attributes):
+                return await fn(*args, **kwargs)
+
+        return async_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with tracer.start_as_current_span(name, attributes=attributes):
+            return fn(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def llm_span(
+    provider: str, model: str, max_tokens: int
+) -> AbstractContextManager[Span]:
+    return tracer.start_as_current_span(
+        "llm.chat",
+        kind=SpanKind.CLIENT,
+        attributes={
+            "gen_ai.system": provider,
+            "gen_ai.request.model": model,
+            "gen_ai.request.max_tokens": max_tokens,
+        },
+    )
+
+
+def set_usage_attributes(span: Span, response: Any, estimated_prompt: int) -> None:
+    if not span.is_recording():
+        return
+    span.set_attribute("llm.estimated_input_tokens", estimated_prompt)
+    usage = getattr(getattr(response, "_raw_response", None), "usage", None)
+    if usage is not None:
+        span.set_attribute("gen_ai.usage.input_tokens", usage.prompt_tokens)
+        span.set_attribute("gen_ai.usage.output_tokens", usage.completion_tokens)
+
+
+def _statement_type(statement: str) -> str:
+    words = statement.lstrip(" (\n").split(None, 1)
+    return words[0].upper() if words else "UNKNOWN"
+
+
+def instrument_engine_tracing(engine: Engine) -> None:
+    """A client span per SQL statement, with its type (SELECT, INSERT...)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn: Any, _cursor: Any, statement: str, *_args: Any) -> None:
+        operation = _statement_type(statement)
+        span = tracer.start_span(
+            f"db {operation}",
+            kind=SpanKind.CLIENT,
+            attributes={
+                "db.system": conn.dialect.name,
+                "db.operation": operation,
+                "db.statement": statement[:MAX_STATEMENT_LENGTH],
+            },
+        )
+        conn.info.setdefault("otel_spans", []).append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end(conn: Any, *_args: Any) -> None:
+        spans = conn.info.get("otel_spans")
+        if spans:
+            spans.pop().end()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context: Any) -> None:
+        spans = (
+            context.connection.info.get("otel_spans") if context.connection else None
+        )
+        if spans:
+            span = spans.pop()
+            span.record_exception(context.original_exception)
+            span.set_status(Status(StatusCode.ERROR))
+            span.end()
@@ -0,0 +1,11 @@
+"""
+Local OpenAI/Groq-compatible stand-in for load and latency testing.
+
+Run it with `python -m app.llm_standin --mode synthesize`, then point the
+backend at it with OPENAI_BASE_URL=http://localhost:8900/v1 and
+GROQ_BASE_URL=http://localhost:8900.
+"""
+
+from app.llm_standin.server import LatencyModel, StandinConfig, create_app
+
+__all__ = ["LatencyModel", "StandinConfig", "create_app"]
@@ -0,0 +1,49 @@
+import argparse
+import logging
+from pathlib import Path
+
+import uvicorn
+
+from app.llm_standin.server import UPSTREAMS, LatencyModel, StandinConfig, create_app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the LLM stand-in server.")
+    parser.add_argument(
+        "--mode", choices=("record", "replay", "synthesize"), default="synthesize"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--cassettes", type=Path, default=Path("llm-cassettes"))
+    parser.add_argument(
+        "--latency",
+        type=LatencyModel.parse,
+        help="fixed:S, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA (seconds)",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--error-status",
+        type=int,
+        action="append",
+        help="Status codes for injected errors (repeatable; default 429, 500, 503)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--openai-upstream", default=UPSTREAMS["openai"])
+    parser.add_argument("--groq-upstream", default=UPSTREAMS["groq"])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = StandinConfig(
+        mode=args.mode,
+        cassette_dir=args.cassettes,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_statuses=tuple(args.error_status or (429, 500, 503)),
+        seed=args.seed,
+        upstreams={"openai": args.openai_upstream, "groq": args.groq_upstream},
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
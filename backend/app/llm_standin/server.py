@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Literal
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.llm_standin.synthesize import numbered_item_count, synthesize
+
+logger = logging.getLogger(__name__)
+
+Mode = Literal["record", "replay", "synthesize"]
+
+# Path prefixes the SDKs append to their base URL
+OPENAI_PATH = "/v1/chat/completions"
+GROQ_PATH = "/openai/v1/chat/completions"
+UPSTREAMS = {
+    "openai": "https://api.openai.com",
+    "groq": "https://api.groq.com",
+}
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """
+    Seconds to wait before answering: `fixed:0.2`, `uniform:0.1,0.6` or
+    `lognormal:0.4,0.5` (median, sigma).
+    """
+
+    kind: Literal["fixed", "uniform", "lognormal"]
+    a: float
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, params = spec.partition(":")
+        values = [float(v) for v in params.split(",") if v]
+        if kind not in ("fixed", "uniform", "lognormal") or not values:
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+        return cls(kind, *values[:2])  # type: ignore[arg-type]
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.a
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        return rng.lognormvariate(math.log(self.a), self.b)
+
+
+@dataclass
+class StandinConfig:
+    mode: Mode = "synthesize"
+    cassette_dir: Path = Path("llm-cassettes")
+    # None replays recorded latency (replay) or answers at once (synthesize)
+    latency: LatencyModel | None = None
+    error_rate: float = 0.0
+    error_statuses: tuple[int, ...] = (429, 500, 503)
+    seed: int = 0
+    upstreams: dict[str, str] = field(default_factory=lambda: dict(UPSTREAMS))
+
+
+def cassette_key(body: dict[str, Any]) -> str:
+    relevant = {
+        k: body.get(k)
+        for k in ("model", "messages", "tools", "response_format", "temperature")
+    }
+    encoded = json.dumps(relevant, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def synthesize_completion(
+    body: dict[str, Any], rng: random.Random, key: str
+) -> dict[str, Any]:
+    """A chat completion whose tool call or JSON content matches the request's schema."""
+    message: dict[str, Any] = {"role": "assistant", "content": None}
+    finish_reason = "stop"
+    tools = body.get("tools") or []
+    response_format = body.get("response_format") or {}
+    # Batch prompts number their inputs; answer with one array item per input
+    user_messages = [m for m in body.get("messages", []) if m.get("role") == "user"]
+    item_count = (
+        numbered_item_count(str(user_messages[-1].get("content") or ""))
+        if user_messages
+        else None
+    )
+    if tools:
+        function = tools[0]["function"]
+        arguments = json.dumps(
+            synthesize(function.get("parameters", {}), rng, item_count=item_count)
+        )
+        message["tool_calls"] = [
+            {
+                "id": f"call_{key[:24]}",
+                "type": "function",
+                "function": {"name": function["name"], "arguments": arguments},
+            }
+        ]
+        finish_reason = "tool_calls"
+        output = arguments
+    elif "json_schema" in response_format:
+        schema = response_format["json_schema"]["schema"]
+        output = json.dumps(synthesize(schema, rng, item_count=item_count))
+        message["content"] = output
+    else:
+        output = "Stand-in response."
+        message["content"] = output
+
+    prompt_tokens = sum(
+        _approx_tokens(str(m.get("content") or "")) for m in body.get("messages", [])
+    )
+    completion_tokens = _approx_tokens(output)
+    return {
+        "id": f"chatcmpl-standin-{key[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "standin"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def _error(status: int, message: str) -> JSONResponse:
+    headers = {"retry-after": "1"} if status == 429 else None
+    return JSONResponse(
+        {"error": {"message": message, "type": "standin_error", "code": status}},
+        status_code=status,
+        headers=headers,
+    )
+
+
+def create_app(config: StandinConfig) -> FastAPI:
+    """
+    An OpenAI/Groq-compatible chat completions endpoint that records real
+    responses to cassettes, replays them, or synthesizes schema-valid ones.
+    """
+    app = FastAPI(title="LLM stand-in")
+    # Latency and error draws follow one seeded sequence; synthesized payloads
+    # are seeded per request so the same prompt always gets the same answer
+    rng = random.Random(config.seed)
+    config.cassette_dir.mkdir(parents=True, exist_ok=True)
+    upstream = httpx.AsyncClient(timeout=120)
+
+    async def handle(request: Request, provider: str) -> JSONResponse:
+        body = await request.json()
+        key = cassette_key(body)
+        cassette = config.cassette_dir / f"{key}.json"
+        latency = config.latency.sample(rng) if config.latency else None
+        if config.error_rate and rng.random() < config.error_rate:
+            await asyncio.sleep(latency or 0)
+            return _error(rng.choice(config.error_statuses), "Injected failure")
+
+        if config.mode == "synthesize":
+            await asyncio.sleep(latency or 0)
+            payload = synthesize_completion(
+                body, random.Random(f"{config.seed}:{key}"), key
+            )
+            return JSONResponse(payload)
+
+        if config.mode == "replay":
+            if not cassette.exists():
+                return _error(404, f"No cassette for request {key}")
+            recorded = json.loads(cassette.read_text())
+            await asyncio.sleep(
+                latency if latency is not None else recorded["latency_seconds"]
+            )
+            return JSONResponse(recorded["response"], status_code=recorded["status"])
+
+        start = time.perf_counter()
+        response = await upstream.post(
+            f"{config.upstreams[provider]}{request.url.path}",
+            json=body,
+            headers={"Authorization": request.headers.get("authorization", "")},
+        )
+        cassette.write_text(
+            json.dumps(
+                {
+                    "provider": provider,
+                    "request": body,
+                    "status": response.status_code,
+                    "latency_seconds": round(time.perf_counter() - start, 4),
+                    "response": response.json(),
+                },
+                indent=2,
+            )
+        )
+        logger.info(f"Recorded {provider} {body.get('model')} -> {cassette.name}")
+        return JSONResponse(response.json(), status_code=response.status_code)
+
+    @app.post(OPENAI_PATH)
+    async def openai_chat_completions(request: Request) -> JSONResponse:
+        return await handle(request, "openai")
+
+    @app.post(GROQ_PATH)
+    async def groq_chat_completions(request: Request) -> JSONResponse:
+        return await handle(request, "groq")
+
+    @app.on_event("shutdown")
+    async def close_upstream() -> None:
+        await upstream.aclose()
+
+    return app
@@ -0,0 +1,101 @@
+import random
+import re
+from typing import Any
+
+WORDS = (
+    "solid contact with a smooth tempo, the wind is helping slightly and the "
+    "green is receiving so a confident swing at the middle of the target works"
+).split()
+
+
+_NUMBERED_LINE = re.compile(r"^\s*(\d+)\.\s", re.MULTILINE)
+
+
+def numbered_item_count(prompt: str) -> int | None:
+    """
+    How many numbered items ("1. ...", "2. ...") a batch prompt lists, or None
+    when it lists fewer than two, so the top-level array in the answer can
+    carry one entry per input.
+    """
+    count = 0
+    for match in _NUMBERED_LINE.finditer(prompt):
+        if int(match.group(1)) == count + 1:
+            count += 1
+    return count if count >= 2 else None
+
+
+def _resolve(schema: dict[str, Any], root: dict[str, Any]) -> dict[str, Any]:
+    while "$ref" in schema:
+        # Only local refs ("#/$defs/Name") appear in pydantic schemas
+        node: Any = root
+        for part in schema["$ref"].lstrip("#/").split("/"):
+            node = node[part]
+        schema = {**node, **{k: v for k, v in schema.items() if k != "$ref"}}
+    return schema
+
+
+def _number(schema: dict[str, Any], rng: random.Random) -> float:
+    low = schema.get("minimum", schema.get("exclusiveMinimum", 0.0))
+    high = schema.get("maximum", schema.get("exclusiveMaximum", low + 1.0))
+    return round(rng.uniform(low, high), 3)
+
+
+def _string(schema: dict[str, Any], rng: random.Random) -> str:
+    max_length = schema.get("maxLength", 120)
+    min_length = schema.get("minLength", 1)
+    words = rng.sample(WORDS, k=min(len(WORDS), rng.randint(4, 12)))
+    text = " ".join(words).capitalize() + "."
+    if len(text) < min_length:
+        text = text.ljust(min_length, ".")
+    return text[:max_length]
+
+
+def synthesize(
+    schema: dict[str, Any],
+    rng: random.Random,
+    root: dict[str, Any] | None = None,
+    item_count: int | None = None,
+) -> Any:
+    """
+    Generate a value that validates against a pydantic-style JSON schema.
+
+    `item_count` sizes arrays that are not nested inside another array (within
+    the schema's minItems/maxItems); other arrays get the minimum, at least one.
+    """
+    root = root if root is not None else schema
+    schema = _resolve(schema, root)
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if "const" in schema:
+        return schema["const"]
+    for combinator in ("anyOf", "oneOf"):
+        if combinator in schema:
+            options = [s for s in schema[combinator] if s.get("type") != "null"]
+            return synthesize(
+                rng.choice(options or schema[combinator]), rng, root, item_count
+            )
+    if "allOf" in schema:
+        return synthesize(schema["allOf"][0], rng, root, item_count)
+
+    kind = schema.get("type", "object")
+    if kind == "object":
+        properties = schema.get("properties", {})
+        required = schema.get("required", list(properties))
+        return {
+            name: synthesize(properties[name], rng, root, item_count)
+            for name in properties
+            if name in required
+        }
+    if kind == "array":
+        count = max(schema.get("minItems", 1), item_count or 1)
+        count = min(count, schema.get("maxItems", count))
+        return [synthesize(schema.get("items", {}), rng, root) for _ in range(count)]
+    if kind == "number":
+        return _number(schema, rng)
+    if kind == "integer":
+        return int(_number(schema, rng))
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if kind == "null":
+        return None
+    return _string(schema, rng)
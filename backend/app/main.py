@@ -10,6 +10,12 @@ from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
 from app.core.config import settings
+from app.core.db import engine
+from app.core.metrics import MetricsMiddleware, instrument_engine, metrics_endpoint
+from app.core.tracing import TracingMiddleware, configure_tracing, instrument_engine_tracing, shutdown_tracing
+from app.agents.registry import get_agent_registry
+from app.services.cache import close_analysis_cache
+from app.services.llm_clients import close_client_registry, get_client_registry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -41,6 +47,16 @@ if settings.BACKEND_CORS_ORIGINS:
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+    instrument_engine(engine)
+
+if settings.TRACING_ENABLED:
+    configure_tracing(settings)
+    app.add_middleware(TracingMiddleware)
+    instrument_engine_tracing(engine)
+
 
 @app.get("/")
 async def root():
@@ -55,9 +71,14 @@ async def http_exception_handler(request, exc):
 async def startup_event():
     logger.info(f"Starting up {settings.APP_NAME}")
     # You can add any startup logic here, like database connections
+    get_client_registry()
+    get_agent_registry()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info(f"Shutting down {settings.APP_NAME}")
     # You can add any cleanup logic here
+    await close_client_registry()
+    close_analysis_cache()
+    shutdown_tracing()
 
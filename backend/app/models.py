@@ -127,23 +127,20 @@ class AgentResponse(BaseModel):
     result: str
     metadata: Optional[dict] = None
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 from .base import AgentType
-from app.config import get_settings
 
 class AgentConfig(BaseModel):
+    # Shared by every request an agent serves, so it must not change under them
+    model_config = ConfigDict(frozen=True)
+
     agent_type: AgentType
     user_context: str
     config_path: Optional[str] = None
-
-    @property
-    def openai_api_key(self):
-        return get_settings().OPENAI_API_KEY
-
-    @property
-    def groq_api_key(self):
-        return get_settings().GROQ_API_KEY
+    # Resolved once from a settings snapshot by the agent registry
+    openai_api_key: Optional[str] = Field(None, repr=False, exclude=True)
+    groq_api_key: Optional[str] = Field(None, repr=False, exclude=True)
     
 from enum import Enum
 
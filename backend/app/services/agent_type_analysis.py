@@ -1,42 +1,51 @@
 from app.config import get_settings, AgentTypeAnalysis
 from app.models.base import AgentType
 from app.models.user_input import UserInput
-from openai import OpenAI
-import instructor
+from app.services.completions import CompletionRequest, create_completion, create_completion_sync
+from app.services.llm_clients import LLMProvider
+from app.services.cascade import run_cascade, run_cascade_sync
+from app.services.compaction import compact_input
 
 settings = get_settings()
 
-def initialize_openai():
-    return instructor.patch(OpenAI(api_key=settings.OPENAI_API_KEY))
-
-def analyze_agent_types(user_input: UserInput) -> AgentTypeAnalysis:
+def build_agent_type_request(user_input: UserInput) -> CompletionRequest:
     config = settings.agent_type_analysis
     
     # Convert UserInput to string representation
-    input_text = f"Input Type: {user_input.input_type}\nContent: {user_input.content}"
+    input_text = f"Input Type: {user_input.input_type}\nContent: {compact_input(user_input.content, config)}"
     if user_input.file_path:
         input_text += f"\nFile Path: {user_input.file_path}"
     
-    prompt = config.prompt_template.format(text=input_text)
-    
-    client = initialize_openai()
-    response = client.chat.completions.create(
+    return CompletionRequest(
+        provider=LLMProvider.OPENAI,
         model=config.openai_model,
-        messages=[
-            {"role": "system", "content": config.system_message},
-            {"role": "user", "content": prompt}
-        ],
+        system_message=config.system_message,
+        prompt=config.prompt_template.format(text=input_text),
+        response_model=AgentTypeAnalysis,
         temperature=config.temperature,
         max_tokens=config.max_tokens,
-        response_model=AgentTypeAnalysis
     )
-    
-    return response
+
+def top_relevance(analysis: AgentTypeAnalysis) -> float:
+    return max(getattr(analysis, agent_type.value.lower()).confidence for agent_type in AgentType)
+
+async def analyze_agent_types(user_input: UserInput) -> AgentTypeAnalysis:
+    config = settings.agent_type_analysis
+    if config.cascade_enabled:
+        return await run_cascade("agent_type_analysis", config.cascade, build_agent_type_request(user_input), top_relevance)
+    return await create_completion(build_agent_type_request(user_input))
+
+def analyze_agent_types_sync(user_input: UserInput) -> AgentTypeAnalysis:
+    """Blocking variant of `analyze_agent_types` for scripts and notebooks."""
+    config = settings.agent_type_analysis
+    if config.cascade_enabled:
+        return run_cascade_sync("agent_type_analysis", config.cascade, build_agent_type_request(user_input), top_relevance)
+    return create_completion_sync(build_agent_type_request(user_input))
 
 # Example usage
 if __name__ == "__main__":
     sample_input = UserInput(input_type="text", content="I need advice on improving my golf swing and choosing the right club for a par 4 hole.")
-    result = analyze_agent_types(sample_input)
+    result = analyze_agent_types_sync(sample_input)
     for agent_type in AgentType:
         agent_result = getattr(result, agent_type.value.lower())
         print(f"{agent_type.value}:")
@@ -0,0 +1,209 @@
+import asyncio
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from app.config import get_settings
+from app.core.metrics import llm_cache_lookups
+
+settings = get_settings()
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "hits": self.hits, "hit_ratio": self.hit_ratio}
+
+
+class AnalysisCache:
+    """
+    Two-tier TTL cache for validated analysis objects.
+
+    The memory tier is a bounded LRU; the optional disk tier is a SQLite file
+    that survives restarts. Entries found on disk are promoted to memory.
+    Async callers use `aget`/`aset`, which keep SQLite reads, writes and
+    commits off the event loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        disk_path: str | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self._clock = clock
+        self._memory: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        # Memory tier and stats; the disk tier has its own lock so the event
+        # loop never waits on SQLite I/O running in a worker thread
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk: sqlite3.Connection | None = None
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache "
+                "(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value BLOB NOT NULL)"
+            )
+            self._disk.commit()
+
+    def get(self, key: str) -> Any | None:
+        value = self._memory_get(key)
+        if value is not None:
+            return value
+        return self._disk_lookup(key)
+
+    async def aget(self, key: str) -> Any | None:
+        """`get` for the event loop: a disk lookup runs in a worker thread."""
+        value = self._memory_get(key)
+        if value is not None:
+            return value
+        if self._disk is None:
+            return self._miss()
+        return await asyncio.to_thread(self._disk_lookup, key)
+
+    def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._memory_set(key, value, ttl)
+        self._disk_set(key, value, ttl)
+
+    async def aset(
+        self, key: str, value: Any, ttl_seconds: float | None = None
+    ) -> None:
+        """`set` for the event loop: the disk write runs in a worker thread."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._memory_set(key, value, ttl)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk_set, key, value, ttl)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        with self._disk_lock:
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM analysis_cache")
+                self._disk.commit()
+
+    def close(self) -> None:
+        with self._disk_lock:
+            if self._disk is not None:
+                self._disk.close()
+                self._disk = None
+
+    def _memory_get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at > self._clock():
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                llm_cache_lookups.labels("memory_hit").inc()
+                return value
+            del self._memory[key]
+            self.stats.expirations += 1
+            return None
+
+    def _memory_set(self, key: str, value: Any, ttl: float) -> None:
+        self._memory[key] = (self._clock() + ttl, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _miss(self) -> None:
+        with self._lock:
+            self.stats.misses += 1
+        llm_cache_lookups.labels("miss").inc()
+        return None
+
+    def _disk_lookup(self, key: str) -> Any | None:
+        disk_entry = self._disk_get(key)
+        if disk_entry is None:
+            return self._miss()
+        remaining, value = disk_entry
+        with self._lock:
+            self.stats.disk_hits += 1
+            self._memory_set(key, value, remaining)
+        llm_cache_lookups.labels("disk_hit").inc()
+        return value
+
+    def _disk_get(self, key: str) -> tuple[float, Any] | None:
+        with self._disk_lock:
+            if self._disk is None:
+                return None
+            row = self._disk.execute(
+                "SELECT expires_at, value FROM analysis_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            expires_at, blob = row
+            remaining = expires_at - time.time()
+            if remaining > 0:
+                return remaining, pickle.loads(blob)
+            self._disk.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+            self._disk.commit()
+        with self._lock:
+            self.stats.expirations += 1
+        return None
+
+    def _disk_set(self, key: str, value: Any, ttl: float) -> None:
+        with self._disk_lock:
+            if self._disk is None:
+                return
+            # Wall-clock expiry, so disk entries stay meaningful across restarts
+            self._disk.execute(
+                "INSERT OR REPLACE INTO analysis_cache VALUES (?, ?, ?)",
+                (key, time.time() + ttl, pickle.dumps(value)),
+            )
+            self._disk.commit()
+
+
+_cache: AnalysisCache | None = None
+
+
+def get_analysis_cache() -> AnalysisCache | None:
+    global _cache
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = AnalysisCache(
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+            disk_path=settings.LLM_CACHE_DISK_PATH,
+        )
+    return _cache
+
+
+def close_analysis_cache() -> None:
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
@@ -0,0 +1,149 @@
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from app.config import CascadeTier
+from app.services.completions import (
+    CompletionRequest,
+    create_completion,
+    create_completion_sync,
+)
+from app.services.llm_clients import LLMProvider
+
+LATENCY_WINDOW = 200
+
+
+@dataclass
+class TierStats:
+    """How often one tier of a cascade answered, escalated or failed."""
+
+    calls: int = 0
+    answered: int = 0
+    escalated: int = 0
+    errors: int = 0
+    latencies: deque[float] = field(
+        default_factory=lambda: deque(maxlen=LATENCY_WINDOW)
+    )
+
+    @property
+    def hit_rate(self) -> float:
+        return self.answered / self.calls if self.calls else 0.0
+
+    def percentile(self, quantile: float) -> float | None:
+        samples = sorted(self.latencies)
+        if not samples:
+            return None
+        return samples[max(0, math.ceil(quantile * len(samples)) - 1)]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "answered": self.answered,
+            "escalated": self.escalated,
+            "errors": self.errors,
+            "hit_rate": self.hit_rate,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+        }
+
+
+_stats: dict[str, dict[str, TierStats]] = {}
+_lock = threading.Lock()
+
+
+def _tier_stats(analysis: str, tier: CascadeTier) -> TierStats:
+    with _lock:
+        tiers = _stats.setdefault(analysis, {})
+        return tiers.setdefault(f"{tier.provider}:{tier.model}", TierStats())
+
+
+def _tier_request(request: CompletionRequest, tier: CascadeTier) -> CompletionRequest:
+    return replace(request, provider=LLMProvider(tier.provider), model=tier.model)
+
+
+def _accept(
+    analysis: str,
+    tier: CascadeTier,
+    last: bool,
+    result: Any,
+    confidence: Callable[[Any], float],
+    seconds: float,
+) -> bool:
+    stats = _tier_stats(analysis, tier)
+    with _lock:
+        stats.calls += 1
+        stats.latencies.append(seconds)
+        if last or confidence(result) >= tier.min_confidence:
+            stats.answered += 1
+            return True
+        stats.escalated += 1
+        return False
+
+
+def _record_error(analysis: str, tier: CascadeTier) -> None:
+    stats = _tier_stats(analysis, tier)
+    with _lock:
+        stats.calls += 1
+        stats.errors += 1
+
+
+async def run_cascade(
+    analysis: str,
+    tiers: Sequence[CascadeTier],
+    request: CompletionRequest,
+    confidence: Callable[[Any], float],
+) -> Any:
+    """
+    Send `request` to each tier's model in order, returning the first answer
+    whose `confidence` reaches that tier's threshold. A tier that fails also
+    escalates; the last tier's answer or error is final.
+    """
+    for i, tier in enumerate(tiers):
+        last = i == len(tiers) - 1
+        start = time.perf_counter()
+        try:
+            result = await create_completion(_tier_request(request, tier))
+        except Exception:
+            _record_error(analysis, tier)
+            if last:
+                raise
+            continue
+        seconds = time.perf_counter() - start
+        if _accept(analysis, tier, last, result, confidence, seconds):
+            return result
+    raise ValueError(f"No cascade tiers configured for {analysis}")
+
+
+def run_cascade_sync(
+    analysis: str,
+    tiers: Sequence[CascadeTier],
+    request: CompletionRequest,
+    confidence: Callable[[Any], float],
+) -> Any:
+    """Blocking variant of `run_cascade` for scripts and notebooks."""
+    for i, tier in enumerate(tiers):
+        last = i == len(tiers) - 1
+        start = time.perf_counter()
+        try:
+            result = create_completion_sync(_tier_request(request, tier))
+        except Exception:
+            _record_error(analysis, tier)
+            if last:
+                raise
+            continue
+        seconds = time.perf_counter() - start
+        if _accept(analysis, tier, last, result, confidence, seconds):
+            return result
+    raise ValueError(f"No cascade tiers configured for {analysis}")
+
+
+def cascade_snapshot() -> dict[str, dict[str, dict[str, Any]]]:
+    with _lock:
+        return {
+            analysis: {name: stats.as_dict() for name, stats in tiers.items()}
+            for analysis, tiers in _stats.items()
+        }
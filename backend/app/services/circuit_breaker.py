@@ -0,0 +1,236 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from enum import Enum
+from typing import Any, TypeVar
+
+from app.config import get_settings
+from app.services.governor import LLMOverloadedError, is_retryable
+from app.services.llm_clients import LLMProvider
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(LLMOverloadedError):
+    """The provider's breaker is open, so the call was not attempted."""
+
+
+def counts_as_failure(exc: BaseException) -> bool:
+    # Timeouts, 429/5xx and connection errors point at the provider;
+    # a 400 or a validation failure does not
+    return isinstance(exc, asyncio.TimeoutError) or is_retryable(exc)
+
+
+class CircuitBreaker:
+    """
+    Opens when the error rate or slow-call rate over the last `window` calls
+    crosses its threshold. While open, calls fail fast with CircuitOpenError.
+    After `open_seconds` the breaker lets `half_open_calls` probes through:
+    if they all succeed it closes, and any failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_call_rate_threshold: float = 0.8,
+        window: int = 20,
+        min_calls: int = 10,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.rejected = 0
+        self.times_opened = 0
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        # (failed, slow) for each recent call
+        self._outcomes: deque[tuple[bool, bool]] = deque(maxlen=window)
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> CircuitState:
+        if (
+            self._state is CircuitState.OPEN
+            and self._clock() - self._opened_at >= self.open_seconds
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        return self._state
+
+    def check(self) -> None:
+        """
+        Fail fast while open, without admitting a call, so callers can skip
+        queueing and rate limiting for a provider that will be rejected anyway.
+        """
+        with self._lock:
+            if self._current_state() is not CircuitState.OPEN:
+                return
+            error = self._reject()
+        raise error
+
+    def _acquire(self) -> bool:
+        """Admit a call; returns whether it is a half-open probe."""
+        with self._lock:
+            state = self._current_state()
+            if state is CircuitState.CLOSED:
+                return False
+            if (
+                state is CircuitState.HALF_OPEN
+                and self._probes_in_flight + self._probe_successes
+                < self.half_open_calls
+            ):
+                self._probes_in_flight += 1
+                return True
+            error = self._reject()
+        raise error
+
+    def _reject(self) -> CircuitOpenError:
+        self.rejected += 1
+        retry_after = max(0.0, self.open_seconds - (self._clock() - self._opened_at))
+        return CircuitOpenError(
+            f"Circuit for {self.name} is open", retry_after=max(1.0, retry_after)
+        )
+
+    def _record(self, probe: bool, failed: bool, seconds: float) -> None:
+        with self._lock:
+            if probe:
+                self._probes_in_flight -= 1
+                if self._state is not CircuitState.HALF_OPEN:
+                    return
+                if failed:
+                    self._trip()
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_calls:
+                        self._state = CircuitState.CLOSED
+                        self._outcomes.clear()
+                return
+
+            self._outcomes.append((failed, seconds >= self.slow_call_seconds))
+            if self._state is not CircuitState.CLOSED:
+                return
+            calls = len(self._outcomes)
+            if calls < self.min_calls:
+                return
+            failures = sum(failed for failed, _ in self._outcomes)
+            slow = sum(slow for _, slow in self._outcomes)
+            if (
+                failures / calls >= self.failure_rate_threshold
+                or slow / calls >= self.slow_call_rate_threshold
+            ):
+                self._trip()
+
+    def _release(self, probe: bool) -> None:
+        if probe:
+            with self._lock:
+                self._probes_in_flight -= 1
+
+    def _trip(self) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self.times_opened += 1
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        probe = self._acquire()
+        start = self._clock()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            elapsed = self._clock() - start
+            if elapsed >= self.slow_call_seconds:
+                # The caller gave up on a call that was already slow. Callers'
+                # deadlines usually end a hanging call before it can finish, so
+                # this is how a hanging provider shows up at all; a probe that
+                # never answered has not shown recovery.
+                self._record(probe, failed=probe, seconds=elapsed)
+            else:
+                self._release(probe)
+            raise
+        except Exception as e:
+            if counts_as_failure(e):
+                self._record(probe, True, self._clock() - start)
+            else:
+                self._release(probe)
+            raise
+        self._record(probe, False, self._clock() - start)
+        return result
+
+    def call_sync(self, fn: Callable[[], T]) -> T:
+        probe = self._acquire()
+        start = self._clock()
+        try:
+            result = fn()
+        except Exception as e:
+            if counts_as_failure(e):
+                self._record(probe, True, self._clock() - start)
+            else:
+                self._release(probe)
+            raise
+        self._record(probe, False, self._clock() - start)
+        return result
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            calls = len(self._outcomes)
+            failures = sum(failed for failed, _ in self._outcomes)
+            return {
+                "state": state.value,
+                "recent_calls": calls,
+                "recent_failure_rate": failures / calls if calls else 0.0,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
+
+
+_breakers: dict[tuple[LLMProvider, str], CircuitBreaker] = {}
+
+
+def get_circuit_breaker(provider: LLMProvider, model: str) -> CircuitBreaker:
+    breaker = _breakers.get((provider, model))
+    if breaker is None:
+        breaker = CircuitBreaker(
+            f"{provider.value}:{model}",
+            failure_rate_threshold=settings.LLM_BREAKER_FAILURE_RATE,
+            slow_call_seconds=settings.LLM_BREAKER_SLOW_CALL_SECONDS,
+            slow_call_rate_threshold=settings.LLM_BREAKER_SLOW_CALL_RATE,
+            window=settings.LLM_BREAKER_WINDOW,
+            min_calls=settings.LLM_BREAKER_MIN_CALLS,
+            open_seconds=settings.LLM_BREAKER_OPEN_SECONDS,
+            half_open_calls=settings.LLM_BREAKER_HALF_OPEN_CALLS,
+        )
+        _breakers[(provider, model)] = breaker
+    return breaker
+
+
+def circuit_breaker_snapshot() -> dict[str, dict[str, Any]]:
+    return {breaker.name: breaker.snapshot() for breaker in list(_breakers.values())}
@@ -0,0 +1,56 @@
+from pydantic import BaseModel, Field
+
+from app.config import AgentTypeAnalysis, get_settings
+from app.models.user_input import UserInput
+from app.services.compaction import compact_input
+from app.services.completions import (
+    CompletionRequest,
+    create_completion,
+    create_completion_sync,
+)
+from app.services.llm_clients import LLMProvider
+from app.services.sentiment_analysis import SentimentAnalysis
+
+settings = get_settings()
+
+
+class CombinedAnalysis(BaseModel):
+    sentiment: SentimentAnalysis = Field(
+        ..., description="Sentiment analysis of the input"
+    )
+    agent_types: AgentTypeAnalysis = Field(
+        ..., description="Relevance of the input to each agent type"
+    )
+
+
+def build_combined_request(user_input: UserInput) -> CompletionRequest:
+    config = settings.combined_analysis
+    content = compact_input(user_input.content, config)
+    input_text = f"Input Type: {user_input.input_type}\nContent: {content}"
+    if user_input.file_path:
+        input_text += f"\nFile Path: {user_input.file_path}"
+    return CompletionRequest(
+        provider=LLMProvider.OPENAI,
+        model=config.openai_model,
+        system_message=config.system_message,
+        prompt=config.prompt_template.format(text=input_text),
+        response_model=CombinedAnalysis,
+        temperature=config.temperature,
+        max_tokens=config.max_tokens,
+    )
+
+
+def _tag_tier(result: CombinedAnalysis) -> CombinedAnalysis:
+    return result.model_copy(
+        update={"sentiment": result.sentiment.model_copy(update={"tier": "llm"})}
+    )
+
+
+async def analyze_combined(user_input: UserInput) -> CombinedAnalysis:
+    """Sentiment and agent-type relevance for `user_input` from a single LLM call."""
+    return _tag_tier(await create_completion(build_combined_request(user_input)))
+
+
+def analyze_combined_sync(user_input: UserInput) -> CombinedAnalysis:
+    """Blocking variant of `analyze_combined` for scripts and notebooks."""
+    return _tag_tier(create_completion_sync(build_combined_request(user_input)))
@@ -0,0 +1,202 @@
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+from app.config import get_settings
+from app.services.local_sentiment import LEXICON
+
+settings = get_settings()
+
+# Word pieces and punctuation each cost about one token; long words cost more
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+LONG_WORD_CHARS = 8
+# Role markers and separators the chat format adds to every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+BOILERPLATE_PATTERNS = [
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"^sent from my \w+",
+        r"^on .+ wrote:$",
+        r"^>",
+        r"^-- ?$",
+        r"^(this (e-?mail|message)|confidentiality notice|disclaimer)\b.*",
+        r"^(unsubscribe|view in browser|click here)\b",
+        r"^(thanks|thank you|cheers|regards|best)[,!.]?$",
+    )
+]
+GOLF_TERMS = frozenset(
+    {
+        "golf", "hole", "holes", "par", "birdie", "bogey", "eagle", "tee", "fairway",
+        "green", "greens", "rough", "bunker", "sand", "trap", "hazard", "water",
+        "pin", "flag", "putt", "putter", "putting", "chip", "pitch", "drive",
+        "driver", "wood", "hybrid", "iron", "irons", "wedge", "club", "clubs",
+        "yards", "yardage", "carry", "wind", "lie", "slope", "break", "swing",
+        "grip", "stance", "handicap", "round", "course", "score", "slice", "hook",
+        "draw", "fade", "caddie", "shot", "shots", "approach", "layup",
+    }
+)  # fmt: skip
+_RELEVANT_TERMS = GOLF_TERMS | {phrase for phrase in LEXICON if " " not in phrase}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count without a tokenizer."""
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        tokens += 1 + len(piece) // LONG_WORD_CHARS
+    return tokens
+
+
+def estimate_message_tokens(*contents: str) -> int:
+    return sum(estimate_tokens(c) + MESSAGE_OVERHEAD_TOKENS for c in contents)
+
+
+@dataclass
+class Compaction:
+    text: str
+    original_tokens: int
+    tokens: int
+
+    @property
+    def compacted(self) -> bool:
+        return self.tokens < self.original_tokens
+
+
+def _is_boilerplate(sentence: str) -> bool:
+    return any(pattern.search(sentence) for pattern in BOILERPLATE_PATTERNS)
+
+
+def _relevance(sentence: str) -> int:
+    words = re.findall(r"[a-z]+", sentence.lower())
+    score = sum(word in _RELEVANT_TERMS for word in words)
+    # Yardages and questions usually carry the actual ask
+    score += 2 * bool(re.search(r"\d+\s*(yards?|yds?|m)\b", sentence.lower()))
+    score += sentence.rstrip().endswith("?")
+    return score
+
+
+def _truncate(text: str, budget: int) -> str:
+    kept: list[str] = []
+    used = 0
+    for word in text.split():
+        cost = estimate_tokens(word)
+        if used + cost > budget:
+            break
+        kept.append(word)
+        used += cost
+    return " ".join(kept)
+
+
+def compact(text: str, budget: int) -> Compaction:
+    """
+    Fit `text` into about `budget` tokens: drop repeated sentences and
+    boilerplate, then keep the most golf-relevant sentences in their original
+    order. Text already within budget is returned unchanged.
+    """
+    original_tokens = estimate_tokens(text)
+    if original_tokens <= budget:
+        return Compaction(text, original_tokens, original_tokens)
+
+    sentences: list[str] = []
+    seen: set[str] = set()
+    for raw in _SENTENCE_RE.split(text):
+        sentence = raw.strip()
+        key = " ".join(sentence.lower().split())
+        if not sentence or key in seen or _is_boilerplate(sentence):
+            continue
+        seen.add(key)
+        sentences.append(sentence)
+
+    costs = [estimate_tokens(sentence) for sentence in sentences]
+    if sum(costs) <= budget:
+        kept = sentences
+    else:
+        # Most relevant first; earlier sentences win ties
+        ranked = sorted(
+            range(len(sentences)), key=lambda i: (-_relevance(sentences[i]), i)
+        )
+        chosen: set[int] = set()
+        used = 0
+        for i in ranked:
+            if used + costs[i] <= budget:
+                chosen.add(i)
+                used += costs[i]
+        if not chosen and ranked:
+            # A single sentence larger than the whole budget
+            return _result(_truncate(sentences[ranked[0]], budget), original_tokens)
+        kept = [sentences[i] for i in sorted(chosen)]
+    return _result(" ".join(kept), original_tokens)
+
+
+def _result(text: str, original_tokens: int) -> Compaction:
+    tokens = estimate_tokens(text)
+    token_stats.record_compaction(original_tokens, tokens)
+    return Compaction(text, original_tokens, tokens)
+
+
+def compact_input(text: str, config: Any) -> str:
+    """Compact user content to the input budget of an analysis config."""
+    budget = config.max_input_tokens or int(
+        config.max_tokens * settings.LLM_INPUT_TOKEN_RATIO
+    )
+    return compact(text, budget).text
+
+
+class TokenStats:
+    """
+    Compaction savings, and estimated versus provider-reported prompt tokens
+    per provider:model so the estimator can be calibrated.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.compacted_inputs = 0
+        self.tokens_saved = 0
+        self._usage: dict[str, dict[str, int]] = {}
+
+    def record_compaction(self, original_tokens: int, tokens: int) -> None:
+        with self._lock:
+            self.compacted_inputs += 1
+            self.tokens_saved += original_tokens - tokens
+
+    def record_usage(
+        self, route: str, estimated_prompt: int, actual_prompt: int, completion: int
+    ) -> None:
+        with self._lock:
+            usage = self._usage.setdefault(
+                route,
+                {
+                    "calls": 0,
+                    "estimated_prompt": 0,
+                    "actual_prompt": 0,
+                    "completion": 0,
+                },
+            )
+            usage["calls"] += 1
+            usage["estimated_prompt"] += estimated_prompt
+            usage["actual_prompt"] += actual_prompt
+            usage["completion"] += completion
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "compacted_inputs": self.compacted_inputs,
+                "tokens_saved": self.tokens_saved,
+                "usage": {
+                    route: {
+                        **usage,
+                        # >1 means the estimator undercounts for this route
+                        "actual_to_estimated": (
+                            usage["actual_prompt"] / usage["estimated_prompt"]
+                            if usage["estimated_prompt"]
+                            else None
+                        ),
+                    }
+                    for route, usage in self._usage.items()
+                },
+            }
+
+
+token_stats = TokenStats()
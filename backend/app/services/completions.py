@@ -0,0 +1,224 @@
+import asyncio
+import functools
+import hashlib
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.config import get_settings
+from app.core.metrics import llm_tokens, observe_llm_call
+from app.core.tracing import llm_span, set_usage_attributes
+from app.services.cache import get_analysis_cache
+from app.services.circuit_breaker import get_circuit_breaker
+from app.services.compaction import (
+    estimate_message_tokens,
+    estimate_tokens,
+    token_stats,
+)
+from app.services.governor import get_governor
+from app.services.llm_clients import LLMProvider, get_client_registry
+from app.services.repair import repairing
+from app.services.routing import latency_tracker
+from app.services.singleflight import completion_flights
+
+settings = get_settings()
+
+# Provider calls abandoned mid-flight (client gone, hedge lost), per provider:model
+cancelled_calls: Counter[str] = Counter()
+
+
+def normalize_prompt(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+@functools.cache
+def _schema_tokens(response_model: type[BaseModel]) -> int:
+    # instructor sends the response model's JSON schema as the tool definition
+    return estimate_tokens(json.dumps(response_model.model_json_schema()))
+
+
+@dataclass(frozen=True)
+class CompletionRequest:
+    provider: LLMProvider
+    model: str
+    system_message: str
+    prompt: str
+    response_model: type[BaseModel]
+    temperature: float
+    max_tokens: int
+
+    @property
+    def messages(self) -> list[dict[str, str]]:
+        return [
+            {"role": "system", "content": self.system_message},
+            {"role": "user", "content": self.prompt},
+        ]
+
+    @property
+    def route_key(self) -> tuple[LLMProvider, str]:
+        return self.provider, self.model
+
+    @property
+    def estimated_prompt_tokens(self) -> int:
+        return estimate_message_tokens(
+            self.system_message, self.prompt
+        ) + _schema_tokens(self.response_model)
+
+    @property
+    def estimated_tokens(self) -> int:
+        # Budget for rate limiting: the prompt plus the completion allowance
+        return self.estimated_prompt_tokens + self.max_tokens
+
+    @property
+    def cache_key(self) -> str:
+        payload = {
+            "provider": self.provider.value,
+            "model": self.model,
+            "system": normalize_prompt(self.system_message),
+            "prompt": normalize_prompt(self.prompt),
+            "response_model": self.response_model.__qualname__,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
+        encoded = json.dumps(payload, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def create_kwargs(self) -> dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": self.messages,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            # Malformed output is repaired locally first; only what cannot be
+            # fixed is re-asked
+            "response_model": repairing(self.response_model),
+            "max_retries": settings.LLM_REASK_RETRIES + 1,
+        }
+
+    def record_usage(self, result: Any) -> None:
+        """Log estimated against provider-reported prompt tokens."""
+        usage = getattr(getattr(result, "_raw_response", None), "usage", None)
+        if usage is None:
+            return
+        token_stats.record_usage(
+            f"{self.provider.value}:{self.model}",
+            self.estimated_prompt_tokens,
+            usage.prompt_tokens,
+            usage.completion_tokens,
+        )
+        provider = self.provider.value
+        llm_tokens.labels(provider, self.model, "prompt").inc(usage.prompt_tokens)
+        llm_tokens.labels(provider, self.model, "completion").inc(
+            usage.completion_tokens
+        )
+
+    def as_declared(self, result: Any) -> Any:
+        """
+        Rebuild instructor's result as the declared response model; its own
+        generated subclasses cannot be pickled by the disk cache.
+        """
+        model = self.response_model
+        if type(result) is model or not isinstance(result, model):
+            return result
+        return model.model_construct(
+            _fields_set=result.model_fields_set, **dict(result)
+        )
+
+
+async def create_completion(request: CompletionRequest) -> Any:
+    cache = get_analysis_cache()
+    if cache is not None:
+        cached = await cache.aget(request.cache_key)
+        if cached is not None:
+            return cached
+
+    async def call_provider() -> Any:
+        client = get_client_registry().get_async(request.provider)
+        governor = get_governor(request.provider, request.model)
+        breaker = get_circuit_breaker(request.provider, request.model)
+        provider, model = request.provider.value, request.model
+
+        async def attempt() -> Any:
+            # The breaker and routing time each provider attempt inside the
+            # governor's retries, not its queueing, throttling or backoff
+            attempt_start = time.perf_counter()
+            try:
+                result = await breaker.call(
+                    lambda: client.chat.completions.create(**request.create_kwargs())
+                )
+            except asyncio.CancelledError:
+                # A lost hedge: the route was at least this slow
+                latency_tracker.record_censored(
+                    request.route_key, time.perf_counter() - attempt_start
+                )
+                raise
+            latency_tracker.record(
+                request.route_key, time.perf_counter() - attempt_start
+            )
+            return result
+
+        start = time.perf_counter()
+        try:
+            with llm_span(provider, model, request.max_tokens) as span:
+                breaker.check()
+                response = await governor.run(
+                    attempt, estimated_tokens=request.estimated_tokens
+                )
+                set_usage_attributes(span, response, request.estimated_prompt_tokens)
+        except asyncio.CancelledError:
+            cancelled_calls[f"{provider}:{model}"] += 1
+            observe_llm_call(provider, model, "cancelled", time.perf_counter() - start)
+            raise
+        except Exception:
+            observe_llm_call(provider, model, "error", time.perf_counter() - start)
+            raise
+        elapsed = time.perf_counter() - start
+        observe_llm_call(provider, model, "success", elapsed)
+        request.record_usage(response)
+        response = request.as_declared(response)
+        if cache is not None:
+            await cache.aset(request.cache_key, response)
+        return response
+
+    return await completion_flights.do(request.cache_key, call_provider)
+
+
+def create_completion_sync(request: CompletionRequest) -> Any:
+    cache = get_analysis_cache()
+    if cache is not None:
+        cached = cache.get(request.cache_key)
+        if cached is not None:
+            return cached
+    client = get_client_registry().get(request.provider)
+    governor = get_governor(request.provider, request.model)
+    breaker = get_circuit_breaker(request.provider, request.model)
+    provider, model = request.provider.value, request.model
+
+    def attempt() -> Any:
+        attempt_start = time.perf_counter()
+        result = breaker.call_sync(
+            lambda: client.chat.completions.create(**request.create_kwargs())
+        )
+        latency_tracker.record(request.route_key, time.perf_counter() - attempt_start)
+        return result
+
+    start = time.perf_counter()
+    try:
+        with llm_span(provider, model, request.max_tokens) as span:
+            breaker.check()
+            response = governor.run_sync(attempt)
+            set_usage_attributes(span, response, request.estimated_prompt_tokens)
+    except Exception:
+        observe_llm_call(provider, model, "error", time.perf_counter() - start)
+        raise
+    elapsed = time.perf_counter() - start
+    observe_llm_call(provider, model, "success", elapsed)
+    request.record_usage(response)
+    response = request.as_declared(response)
+    if cache is not None:
+        cache.set(request.cache_key, response)
+    return response
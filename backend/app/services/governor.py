@@ -0,0 +1,206 @@
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from email.utils import parsedate_to_datetime
+from typing import Any, TypeVar
+
+import groq
+import openai
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+)
+
+from app.config import ProviderLimits, get_settings
+from app.services.llm_clients import LLMProvider
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+RETRYABLE_CONNECTION_ERRORS = (openai.APIConnectionError, groq.APIConnectionError)
+
+
+class LLMOverloadedError(Exception):
+    """The provider's wait queue is full; the caller should back off and retry."""
+
+    def __init__(self, message: str, retry_after: float = 1.0) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Per-minute budget that refills continuously.
+
+    `reserve` debits immediately and returns how long the caller must wait for
+    the debt to be repaid, so concurrent callers are spaced out in arrival order.
+    """
+
+    def __init__(
+        self, per_minute: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self._clock = clock
+        self._updated = clock()
+
+    def reserve(self, amount: float) -> float:
+        now = self._clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        self.tokens -= min(amount, self.capacity)
+        return max(0.0, -self.tokens / self.rate)
+
+
+def retry_after_seconds(exc: BaseException | None) -> float | None:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    if (value := headers.get("retry-after-ms")) is not None:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    status_code = getattr(exc, "status_code", None)
+    if isinstance(status_code, int):
+        return status_code == 429 or status_code >= 500
+    return isinstance(exc, RETRYABLE_CONNECTION_ERRORS)
+
+
+class ProviderGovernor:
+    """
+    Outbound limits for one provider/model: a concurrency cap with a bounded
+    wait queue, RPM and TPM token buckets, and retries of 429/5xx responses
+    with jittered exponential backoff that honors Retry-After. A concurrency
+    slot is held only while a provider attempt runs.
+    """
+
+    def __init__(
+        self,
+        limits: ProviderLimits,
+        *,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+    ) -> None:
+        self.limits = limits
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.requests = TokenBucket(limits.requests_per_minute)
+        self.tokens = TokenBucket(limits.tokens_per_minute)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.retries = 0
+        self._semaphore = asyncio.Semaphore(limits.max_concurrency)
+
+    async def run(self, fn: Callable[[], Awaitable[T]], *, estimated_tokens: int) -> T:
+        retrying = AsyncRetrying(**self._retry_options())
+        return await retrying(self._attempt, fn, estimated_tokens)
+
+    async def _attempt(
+        self, fn: Callable[[], Awaitable[T]], estimated_tokens: int
+    ) -> T:
+        # Wait for rate budget first and hold a concurrency slot only for the
+        # provider call itself, so neither throttling nor retry backoff pins one
+        delay = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+        if delay:
+            await asyncio.sleep(delay)
+        if self._semaphore.locked() and self.waiting >= self.limits.max_queue:
+            self.rejected += 1
+            raise LLMOverloadedError("LLM provider is at capacity, try again shortly")
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            return await fn()
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def run_sync(self, fn: Callable[[], T]) -> T:
+        """Retry-only path for blocking scripts; they do not share the async limits."""
+        return Retrying(**self._retry_options())(fn)
+
+    def _retry_options(self) -> dict[str, Any]:
+        return {
+            "stop": stop_after_attempt(self.max_retries + 1),
+            "retry": retry_if_exception(is_retryable),
+            "wait": self._backoff,
+            "before_sleep": self._count_retry,
+            "reraise": True,
+        }
+
+    def _backoff(self, retry_state: RetryCallState) -> float:
+        assert retry_state.outcome is not None
+        retry_after = retry_after_seconds(retry_state.outcome.exception())
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        # Full jitter: uniform over the exponential window
+        window = self.backoff_base * 2 ** (retry_state.attempt_number - 1)
+        return random.uniform(0, min(window, self.backoff_max))
+
+    def _count_retry(self, _retry_state: RetryCallState) -> None:
+        self.retries += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "retries": self.retries,
+        }
+
+
+_governors: dict[tuple[LLMProvider, str], ProviderGovernor] = {}
+
+
+def get_governor(provider: LLMProvider, model: str) -> ProviderGovernor:
+    governor = _governors.get((provider, model))
+    if governor is None:
+        limits = settings.LLM_LIMITS.get(
+            f"{provider.value}:{model}", settings.LLM_DEFAULT_LIMITS
+        )
+        governor = ProviderGovernor(
+            limits,
+            max_retries=settings.LLM_MAX_RETRIES,
+            backoff_base=settings.LLM_RETRY_BACKOFF_BASE,
+            backoff_max=settings.LLM_RETRY_BACKOFF_MAX,
+        )
+        _governors[(provider, model)] = governor
+    return governor
+
+
+def governor_snapshot() -> dict[str, dict[str, Any]]:
+    return {
+        f"{provider.value}:{model}": governor.snapshot()
+        for (provider, model), governor in list(_governors.items())
+    }
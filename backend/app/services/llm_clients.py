@@ -0,0 +1,162 @@
+import threading
+from enum import Enum
+from typing import Any
+
+import httpx
+import instructor
+from groq import AsyncGroq, Groq
+from openai import AsyncOpenAI, OpenAI
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class LLMProvider(str, Enum):
+    GROQ = "groq"
+    OPENAI = "openai"
+
+
+class LLMClientRegistry:
+    """
+    Long-lived, instructor-patched provider clients.
+
+    Each provider gets one client backed by its own keep-alive connection pool,
+    so analyses reuse open connections instead of paying a TLS handshake per call.
+    Sync clients serve scripts; async clients serve the API on the event loop.
+    SDK-level retries are disabled because the provider governor owns retries.
+    """
+
+    def __init__(
+        self,
+        *,
+        api_keys: dict[LLMProvider, str | None],
+        base_urls: dict[LLMProvider, str | None] | None = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 5.0,
+        timeout: float = 60.0,
+    ) -> None:
+        self.api_keys = api_keys
+        self.base_urls = base_urls or {}
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self._clients: dict[LLMProvider, Any] = {}
+        self._async_clients: dict[LLMProvider, Any] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, **overrides: Any) -> "LLMClientRegistry":
+        options: dict[str, Any] = {
+            "api_keys": {
+                LLMProvider.GROQ: settings.GROQ_API_KEY,
+                LLMProvider.OPENAI: settings.OPENAI_API_KEY,
+            },
+            "base_urls": {
+                LLMProvider.GROQ: settings.GROQ_BASE_URL,
+                LLMProvider.OPENAI: settings.OPENAI_BASE_URL,
+            },
+            "max_connections": settings.LLM_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            "keepalive_expiry": settings.LLM_KEEPALIVE_EXPIRY,
+            "connect_timeout": settings.LLM_CONNECT_TIMEOUT,
+            "timeout": settings.LLM_TIMEOUT,
+        }
+        return cls(**{**options, **overrides})
+
+    def get(self, provider: LLMProvider) -> Any:
+        client = self._clients.get(provider)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(provider)
+                if client is None:
+                    client = self._build(provider)
+                    self._clients[provider] = client
+        return client
+
+    def get_async(self, provider: LLMProvider) -> Any:
+        client = self._async_clients.get(provider)
+        if client is None:
+            with self._lock:
+                client = self._async_clients.get(provider)
+                if client is None:
+                    client = self._build_async(provider)
+                    self._async_clients[provider] = client
+        return client
+
+    def _client_options(self, provider: LLMProvider) -> dict[str, Any]:
+        options: dict[str, Any] = {
+            "api_key": self.api_keys.get(provider),
+            "max_retries": 0,
+        }
+        if self.base_urls.get(provider):
+            options["base_url"] = self.base_urls[provider]
+        return options
+
+    def _build(self, provider: LLMProvider) -> Any:
+        http_client = httpx.Client(limits=self.limits, timeout=self.timeout)
+        options = self._client_options(provider)
+        client: Any
+        if provider is LLMProvider.GROQ:
+            client = Groq(http_client=http_client, **options)
+        else:
+            client = OpenAI(http_client=http_client, **options)
+        return instructor.patch(client)
+
+    def _build_async(self, provider: LLMProvider) -> Any:
+        http_client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+        options = self._client_options(provider)
+        client: Any
+        if provider is LLMProvider.GROQ:
+            client = AsyncGroq(http_client=http_client, **options)
+        else:
+            client = AsyncOpenAI(http_client=http_client, **options)
+        return instructor.patch(client)
+
+    def close(self) -> None:
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+    async def aclose(self) -> None:
+        self.close()
+        with self._lock:
+            async_clients = list(self._async_clients.values())
+            self._async_clients.clear()
+        for client in async_clients:
+            await client.close()
+
+
+_registry: LLMClientRegistry | None = None
+
+
+def get_client_registry() -> LLMClientRegistry:
+    global _registry
+    if _registry is None:
+        _registry = LLMClientRegistry.from_settings()
+    return _registry
+
+
+def replace_client_registry(
+    registry: LLMClientRegistry,
+) -> LLMClientRegistry | None:
+    """
+    Serve new calls from `registry`. Returns the previous registry, which calls
+    already in flight keep using; the caller closes it once they are done.
+    """
+    global _registry
+    previous, _registry = _registry, registry
+    return previous
+
+
+async def close_client_registry() -> None:
+    global _registry
+    if _registry is not None:
+        await _registry.aclose()
+        _registry = None
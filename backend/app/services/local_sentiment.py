@@ -0,0 +1,141 @@
+import math
+import re
+from dataclasses import dataclass, field
+
+from app.models.nlp_tags import SentimentTag
+
+# Weights for golf chatter; multi-word phrases are matched before single words
+LEXICON: dict[str, float] = {
+    # positive
+    "great": 1.5,
+    "good": 1.0,
+    "nice": 1.0,
+    "love": 1.5,
+    "awesome": 2.0,
+    "amazing": 2.0,
+    "perfect": 2.0,
+    "happy": 1.5,
+    "solid": 1.0,
+    "pure": 1.5,
+    "pured": 2.0,
+    "flushed": 2.0,
+    "striped": 1.5,
+    "dialed": 1.5,
+    "birdie": 2.0,
+    "birdied": 2.0,
+    "eagle": 2.5,
+    "eagled": 2.5,
+    "ace": 3.0,
+    "hole in one": 3.0,
+    "great drive": 2.5,
+    "stuck it close": 2.5,
+    "up and down": 1.5,
+    "personal best": 2.5,
+    "career round": 2.5,
+    "made the putt": 1.5,
+    # negative
+    "bad": -1.5,
+    "terrible": -2.0,
+    "awful": -2.0,
+    "hate": -2.0,
+    "frustrated": -2.0,
+    "frustrating": -2.0,
+    "annoyed": -1.5,
+    "ugly": -1.5,
+    "worst": -2.5,
+    "bogey": -1.0,
+    "bogeyed": -1.0,
+    "double bogey": -2.0,
+    "triple bogey": -2.5,
+    "shank": -2.0,
+    "shanked": -2.0,
+    "chunked": -1.5,
+    "duffed": -1.5,
+    "topped": -1.5,
+    "sliced": -1.0,
+    "hooked": -1.0,
+    "skulled": -1.5,
+    "yips": -2.0,
+    "three putt": -2.0,
+    "three putted": -2.0,
+    "four putt": -2.5,
+    "four putted": -2.5,
+    "out of bounds": -2.0,
+    "in the water": -1.5,
+    "lost ball": -1.5,
+    "missed the putt": -1.5,
+}
+NEGATIONS = frozenset({"not", "no", "never", "didnt", "dont", "wasnt", "isnt", "cant"})
+# A negation flips the next lexicon hit within this many words
+NEGATION_WINDOW = 3
+MAX_PHRASE_WORDS = max(len(phrase.split()) for phrase in LEXICON)
+# Inputs longer than this are rarely "obvious", so confidence is scaled down
+SHORT_INPUT_WORDS = 12
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+
+@dataclass
+class LexiconScore:
+    sentiment: SentimentTag
+    confidence: float
+    matched: list[str] = field(default_factory=list)
+
+    @property
+    def explanation(self) -> str:
+        if not self.matched:
+            return "No sentiment-bearing golf terms found."
+        return f"Local lexicon matched: {', '.join(self.matched[:5])}."
+
+
+def tokenize(text: str) -> list[str]:
+    # "three-putted" and "didn't" become "three putted" and "didnt"
+    return _TOKEN_RE.findall(text.lower().replace("'", "").replace("-", " "))
+
+
+def score_sentiment(text: str) -> LexiconScore:
+    """Score `text` against the golf lexicon in a single pass over its tokens."""
+    tokens = tokenize(text)
+    positive = negative = 0.0
+    matched: list[str] = []
+    negate = 0
+    i = 0
+    while i < len(tokens):
+        for size in range(min(MAX_PHRASE_WORDS, len(tokens) - i), 0, -1):
+            phrase = " ".join(tokens[i : i + size])
+            weight = LEXICON.get(phrase)
+            if weight is not None:
+                break
+        else:
+            size, weight = 1, None
+
+        if weight is None:
+            negate = NEGATION_WINDOW if tokens[i] in NEGATIONS else max(0, negate - 1)
+        else:
+            if negate:
+                weight = -weight
+                negate = 0
+            matched.append(phrase)
+            if weight > 0:
+                positive += weight
+            else:
+                negative -= weight
+        i += size
+
+    total = positive + negative
+    if not total:
+        return LexiconScore(sentiment=SentimentTag.NEUTRAL, confidence=0.0)
+
+    net = positive - negative
+    # Mixed signals ("great drive, then three-putted") pull agreement towards 0
+    agreement = abs(net) / total
+    strength = 1 - math.exp(-abs(net))
+    length_factor = min(1.0, SHORT_INPUT_WORDS / len(tokens))
+    confidence = round(agreement * strength * length_factor, 3)
+    if net > 0:
+        sentiment = SentimentTag.POSITIVE
+    elif net < 0:
+        sentiment = SentimentTag.NEGATIVE
+    else:
+        sentiment = SentimentTag.NEUTRAL
+    return LexiconScore(sentiment=sentiment, confidence=confidence, matched=matched)
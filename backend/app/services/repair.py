@@ -0,0 +1,216 @@
+import functools
+import json
+import re
+import threading
+import types
+from collections import Counter
+from enum import Enum
+from typing import Any, TypeVar, Union, get_args, get_origin
+
+import annotated_types
+from pydantic import BaseModel, ValidationError
+
+M = TypeVar("M", bound=BaseModel)
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+_LETTERS_RE = re.compile(r"[^a-z]")
+
+# (model, kind) -> count; "unrepairable" outputs are the ones left for a re-ask
+_repair_counts: Counter[tuple[str, str]] = Counter()
+_lock = threading.Lock()
+
+
+def extract_json(text: str) -> Any:
+    """
+    Parse the first JSON object or array in `text`, ignoring code fences and
+    any prose before or after it.
+    """
+    fenced = _FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r"[{\[]", text):
+        try:
+            value, _ = decoder.raw_decode(text, match.start())
+        except json.JSONDecodeError:
+            continue
+        return value
+    raise ValueError("No JSON value found")
+
+
+def _bounds(metadata: list[Any]) -> tuple[float | None, float | None, int | None]:
+    low = high = max_length = None
+    for item in metadata:
+        if isinstance(item, annotated_types.Ge | annotated_types.Gt):
+            low = item.ge if isinstance(item, annotated_types.Ge) else item.gt
+        elif isinstance(item, annotated_types.Le | annotated_types.Lt):
+            high = item.le if isinstance(item, annotated_types.Le) else item.lt
+        elif isinstance(item, annotated_types.MaxLen):
+            max_length = item.max_length
+    return low, high, max_length
+
+
+def _is_percentage(number: float, high: float | None) -> bool:
+    # A 0-1 confidence given as a percentage. Values just above 1 (1.2) are an
+    # overshoot to clamp, not 1.2%.
+    return high == 1 and 2 <= number <= 100
+
+
+def _repair_number(
+    value: Any, annotation: type, metadata: list[Any], kinds: list[str]
+) -> Any:
+    low, high, _ = _bounds(metadata)
+    number = value
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            number = float(text.rstrip("%"))
+        except ValueError:
+            return value
+        if text.endswith("%") or _is_percentage(number, high):
+            number /= 100
+        kinds.append("coerced")
+    elif isinstance(value, int | float) and _is_percentage(value, high):
+        number = value / 100
+        kinds.append("rescaled")
+    if not isinstance(number, int | float):
+        return value
+    if low is not None and number < low:
+        number = low
+        kinds.append("clamped")
+    elif high is not None and number > high:
+        number = high
+        kinds.append("clamped")
+    return int(number) if annotation is int else number
+
+
+def _repair_enum(value: Any, annotation: type[Enum], kinds: list[str]) -> Any:
+    if not isinstance(value, str) or value in {m.value for m in annotation}:
+        return value
+    wanted = _LETTERS_RE.sub("", value.lower())
+    for member in annotation:
+        if wanted in (str(member.value).lower(), member.name.lower()):
+            kinds.append("enum_normalized")
+            return member.value
+    # "Positively" / "negative." style near-misses
+    prefixed = [m for m in annotation if wanted.startswith(str(m.value).lower())]
+    if len(prefixed) == 1:
+        kinds.append("enum_normalized")
+        return prefixed[0].value
+    return value
+
+
+def _repair_value(
+    value: Any, annotation: Any, metadata: list[Any], kinds: list[str]
+) -> Any:
+    origin = get_origin(annotation)
+    if origin in (Union, types.UnionType):
+        options = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if value is None or not options:
+            return value
+        return _repair_value(value, options[0], metadata, kinds)
+    if origin is list and isinstance(value, list):
+        (item,) = get_args(annotation) or (Any,)
+        return [_repair_value(v, item, [], kinds) for v in value]
+    if not isinstance(annotation, type):
+        return value
+    if issubclass(annotation, BaseModel):
+        return repair_data(annotation, value, kinds)
+    if issubclass(annotation, Enum):
+        return _repair_enum(value, annotation, kinds)
+    if annotation in (int, float):
+        return _repair_number(value, annotation, metadata, kinds)
+    if annotation is str and isinstance(value, str):
+        _, _, max_length = _bounds(metadata)
+        if max_length is not None and len(value) > max_length:
+            kinds.append("truncated")
+            return value[:max_length]
+    return value
+
+
+def repair_data(model: type[BaseModel], data: Any, kinds: list[str]) -> Any:
+    """
+    Bring parsed output in line with `model`'s field types and bounds, appending
+    the kind of each fix made to `kinds`.
+    """
+    if not isinstance(data, dict):
+        return data
+    fields = model.model_fields
+    # {"SentimentAnalysis": {...}}: the model wrapped its answer in the schema name
+    if len(data) == 1 and next(iter(data)) not in fields:
+        (inner,) = data.values()
+        if isinstance(inner, dict):
+            kinds.append("unwrapped")
+            data = inner
+    repaired = dict(data)
+    for name, field in fields.items():
+        key = field.alias or name
+        if key in repaired:
+            repaired[key] = _repair_value(
+                repaired[key], field.annotation, field.metadata, kinds
+            )
+    return repaired
+
+
+def _count(model: type[BaseModel], kinds: list[str]) -> None:
+    with _lock:
+        for kind in kinds:
+            _repair_counts[(model.__name__, kind)] += 1
+
+
+def _tolerant_validate_json(
+    cls: type[M],
+    json_data: str | bytes | bytearray,
+    *,
+    strict: bool | None = None,
+    context: Any | None = None,
+    **_kwargs: Any,
+) -> M:
+    validator = cls.__pydantic_validator__
+    try:
+        return validator.validate_json(json_data, strict=strict, context=context)
+    except ValidationError as error:
+        kinds: list[str] = []
+        text = json_data if isinstance(json_data, str) else json_data.decode()
+        try:
+            data = json.loads(text)
+        except ValueError:
+            try:
+                data = extract_json(text)
+            except ValueError:
+                _count(cls, ["unrepairable"])
+                raise error from None
+            kinds.append("json_extracted")
+        data = repair_data(cls, data, kinds)
+        try:
+            result = validator.validate_python(data, strict=strict, context=context)
+        except ValidationError:
+            _count(cls, ["unrepairable"])
+            raise error from None
+        _count(cls, ["repaired", *kinds])
+        return result
+
+
+@functools.cache
+def repairing(model: type[M]) -> type[M]:
+    """
+    A subclass of `model` whose JSON validation falls back to local repair, so
+    instructor only re-asks the LLM when the output cannot be fixed here.
+    """
+    return type(
+        model.__name__,
+        (model,),
+        {
+            "__module__": model.__module__,
+            "__doc__": model.__doc__,
+            "model_validate_json": classmethod(_tolerant_validate_json),
+        },
+    )
+
+
+def repair_snapshot() -> dict[str, dict[str, int]]:
+    snapshot: dict[str, dict[str, int]] = {}
+    with _lock:
+        for (model, kind), count in _repair_counts.items():
+            snapshot.setdefault(model, {})[kind] = count
+    return snapshot
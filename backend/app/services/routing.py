@@ -0,0 +1,116 @@
+import asyncio
+import math
+import threading
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any
+
+from app.config import get_settings
+from app.services.llm_clients import LLMProvider
+
+settings = get_settings()
+
+RouteKey = tuple[LLMProvider, str]
+
+
+class LatencyTracker:
+    """
+    Rolling window of provider call latencies per provider and model, timed
+    per attempt so local queueing, throttling and backoff are left out.
+    """
+
+    def __init__(self, window: int = 200) -> None:
+        self.window = window
+        self._samples: dict[RouteKey, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: RouteKey, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def record_censored(self, key: RouteKey, seconds: float) -> None:
+        """
+        Record a call abandoned after `seconds`, such as a lost hedge, whose
+        latency is at least that. At or above the median the lower bound ranks
+        the call correctly, so it is kept; a shorter one says nothing about the
+        median and is dropped.
+        """
+        median = self.percentile(key, 0.5)
+        if median is None or seconds >= median:
+            self.record(key, seconds)
+
+    def count(self, key: RouteKey) -> int:
+        return len(self._samples.get(key, ()))
+
+    def percentile(self, key: RouteKey, quantile: float) -> float | None:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return None
+        rank = max(0, math.ceil(quantile * len(samples)) - 1)
+        return samples[rank]
+
+    def snapshot(self) -> dict[str, dict[str, float | int | None]]:
+        return {
+            f"{provider.value}:{model}": {
+                "count": self.count((provider, model)),
+                "p50": self.percentile((provider, model), 0.5),
+                "p95": self.percentile((provider, model), 0.95),
+                "p99": self.percentile((provider, model), 0.99),
+            }
+            for provider, model in list(self._samples)
+        }
+
+
+latency_tracker = LatencyTracker(window=settings.LLM_LATENCY_WINDOW)
+
+
+def order_by_latency(keys: Sequence[RouteKey], min_samples: int) -> list[RouteKey]:
+    """
+    Fastest-first by median latency. Routes without enough samples keep their
+    given position ahead of measured ones so they get explored.
+    """
+    measured = [key for key in keys if latency_tracker.count(key) >= min_samples]
+    unmeasured = [key for key in keys if key not in measured]
+    measured.sort(key=lambda key: latency_tracker.percentile(key, 0.5) or 0.0)
+    return unmeasured + measured
+
+
+async def hedged_call(
+    primary: Callable[[], Awaitable[Any]],
+    hedge: Callable[[], Awaitable[Any]] | None,
+    hedge_after: float | None,
+) -> Any:
+    """
+    Run `primary`; if it has not finished after `hedge_after` seconds (or fails),
+    also run `hedge`. The first successful result wins and the other call is
+    cancelled. Without a delay or a hedge, this is just `await primary()`.
+    """
+    if hedge is None:
+        return await primary()
+
+    primary_task = asyncio.ensure_future(primary())
+    tasks = {primary_task}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if primary_task in done and primary_task.exception() is None:
+            return primary_task.result()
+        tasks.add(asyncio.ensure_future(hedge()))
+        if primary_task in done:
+            tasks.discard(primary_task)
+
+        error: BaseException | None = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        assert error is not None
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -1,55 +1,178 @@
+import asyncio
+from collections.abc import AsyncIterator
 from app.models.nlp_tags import SentimentTag
 from app.models.base import AgentType
 from app.config import get_settings
-from groq import Groq
-from openai import OpenAI
-import instructor
 from pydantic import BaseModel, Field
+from pydantic.json_schema import SkipJsonSchema
 from app.config import get_settings, SentimentAnalysis
+from app.services.completions import CompletionRequest, create_completion, create_completion_sync
+from app.services.llm_clients import LLMProvider
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.local_sentiment import score_sentiment
+from app.services.routing import hedged_call, latency_tracker, order_by_latency
+from app.services.cascade import run_cascade, run_cascade_sync
+from app.services.compaction import compact_input
 
 # load settings
 settings = get_settings()
 
-def initialize_groq():
-    return Groq(api_key=settings.GROQ_API_KEY)
-
-def initialize_openai():
-    return instructor.patch(OpenAI(api_key=settings.OPENAI_API_KEY))
-
 class SentimentAnalysis(BaseModel):
     sentiment: SentimentTag = Field(..., description="The overall sentiment of the text")
     confidence: float = Field(..., ge=0, le=1, description="Confidence score of the sentiment analysis")
     explanation: str = Field(..., max_length=500, description="Brief explanation of the sentiment analysis")
+    # Which tier answered ("local" or "llm"); hidden from the schema sent to the LLM
+    tier: SkipJsonSchema[str | None] = None
+
+class SentimentAnalysisBatch(BaseModel):
+    results: list[SentimentAnalysis] = Field(..., description="One sentiment analysis per numbered text, in the same order")
 
 
 
-def analyze_sentiment(text: str, use_groq: bool = True) -> SentimentAnalysis:
+def build_sentiment_request(text: str, use_groq: bool = True) -> CompletionRequest:
     config = settings.sentiment_analysis
-    prompt = config.prompt_template.format(text=text)
-    
-    messages = [
-        {"role": "system", "content": config.system_message},
-        {"role": "user", "content": prompt}
-    ]
-    
-    common_params = {
-        "messages": messages,
-        "temperature": config.temperature,
-        "max_tokens": config.max_tokens,
-        "response_model": SentimentAnalysis
+    return CompletionRequest(
+        provider=LLMProvider.GROQ if use_groq else LLMProvider.OPENAI,
+        model=config.groq_model if use_groq else config.openai_model,
+        system_message=config.system_message,
+        prompt=config.prompt_template.format(text=compact_input(text, config)),
+        response_model=SentimentAnalysis,
+        temperature=config.temperature,
+        max_tokens=config.max_tokens,
+    )
+
+def build_sentiment_batch_request(texts: list[str], use_groq: bool = True) -> CompletionRequest:
+    config = settings.sentiment_analysis
+    numbered = "\n".join(f"{i}. {compact_input(text, config)}" for i, text in enumerate(texts, start=1))
+    return CompletionRequest(
+        provider=LLMProvider.GROQ if use_groq else LLMProvider.OPENAI,
+        model=config.groq_model if use_groq else config.openai_model,
+        system_message=config.system_message,
+        prompt=config.batch_prompt_template.format(texts=numbered),
+        response_model=SentimentAnalysisBatch,
+        temperature=config.temperature,
+        max_tokens=config.max_tokens * len(texts),
+    )
+
+def analyze_sentiment_locally(text: str) -> SentimentAnalysis | None:
+    """Answer from the in-process lexicon when it is confident enough, else None."""
+    config = settings.sentiment_analysis
+    if not config.local_classifier_enabled:
+        return None
+    score = score_sentiment(text)
+    if score.confidence < config.local_confidence_threshold:
+        return None
+    return SentimentAnalysis(
+        sentiment=score.sentiment,
+        confidence=score.confidence,
+        explanation=score.explanation,
+        tier="local",
+    )
+
+async def _routed_sentiment_completion(text: str, use_groq: bool) -> SentimentAnalysis:
+    """
+    Send the call to the provider with the lower median latency. If it has not
+    answered by its hedge percentile, race the other provider against it.
+    """
+    config = settings.sentiment_analysis
+    requests = {
+        request.route_key: request
+        for request in (build_sentiment_request(text, use_groq), build_sentiment_request(text, not use_groq))
     }
-    
-    if use_groq:
-        client = initialize_groq()
-        response = client.chat.completions.create(
-            model=config.groq_model,
-            **common_params
+    primary, secondary = order_by_latency(list(requests), config.hedge_min_samples)
+    hedge_after = None
+    if latency_tracker.count(primary) >= config.hedge_min_samples:
+        hedge_after = latency_tracker.percentile(primary, config.hedge_percentile)
+    return await hedged_call(
+        lambda: create_completion(requests[primary]),
+        (lambda: create_completion(requests[secondary])) if config.hedge_requests else None,
+        hedge_after,
+    )
+
+async def analyze_sentiment(text: str, use_groq: bool = True) -> SentimentAnalysis:
+    local = analyze_sentiment_locally(text)
+    if local is not None:
+        return local
+    config = settings.sentiment_analysis
+    if config.cascade_enabled:
+        result = await run_cascade(
+            "sentiment_analysis", config.cascade, build_sentiment_request(text, use_groq), lambda r: r.confidence
         )
+    elif config.routing_mode == "latency":
+        result = await _routed_sentiment_completion(text, use_groq)
     else:
-        client = initialize_openai()
-        response = client.chat.completions.create(
-            model=config.openai_model,
-            **common_params
-        )
-    
-    return response
+        try:
+            result = await create_completion(build_sentiment_request(text, use_groq))
+        except CircuitOpenError:
+            # The preferred provider is failing fast; fail over to the other one
+            result = await create_completion(build_sentiment_request(text, not use_groq))
+    return result.model_copy(update={"tier": "llm"})
+
+def analyze_sentiment_sync(text: str, use_groq: bool = True) -> SentimentAnalysis:
+    """Blocking variant of `analyze_sentiment` for scripts and notebooks."""
+    local = analyze_sentiment_locally(text)
+    if local is not None:
+        return local
+    config = settings.sentiment_analysis
+    if config.cascade_enabled:
+        return run_cascade_sync(
+            "sentiment_analysis", config.cascade, build_sentiment_request(text, use_groq), lambda r: r.confidence
+        ).model_copy(update={"tier": "llm"})
+    try:
+        result = create_completion_sync(build_sentiment_request(text, use_groq))
+    except CircuitOpenError:
+        result = create_completion_sync(build_sentiment_request(text, not use_groq))
+    return result.model_copy(update={"tier": "llm"})
+
+async def _analyze_sentiment_chunk(texts: list[str], use_groq: bool) -> list[SentimentAnalysis]:
+    if len(texts) == 1:
+        return [await analyze_sentiment(texts[0], use_groq)]
+    batch = await create_completion(build_sentiment_batch_request(texts, use_groq))
+    if len(batch.results) == len(texts):
+        return [result.model_copy(update={"tier": "llm"}) for result in batch.results]
+    # The model merged or dropped items, so results can't be matched to inputs
+    return list(await asyncio.gather(*(analyze_sentiment(text, use_groq) for text in texts)))
+
+async def analyze_sentiment_batch(
+    texts: list[str], use_groq: bool = True
+) -> AsyncIterator[tuple[int, SentimentAnalysis | Exception]]:
+    """
+    Analyze many texts, packing `batch_size` texts into each provider call.
+
+    Texts the local lexicon answers confidently are yielded first, without a
+    call. At most `batch_concurrency` calls run at once. Yields `(index, result)`
+    pairs as each call finishes, so results arrive out of input order; a failed
+    call yields its exception for every index it covered.
+    """
+    config = settings.sentiment_analysis
+    semaphore = asyncio.Semaphore(config.batch_concurrency)
+    pending = []
+    for index, text in enumerate(texts):
+        local = analyze_sentiment_locally(text)
+        if local is not None:
+            yield index, local
+        else:
+            pending.append(index)
+    chunks = [
+        pending[start:start + config.batch_size]
+        for start in range(0, len(pending), config.batch_size)
+    ]
+
+    async def run_chunk(indexes: list[int]) -> tuple[list[int], list[SentimentAnalysis] | Exception]:
+        async with semaphore:
+            try:
+                return indexes, await _analyze_sentiment_chunk([texts[i] for i in indexes], use_groq)
+            except Exception as e:
+                return indexes, e
+
+    tasks = [asyncio.create_task(run_chunk(indexes)) for indexes in chunks]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            indexes, outcome = await next_done
+            for position, index in enumerate(indexes):
+                yield index, outcome if isinstance(outcome, Exception) else outcome[position]
+    finally:
+        # Consumer gone or stopped early: stop the remaining calls and wait for them
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,122 @@
+import asyncio
+import gc
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.agents.caddie_agent import CaddieAgent, settings
+from app.models.agent_communication import AgentRequest
+from app.models.agent_config import AgentConfig
+from app.models.base import AgentType
+from app.models.nlp_tags import SentimentTag
+from app.models.user_input import UserInput
+from app.services.sentiment_analysis import SentimentAnalysis
+
+
+def make_request() -> tuple[CaddieAgent, AgentRequest]:
+    config = AgentConfig(agent_type=AgentType.CADDIE, user_context="Golf assistant")
+    user_input = UserInput(input_type="text", content="What club for 150 yards?")
+    return CaddieAgent(config), AgentRequest(user_input=user_input, agent_config=config)
+
+
+async def sentiment(_self: CaddieAgent, _text: str) -> SentimentAnalysis:
+    await asyncio.sleep(0.05)
+    return SentimentAnalysis(
+        sentiment=SentimentTag.NEUTRAL, confidence=0.7, explanation="A question"
+    )
+
+
+async def slow_agent_types(_self: CaddieAgent, _user_input: UserInput) -> None:
+    await asyncio.sleep(5)
+
+
+def test_slow_analysis_returns_partial_result() -> None:
+    agent, request = make_request()
+    with (
+        patch.object(CaddieAgent, "run_sentiment_analysis", sentiment),
+        patch.object(CaddieAgent, "run_agent_type_analysis", slow_agent_types),
+        patch.object(settings, "CADDIE_AGENT_TYPE_TIMEOUT", 0.1),
+        patch.object(settings, "CADDIE_REQUEST_DEADLINE", 1.0),
+    ):
+        start = time.perf_counter()
+        [response] = asyncio.run(agent.process_request(request))
+        elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5
+    assert response.metadata is not None
+    assert response.metadata["partial"] is True
+    assert response.metadata["timed_out"] == ["agent_type_analysis"]
+    assert response.metadata["sentiment_analysis"]["sentiment"] == "neutral"
+
+
+def test_analyses_run_concurrently() -> None:
+    agent, request = make_request()
+
+    async def agent_types(_self: CaddieAgent, _user_input: UserInput) -> None:
+        await asyncio.sleep(0.05)
+
+    with (
+        patch.object(CaddieAgent, "run_sentiment_analysis", sentiment),
+        patch.object(CaddieAgent, "run_agent_type_analysis", agent_types),
+        patch.object(CaddieAgent, "_summarize", lambda *_args: "summary"),
+    ):
+        start = time.perf_counter()
+        [response] = asyncio.run(agent.process_request(request))
+        elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.09
+    assert response.metadata is not None
+    assert response.metadata["partial"] is False
+
+
+def test_combined_analysis_replaces_separate_calls() -> None:
+    agent, request = make_request()
+    calls: list[str] = []
+
+    async def combined(_self: CaddieAgent, _user_input: UserInput) -> SimpleNamespace:
+        calls.append("combined")
+        return SimpleNamespace(sentiment=await sentiment(agent, ""), agent_types=None)
+
+    async def separate(*_args: object) -> None:
+        calls.append("separate")
+
+    with (
+        patch.object(CaddieAgent, "run_combined_analysis", combined),
+        patch.object(CaddieAgent, "run_sentiment_analysis", separate),
+        patch.object(CaddieAgent, "run_agent_type_analysis", separate),
+        patch.object(CaddieAgent, "_summarize", lambda *_args: "summary"),
+        patch.object(settings, "USE_COMBINED_ANALYSIS", True),
+    ):
+        [response] = asyncio.run(agent.process_request(request))
+
+    assert calls == ["combined"]
+    assert response.metadata is not None
+    assert response.metadata["sentiment_analysis"]["sentiment"] == "neutral"
+    assert response.metadata["timed_out"] == []
+
+
+def test_failed_analyses_are_all_retrieved() -> None:
+    agent, request = make_request()
+    unhandled: list[dict[str, object]] = []
+
+    async def fail(*_args: object) -> None:
+        raise RuntimeError("provider down")
+
+    async def run() -> None:
+        asyncio.get_running_loop().set_exception_handler(
+            lambda _loop, context: unhandled.append(context)
+        )
+        try:
+            await agent.process_request(request)
+        except RuntimeError:
+            pass
+        # Unretrieved task exceptions are reported when the tasks are collected
+        gc.collect()
+
+    with (
+        patch.object(CaddieAgent, "run_sentiment_analysis", fail),
+        patch.object(CaddieAgent, "run_agent_type_analysis", fail),
+    ):
+        asyncio.run(run())
+
+    assert unhandled == []
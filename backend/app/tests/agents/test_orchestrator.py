@@ -0,0 +1,336 @@
+import asyncio
+import time
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from app.agents.base_agent import BaseAgent
+from app.agents.caddie_agent import CaddieAgent
+from app.agents.orchestrator import AgentOrchestrator
+from app.config import AgentTypeAnalysis
+from app.models.agent_communication import AgentRequest, AgentResponse
+from app.models.agent_config import AgentConfig
+from app.models.base import AgentType
+from app.models.nlp_tags import SentimentTag
+from app.models.user_input import UserInput
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.combined_analysis import CombinedAnalysis
+from app.services.governor import LLMOverloadedError
+from app.services.sentiment_analysis import SentimentAnalysis
+
+
+class SleepyAgent(BaseAgent):
+    def __init__(
+        self, agent_type: AgentType, delay: float, requires: tuple[str, ...] = ()
+    ) -> None:
+        super().__init__(AgentConfig(agent_type=agent_type, user_context="test"))
+        self.delay = delay
+        self.requires = requires
+        self.seen: list[AgentRequest] = []
+
+    async def process_request(self, request: AgentRequest) -> AgentResponse:
+        self.seen.append(request)
+        await asyncio.sleep(self.delay)
+        return AgentResponse(agent_type=self.config.agent_type, result="done")
+
+
+def make_request() -> AgentRequest:
+    return AgentRequest(
+        user_input=UserInput(input_type="text", content="Lining up a long putt"),
+        agent_config=AgentConfig(agent_type=AgentType.CADDIE, user_context="test"),
+    )
+
+
+def test_shared_analysis_runs_once_and_flows_to_agents() -> None:
+    calls = 0
+
+    async def fake_sentiment(_text: str) -> SentimentAnalysis:
+        nonlocal calls
+        calls += 1
+        return SentimentAnalysis(
+            sentiment=SentimentTag.NEUTRAL, confidence=0.6, explanation="calm"
+        )
+
+    caddie = SleepyAgent(AgentType.CADDIE, 0.01, requires=("sentiment_analysis",))
+    coach = SleepyAgent(AgentType.COACH, 0.01, requires=("sentiment_analysis",))
+    orchestrator = AgentOrchestrator({AgentType.CADDIE: caddie, AgentType.COACH: coach})
+
+    with patch("app.agents.orchestrator.analyze_sentiment", fake_sentiment):
+        responses = asyncio.run(orchestrator.run(make_request()))
+
+    assert calls == 1
+    assert [r.agent_type for r in responses] == [AgentType.CADDIE, AgentType.COACH]
+    for agent in (caddie, coach):
+        [seen] = agent.seen
+        assert seen.sentiment_analysis is not None
+        assert seen.agent_config.agent_type == agent.config.agent_type
+
+
+def test_independent_agents_run_in_parallel() -> None:
+    agents: dict[AgentType, BaseAgent] = {
+        agent_type: SleepyAgent(agent_type, 0.1)
+        for agent_type in (AgentType.CADDIE, AgentType.COACH, AgentType.SKILL)
+    }
+    orchestrator = AgentOrchestrator(agents)
+    start = time.perf_counter()
+    responses = asyncio.run(orchestrator.run(make_request()))
+    assert time.perf_counter() - start < 0.25
+    assert len(responses) == 3
+
+
+def test_concurrency_limit_is_enforced() -> None:
+    agents: dict[AgentType, BaseAgent] = {
+        agent_type: SleepyAgent(agent_type, 0.05)
+        for agent_type in (AgentType.CADDIE, AgentType.COACH, AgentType.SKILL)
+    }
+    orchestrator = AgentOrchestrator(agents, max_concurrency=1)
+    start = time.perf_counter()
+    asyncio.run(orchestrator.run(make_request()))
+    assert time.perf_counter() - start >= 0.15
+
+
+def test_concurrency_limit_is_shared_across_orchestrators() -> None:
+    async def scenario() -> None:
+        slots = asyncio.Semaphore(1)
+        first, second = (
+            AgentOrchestrator(
+                {AgentType.CADDIE: SleepyAgent(AgentType.CADDIE, 0.05)},
+                node_slots=slots,
+            )
+            for _ in range(2)
+        )
+        await asyncio.gather(first.run(make_request()), second.run(make_request()))
+
+    start = time.perf_counter()
+    asyncio.run(scenario())
+    assert time.perf_counter() - start >= 0.1
+
+
+def test_orchestrators_from_settings_share_node_slots() -> None:
+    agents: dict[AgentType, BaseAgent] = {
+        AgentType.CADDIE: SleepyAgent(AgentType.CADDIE, 0)
+    }
+    first = AgentOrchestrator.from_settings(agents)
+    second = AgentOrchestrator.from_settings(agents)
+    assert first.node_slots is second.node_slots
+
+
+def test_slow_agent_times_out_without_failing_others() -> None:
+    agents: dict[AgentType, BaseAgent] = {
+        AgentType.CADDIE: SleepyAgent(AgentType.CADDIE, 0.01),
+        AgentType.SKILL: SleepyAgent(AgentType.SKILL, 5),
+    }
+    orchestrator = AgentOrchestrator(agents, agent_timeout=0.1)
+    caddie, skill = asyncio.run(orchestrator.run(make_request()))
+    assert caddie.result == "done"
+    metadata: dict[str, Any] = skill.metadata or {}
+    assert metadata["timed_out"] is True
+
+
+def make_agent_types(**confidences: float) -> AgentTypeAnalysis:
+    return AgentTypeAnalysis(
+        **{
+            agent_type.value.lower(): {
+                "confidence": confidences.get(agent_type.name.lower(), 0.0),
+                "explanation": "test",
+            }
+            for agent_type in AgentType
+        }
+    )
+
+
+def test_dispatch_runs_confident_agents_ordered_by_relevance() -> None:
+    agents = {
+        agent_type: SleepyAgent(agent_type, 0.05)
+        for agent_type in (AgentType.CADDIE, AgentType.COACH, AgentType.SKILL)
+    }
+    orchestrator = AgentOrchestrator(agents)
+    analysis = make_agent_types(caddie=0.6, coach=0.9, skill=0.8)
+
+    async def fake_agent_types(_user_input: UserInput) -> AgentTypeAnalysis:
+        return analysis
+
+    with patch("app.agents.orchestrator.analyze_agent_types", fake_agent_types):
+        start = time.perf_counter()
+        responses = asyncio.run(
+            orchestrator.dispatch(make_request(), threshold=0.7, top_k=2)
+        )
+        elapsed = time.perf_counter() - start
+
+    assert [r.agent_type for r in responses] == [AgentType.COACH, AgentType.SKILL]
+    assert [r.metadata["relevance"] for r in responses] == [0.9, 0.8]
+    assert not agents[AgentType.CADDIE].seen
+    # Selected agents run concurrently
+    assert elapsed < 0.09
+
+
+def test_select_agents_falls_back_to_most_relevant() -> None:
+    orchestrator = AgentOrchestrator(
+        {
+            AgentType.CADDIE: SleepyAgent(AgentType.CADDIE, 0),
+            AgentType.COACH: SleepyAgent(AgentType.COACH, 0),
+        }
+    )
+    analysis = make_agent_types(caddie=0.2, coach=0.3)
+
+    selected = orchestrator.select_agents(analysis, threshold=0.5, top_k=2)
+
+    assert selected == [(AgentType.COACH, 0.3)]
+
+
+def test_stream_yields_in_completion_order_and_cancels_on_close() -> None:
+    cancelled: list[AgentType] = []
+
+    class CancellableAgent(SleepyAgent):
+        async def process_request(self, request: AgentRequest) -> AgentResponse:
+            try:
+                return await super().process_request(request)
+            except asyncio.CancelledError:
+                cancelled.append(self.config.agent_type)
+                raise
+
+    orchestrator = AgentOrchestrator(
+        {
+            AgentType.CADDIE: CancellableAgent(AgentType.CADDIE, 5),
+            AgentType.COACH: CancellableAgent(AgentType.COACH, 0.01),
+        }
+    )
+
+    async def first_then_close() -> AgentResponse:
+        responses = orchestrator.stream(make_request())
+        first = await anext(responses)
+        await responses.aclose()
+        await asyncio.sleep(0)
+        return first
+
+    start = time.perf_counter()
+    first = asyncio.run(first_then_close())
+
+    assert first.agent_type == AgentType.COACH
+    assert cancelled == [AgentType.CADDIE]
+    assert time.perf_counter() - start < 1
+
+
+def test_closing_the_stream_waits_for_cancelled_nodes() -> None:
+    cleaned_up: list[AgentType] = []
+
+    class SlowCleanupAgent(SleepyAgent):
+        async def process_request(self, request: AgentRequest) -> AgentResponse:
+            try:
+                return await super().process_request(request)
+            except asyncio.CancelledError:
+                await asyncio.sleep(0.01)
+                cleaned_up.append(self.config.agent_type)
+                raise
+
+    orchestrator = AgentOrchestrator(
+        {
+            AgentType.CADDIE: SlowCleanupAgent(AgentType.CADDIE, 5),
+            AgentType.COACH: SleepyAgent(AgentType.COACH, 0.01),
+        }
+    )
+
+    async def first_then_close() -> list[AgentType]:
+        responses = orchestrator.stream(make_request())
+        await anext(responses)
+        await responses.aclose()
+        return list(cleaned_up)
+
+    assert asyncio.run(first_then_close()) == [AgentType.CADDIE]
+
+
+def test_combined_analysis_fills_both_fields_from_one_call() -> None:
+    calls = 0
+    sentiment = SentimentAnalysis(
+        sentiment=SentimentTag.POSITIVE, confidence=0.8, explanation="upbeat"
+    )
+
+    async def fake_combined(_user_input: UserInput) -> CombinedAnalysis:
+        nonlocal calls
+        calls += 1
+        return CombinedAnalysis(sentiment=sentiment, agent_types=make_agent_types())
+
+    async def unexpected(*_args: Any) -> None:
+        raise AssertionError("separate analysis should not run")
+
+    requires = ("sentiment_analysis", "agent_type_analysis")
+    caddie = SleepyAgent(AgentType.CADDIE, 0, requires=requires)
+    coach = SleepyAgent(AgentType.COACH, 0, requires=requires)
+    orchestrator = AgentOrchestrator(
+        {AgentType.CADDIE: caddie, AgentType.COACH: coach}, combined_analysis=True
+    )
+
+    with (
+        patch("app.agents.orchestrator.analyze_combined", fake_combined),
+        patch("app.agents.orchestrator.analyze_sentiment", unexpected),
+        patch("app.agents.orchestrator.analyze_agent_types", unexpected),
+    ):
+        asyncio.run(orchestrator.run(make_request()))
+
+    assert calls == 1
+    for agent in (caddie, coach):
+        [seen] = agent.seen
+        assert seen.sentiment_analysis == sentiment
+        assert seen.agent_type_analysis is not None
+
+
+def test_agents_do_not_rerun_failed_shared_analyses() -> None:
+    agent_calls: list[str] = []
+
+    async def failing_analysis(*_args: Any) -> None:
+        raise RuntimeError("provider error")
+
+    async def agent_analysis(_self: CaddieAgent, *_args: Any) -> None:
+        agent_calls.append("analysis")
+
+    config = AgentConfig(agent_type=AgentType.CADDIE, user_context="test")
+    orchestrator = AgentOrchestrator({AgentType.CADDIE: CaddieAgent(config)})
+
+    with (
+        patch("app.agents.orchestrator.analyze_sentiment", failing_analysis),
+        patch("app.agents.orchestrator.analyze_agent_types", failing_analysis),
+        patch.object(CaddieAgent, "run_sentiment_analysis", agent_analysis),
+        patch.object(CaddieAgent, "run_agent_type_analysis", agent_analysis),
+        patch.object(CaddieAgent, "run_combined_analysis", agent_analysis),
+    ):
+        [response] = asyncio.run(orchestrator.run(make_request()))
+
+    assert agent_calls == []
+    assert response.metadata is not None
+    assert response.metadata["partial"] is True
+    assert sorted(response.metadata["timed_out"]) == [
+        "agent_type_analysis",
+        "sentiment_analysis",
+    ]
+
+
+def test_overloaded_agent_fails_the_run() -> None:
+    class OverloadedAgent(SleepyAgent):
+        async def process_request(self, request: AgentRequest) -> AgentResponse:
+            raise CircuitOpenError("Circuit for groq:llama3-70b-8192 is open", 12)
+
+    caddie = OverloadedAgent(AgentType.CADDIE, 0)
+    coach = SleepyAgent(AgentType.COACH, 5)
+    orchestrator = AgentOrchestrator({AgentType.CADDIE: caddie, AgentType.COACH: coach})
+
+    start = time.perf_counter()
+    with pytest.raises(LLMOverloadedError) as raised:
+        asyncio.run(orchestrator.run(make_request()))
+
+    assert raised.value.retry_after == 12
+    assert time.perf_counter() - start < 1
+
+
+def test_overloaded_shared_analysis_degrades() -> None:
+    async def overloaded(*_args: Any) -> None:
+        raise CircuitOpenError("Circuit for groq:llama3-70b-8192 is open", 12)
+
+    caddie = SleepyAgent(AgentType.CADDIE, 0, requires=("sentiment_analysis",))
+    orchestrator = AgentOrchestrator({AgentType.CADDIE: caddie})
+
+    with patch("app.agents.orchestrator.analyze_sentiment", overloaded):
+        responses = asyncio.run(orchestrator.run(make_request()))
+
+    assert [response.result for response in responses] == ["done"]
+    assert caddie.seen[0].sentiment_analysis is None
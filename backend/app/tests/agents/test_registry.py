@@ -0,0 +1,72 @@
+from collections.abc import Iterator
+
+import pytest
+
+from app.agents.caddie_agent import CaddieAgent
+from app.agents.registry import AgentRegistry, AgentSettingsSnapshot
+from app.models.base import AgentType
+from app.services.llm_clients import (
+    LLMProvider,
+    get_client_registry,
+    replace_client_registry,
+)
+
+
+@pytest.fixture(autouse=True)
+def restore_client_registry() -> Iterator[None]:
+    clients = get_client_registry()
+    yield
+    replace_client_registry(clients)
+
+
+def test_registry_shares_instances_until_reload() -> None:
+    registry = AgentRegistry(
+        AgentSettingsSnapshot(openai_api_key="o1", groq_api_key="g1")
+    )
+
+    caddie = registry.get(AgentType.CADDIE)
+    assert isinstance(caddie, CaddieAgent)
+    assert registry.get(AgentType.CADDIE) is caddie
+    assert caddie.config.openai_api_key == "o1"
+    held = registry.agents
+
+    registry.reload(AgentSettingsSnapshot(openai_api_key="o2", groq_api_key="g2"))
+
+    assert registry.version == 2
+    assert registry.get(AgentType.CADDIE) is not caddie
+    assert registry.get(AgentType.CADDIE).config.groq_api_key == "g2"
+    # A request that already took the old agents keeps a consistent set
+    assert held[AgentType.CADDIE] is caddie
+    assert caddie.config.openai_api_key == "o1"
+
+
+def test_api_keys_stay_out_of_serialized_config() -> None:
+    registry = AgentRegistry(
+        AgentSettingsSnapshot(openai_api_key="sk-secret", groq_api_key="gsk-secret")
+    )
+
+    config = registry.get(AgentType.COACH).config
+
+    assert "openai_api_key" not in config.model_dump()
+    assert "secret" not in repr(config)
+
+
+def test_reload_swaps_provider_clients() -> None:
+    registry = AgentRegistry(
+        AgentSettingsSnapshot(openai_api_key="o1", groq_api_key="g1")
+    )
+    before = get_client_registry()
+
+    previous = registry.reload(
+        AgentSettingsSnapshot(
+            openai_api_key="o2",
+            groq_api_key="g2",
+            groq_base_url="http://127.0.0.1:8900",
+        )
+    )
+
+    assert previous is before
+    clients = get_client_registry()
+    assert clients is not before
+    assert clients.api_keys[LLMProvider.OPENAI] == "o2"
+    assert clients.base_urls[LLMProvider.GROQ] == "http://127.0.0.1:8900"
@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.disconnect import (
+    ClientDisconnected,
+    cancel_on_disconnect,
+    cancelled_requests,
+)
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after: int) -> None:
+        self.polls = 0
+        self.disconnect_after = disconnect_after
+
+    async def is_disconnected(self) -> bool:
+        self.polls += 1
+        return self.polls >= self.disconnect_after
+
+
+def test_disconnect_cancels_work() -> None:
+    state = SimpleNamespace(cancelled=False)
+
+    async def slow_analysis() -> str:
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            state.cancelled = True
+            raise
+        return "done"
+
+    before = cancelled_requests["test"]
+    request = FakeRequest(disconnect_after=2)
+
+    with pytest.raises(ClientDisconnected):
+        asyncio.run(
+            cancel_on_disconnect(
+                request, slow_analysis(), name="test", poll_interval=0.01
+            )
+        )
+
+    assert state.cancelled
+    assert cancelled_requests["test"] == before + 1
+
+
+def test_connected_client_gets_result() -> None:
+    async def quick_analysis() -> str:
+        await asyncio.sleep(0.02)
+        return "done"
+
+    request = FakeRequest(disconnect_after=1000)
+
+    result = asyncio.run(
+        cancel_on_disconnect(
+            request, quick_analysis(), name="test", poll_interval=0.005
+        )
+    )
+
+    assert result == "done"
+    assert request.polls >= 1
@@ -0,0 +1,96 @@
+import runpy
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app.core.metrics import (
+    MetricsMiddleware,
+    instrument_engine,
+    metrics_endpoint,
+    observe_llm_call,
+)
+from app.services.cache import AnalysisCache
+
+
+def sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.add_route("/metrics", metrics_endpoint)
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int) -> dict[str, int]:
+        return {"id": item_id}
+
+    return TestClient(app)
+
+
+def test_requests_are_labelled_by_route_template() -> None:
+    client = make_client()
+    labels = {"method": "GET", "route": "/items/{item_id}"}
+    before = sample("http_requests_total", status="200", **labels)
+
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/items/nope")
+    client.get("/missing")
+
+    assert sample("http_requests_total", status="200", **labels) == before + 2
+    assert sample("http_requests_total", status="422", **labels) >= 1
+    assert (
+        sample("http_requests_total", method="GET", route="unmatched", status="404")
+        >= 1
+    )
+    assert sample("http_request_duration_seconds_count", **labels) >= 3
+    assert sample("http_requests_in_flight", method="GET") == 0
+
+
+def test_metrics_endpoint_exposes_llm_and_cache_metrics() -> None:
+    observe_llm_call("groq", "metrics-test", "success", 0.3)
+    observe_llm_call("groq", "metrics-test", "error", 1.0)
+    cache = AnalysisCache()
+    cache.set("key", "value")
+    cache.get("key")
+    cache.get("other")
+
+    body = make_client().get("/metrics").text
+
+    assert (
+        'llm_requests_total{model="metrics-test",outcome="error",provider="groq"} 1.0'
+        in body
+    )
+    assert (
+        'llm_request_duration_seconds_count{model="metrics-test",provider="groq"} 1.0'
+        in body
+    )
+    assert 'llm_cache_lookups_total{result="memory_hit"}' in body
+    assert 'llm_cache_lookups_total{result="miss"}' in body
+
+
+def test_engine_pool_connections_in_use() -> None:
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    before = sample("db_pool_connections_in_use")
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        assert sample("db_pool_connections_in_use") == before + 1
+
+    assert sample("db_pool_connections_in_use") == before
+
+
+def test_gunicorn_child_exit_marks_the_worker_dead() -> None:
+    config = runpy.run_path(str(Path(__file__).parents[3] / "gunicorn_conf.py"))
+
+    with patch("app.core.metrics.mark_process_dead") as mark_process_dead:
+        config["child_exit"](None, SimpleNamespace(pid=4242))
+
+    mark_process_dead.assert_called_once_with(4242)
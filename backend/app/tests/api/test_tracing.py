@@ -0,0 +1,144 @@
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry import trace
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from pydantic import BaseModel
+from sqlalchemy import create_engine, text
+
+from app.core.tracing import (
+    TracingMiddleware,
+    _file_exporter,
+    instrument_engine_tracing,
+    traced_dependency,
+)
+from app.services.completions import CompletionRequest, create_completion
+from app.services.llm_clients import LLMProvider
+
+exporter = InMemorySpanExporter()
+
+
+class Advice(BaseModel):
+    club: str
+
+
+@pytest.fixture(autouse=True)
+def in_memory_spans() -> None:
+    provider = trace.get_tracer_provider()
+    if not isinstance(provider, TracerProvider):
+        provider = TracerProvider()
+        trace.set_tracer_provider(provider)
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+    exporter.clear()
+
+
+def by_name(name: str) -> ReadableSpan:
+    (span,) = [
+        s
+        for s in exporter.get_finished_spans()
+        if s.name == name and s.instrumentation_scope.name == "app"
+    ]
+    return span
+
+
+def make_client() -> TestClient:
+    engine = create_engine("sqlite://")
+    instrument_engine_tracing(engine)
+
+    @traced_dependency
+    def get_count() -> int:
+        with engine.connect() as connection:
+            return connection.execute(text("SELECT 41 + 1")).scalar_one()
+
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int, count: int = Depends(get_count)) -> dict:
+        return {"id": item_id, "count": count}
+
+    return TestClient(app)
+
+
+def test_request_dependency_and_sql_spans_share_a_trace() -> None:
+    response = make_client().get("/items/7")
+
+    assert response.json() == {"id": 7, "count": 42}
+    server = by_name("GET /items/{item_id}")
+    dependency = by_name("dependency get_count")
+    sql = by_name("db SELECT")
+    assert server.attributes["http.route"] == "/items/{item_id}"
+    assert server.attributes["http.response.status_code"] == 200
+    assert dependency.attributes["fastapi.dependency"] == "get_count"
+    assert sql.attributes["db.operation"] == "SELECT"
+    assert sql.attributes["db.system"] == "sqlite"
+    assert sql.parent.span_id == dependency.context.span_id
+    assert {s.context.trace_id for s in (server, dependency, sql)} == {
+        server.context.trace_id
+    }
+
+
+def test_incoming_traceparent_is_continued() -> None:
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    make_client().get(
+        "/items/1", headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"}
+    )
+
+    assert f"{by_name('GET /items/{item_id}').context.trace_id:032x}" == trace_id
+
+
+def test_llm_span_records_model_and_tokens() -> None:
+    usage = SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+
+    async def create(**_kwargs: Any) -> SimpleNamespace:
+        return SimpleNamespace(_raw_response=SimpleNamespace(usage=usage))
+
+    registry = SimpleNamespace(
+        get_async=lambda _provider: SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+        )
+    )
+    request = CompletionRequest(
+        provider=LLMProvider.GROQ,
+        model="tracing-test",
+        system_message="system",
+        prompt="Driver or 3 wood off the tee?",
+        response_model=Advice,
+        temperature=0.2,
+        max_tokens=100,
+    )
+    with (
+        patch("app.services.completions.get_client_registry", return_value=registry),
+        patch("app.services.completions.get_analysis_cache", return_value=None),
+        patch("app.services.completions.CompletionRequest.create_kwargs", dict),
+    ):
+        asyncio.run(create_completion(request))
+
+    span = by_name("llm.chat")
+    assert span.attributes["gen_ai.system"] == "groq"
+    assert span.attributes["gen_ai.request.model"] == "tracing-test"
+    assert span.attributes["gen_ai.usage.input_tokens"] == 120
+    assert span.attributes["gen_ai.usage.output_tokens"] == 30
+
+
+def test_file_exporter_writes_json_lines(tmp_path: Path) -> None:
+    path = tmp_path / "traces.jsonl"
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(_file_exporter(str(path))))
+    with provider.get_tracer("test").start_as_current_span("one"):
+        pass
+    provider.shutdown()
+
+    (line,) = path.read_text().splitlines()
+    assert json.loads(line)["name"] == "one"
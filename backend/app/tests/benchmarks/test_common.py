@@ -0,0 +1,51 @@
+import json
+from pathlib import Path
+
+from app.benchmarks.common import (
+    compare,
+    load_baseline,
+    measure,
+    percentile,
+    save_baseline,
+    summarize_calls,
+)
+
+
+def test_percentile_nearest_rank() -> None:
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 0.5) == 50
+    assert percentile(samples, 0.99) == 99
+    assert percentile([3.0], 0.95) == 3.0
+    assert percentile([], 0.5) is None
+
+
+def test_measure_warms_up_and_repeats() -> None:
+    calls = 0
+
+    def fn() -> None:
+        nonlocal calls
+        calls += 1
+
+    samples = measure(fn, warmup=2, repeat=5, min_time=0.001)
+
+    assert len(samples) == 5
+    assert all(s > 0 for s in samples)
+    # Calibration and warmup rounds run on top of the timed ones
+    assert calls > 7
+    stats = summarize_calls(samples)
+    assert stats["rounds"] == 5
+    assert stats["min_us"] <= stats["median_us"]
+
+
+def test_baseline_round_trip_and_compare(tmp_path: Path) -> None:
+    path = save_baseline(
+        str(tmp_path / "load.json"), {"results": {"a": {"p95_ms": 10}}}
+    )
+    assert json.loads(path.read_text())["results"]["a"]["p95_ms"] == 10
+
+    baseline = load_baseline(str(path))["results"]
+    current = {"a": {"p95_ms": 13}, "b": {"p95_ms": 1}}
+    assert compare(current, baseline, "p95_ms", 0.2) == [
+        "a: p95_ms 10 -> 13 (+30.0%)  REGRESSION"
+    ]
+    assert not compare(current, baseline, "p95_ms", 0.5)[0].endswith("REGRESSION")
@@ -0,0 +1,95 @@
+import asyncio
+from typing import Any
+from unittest.mock import patch
+
+from app.benchmarks.evaluate import (
+    DEFAULT_CORPUS,
+    Example,
+    cost_usd,
+    evaluate,
+    load_corpus,
+    settings,
+)
+from app.config import AgentTypeAnalysis
+from app.models.base import AgentType
+from app.services.compaction import token_stats
+from app.services.completions import CompletionRequest
+from app.services.sentiment_analysis import SentimentAnalysis
+
+EXAMPLES = [
+    Example("Birdied the last!", sentiment="positive", agent="CaddieAgent"),
+    Example("Shanked it again.", sentiment="negative", agent="SkillAgent"),
+    Example("Unlabelled"),
+]
+
+
+def agent_types(top: AgentType) -> AgentTypeAnalysis:
+    return AgentTypeAnalysis(
+        **{
+            agent_type.value.lower(): {
+                "confidence": 0.9 if agent_type is top else 0.1,
+                "explanation": "",
+            }
+            for agent_type in AgentType
+        }
+    )
+
+
+async def fake_completion(request: CompletionRequest) -> Any:
+    token_stats.record_usage(f"{request.provider.value}:{request.model}", 0, 1000, 100)
+    if request.response_model is SentimentAnalysis:
+        return SentimentAnalysis(sentiment="positive", confidence=0.9, explanation="")
+    return agent_types(AgentType.CADDIE)
+
+
+def test_corpus_is_labelled() -> None:
+    examples = load_corpus(DEFAULT_CORPUS)
+    assert len(examples) >= 20
+    assert all(e.sentiment and e.agent for e in examples)
+    assert len(load_corpus(DEFAULT_CORPUS, limit=3)) == 3
+
+
+def test_evaluate_model_config() -> None:
+    original = settings.sentiment_analysis
+    with patch("app.services.cascade.create_completion", fake_completion):
+        results = asyncio.run(
+            evaluate(
+                EXAMPLES,
+                ["groq:small"],
+                ["sentiment", "agent_types"],
+                concurrency=2,
+                prices={"small": (1.0, 2.0)},
+            )
+        )
+
+    sentiment = results["groq:small/sentiment"]
+    assert sentiment["count"] == 3
+    assert sentiment["errors"] == 0
+    assert sentiment["labelled"] == 2
+    assert sentiment["accuracy"] == 0.5
+    assert sentiment["prompt_tokens"] == 3000
+    assert sentiment["completion_tokens"] == 300
+    assert sentiment["cost_usd"] == 0.0036
+    assert results["groq:small/agent_types"]["accuracy"] == 0.5
+    # The one-tier cascade only applies for the run
+    assert settings.sentiment_analysis is original
+
+
+def test_errors_are_counted() -> None:
+    async def failing(_request: CompletionRequest) -> Any:
+        raise RuntimeError("provider down")
+
+    with patch("app.services.cascade.create_completion", failing):
+        results = asyncio.run(
+            evaluate(
+                EXAMPLES, ["openai:large"], ["agent_types"], concurrency=4, prices={}
+            )
+        )
+
+    assert results["openai:large/agent_types"]["errors"] == 3
+    assert results["openai:large/agent_types"]["accuracy"] is None
+
+
+def test_cost_unknown_without_price() -> None:
+    assert cost_usd({"groq:small": (10, 10)}, {}) is None
+    assert cost_usd({}, {}) == 0.0
@@ -0,0 +1,52 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.benchmarks.load import parse_mix, run_load
+
+
+def fake_backend() -> tuple[httpx.MockTransport, list[str]]:
+    seen: list[str] = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        seen.append(f"{request.method} {request.url.path}")
+        path = request.url.path
+        if path.endswith("/login/access-token"):
+            return httpx.Response(200, json={"access_token": "token"})
+        assert request.headers["Authorization"] == "Bearer token"
+        if path.endswith("/analyze"):
+            return httpx.Response(500)
+        if request.method == "POST" and path.endswith("/items/"):
+            return httpx.Response(200, json={"id": "abc"})
+        return httpx.Response(200, json={})
+
+    return httpx.MockTransport(handle), seen
+
+
+def test_parse_mix() -> None:
+    assert parse_mix("items=3, analyze") == {"items": 3, "analyze": 1}
+    with pytest.raises(ValueError):
+        parse_mix("checkout=1")
+
+
+def test_run_load_reports_per_route() -> None:
+    transport, seen = fake_backend()
+    results = asyncio.run(
+        run_load(
+            "http://test",
+            username="admin@example.com",
+            password="secret",
+            concurrency=2,
+            duration=0.3,
+            mix={"items": 1, "analyze": 1},
+            transport=transport,
+        )
+    )
+
+    assert "DELETE /api/v1/items/abc" in seen
+    assert results["POST /login/access-token"]["count"] == 2
+    assert results["GET /items/{id}"]["count"] > 0
+    assert results["GET /items/{id}"]["errors"] == 0
+    assert results["POST /analyze"]["errors"] == results["POST /analyze"]["count"]
+    assert results["POST /items/"]["p95_ms"] is not None
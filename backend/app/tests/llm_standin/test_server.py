@@ -0,0 +1,143 @@
+import asyncio
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import instructor
+from groq import AsyncGroq
+from openai import AsyncOpenAI
+
+from app.config import AgentTypeAnalysis
+from app.llm_standin import LatencyModel, StandinConfig, create_app
+from app.llm_standin.server import cassette_key
+from app.services.llm_clients import LLMClientRegistry, LLMProvider
+from app.services.sentiment_analysis import SentimentAnalysis, analyze_sentiment_batch
+
+MESSAGES = [{"role": "user", "content": "Three-putted the 18th again."}]
+
+
+def openai_client(config: StandinConfig) -> AsyncOpenAI:
+    transport = httpx.ASGITransport(app=create_app(config))
+    return instructor.patch(
+        AsyncOpenAI(
+            api_key="test",
+            base_url="http://standin/v1",
+            http_client=httpx.AsyncClient(transport=transport),
+            max_retries=0,
+        )
+    )
+
+
+def test_synthesized_payloads_validate(tmp_path: Path) -> None:
+    client = openai_client(StandinConfig(cassette_dir=tmp_path))
+
+    async def run() -> tuple[SentimentAnalysis, AgentTypeAnalysis, SentimentAnalysis]:
+        sentiment = await client.chat.completions.create(
+            model="gpt-4", messages=MESSAGES, response_model=SentimentAnalysis
+        )
+        agent_types = await client.chat.completions.create(
+            model="gpt-4o", messages=MESSAGES, response_model=AgentTypeAnalysis
+        )
+        again = await client.chat.completions.create(
+            model="gpt-4", messages=MESSAGES, response_model=SentimentAnalysis
+        )
+        return sentiment, agent_types, again
+
+    sentiment, agent_types, again = asyncio.run(run())
+
+    assert 0 <= sentiment.confidence <= 1
+    assert 0 <= agent_types.caddieagent.confidence <= 1
+    # The same request is answered identically
+    assert again.model_dump() == sentiment.model_dump()
+
+
+def test_batch_prompts_get_one_result_per_text(tmp_path: Path) -> None:
+    client = openai_client(StandinConfig(cassette_dir=tmp_path))
+    registry = type("StandinRegistry", (), {"get_async": lambda self, _: client})()
+    texts = ["Pured a 7-iron.", "Chunked the chip.", "Lipped out for par."]
+    fallback = AsyncMock(side_effect=AssertionError("fell back to per-text calls"))
+
+    async def run() -> list[tuple[int, SentimentAnalysis | Exception]]:
+        return [item async for item in analyze_sentiment_batch(texts, use_groq=False)]
+
+    with (
+        patch("app.services.completions.get_client_registry", return_value=registry),
+        patch("app.services.completions.get_analysis_cache", return_value=None),
+        patch(
+            "app.services.sentiment_analysis.analyze_sentiment_locally",
+            return_value=None,
+        ),
+        patch("app.services.sentiment_analysis.analyze_sentiment", fallback),
+    ):
+        results = asyncio.run(run())
+
+    assert sorted(index for index, _ in results) == [0, 1, 2]
+    assert all(isinstance(result, SentimentAnalysis) for _, result in results)
+    fallback.assert_not_called()
+
+
+def test_groq_path_and_replay(tmp_path: Path) -> None:
+    transport = httpx.ASGITransport(
+        app=create_app(StandinConfig(mode="replay", cassette_dir=tmp_path))
+    )
+    client = instructor.patch(
+        AsyncGroq(
+            api_key="test",
+            base_url="http://standin",
+            http_client=httpx.AsyncClient(transport=transport),
+            max_retries=0,
+        )
+    )
+    body = {"model": "llama3-70b-8192", "messages": MESSAGES}
+    recorded = {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "llama3-70b-8192",
+        "choices": [
+            {
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": "Unlucky."},
+            }
+        ],
+    }
+    (tmp_path / f"{cassette_key(body)}.json").write_text(
+        json.dumps({"status": 200, "latency_seconds": 0, "response": recorded})
+    )
+
+    response = asyncio.run(client.chat.completions.create(**body, response_model=None))
+
+    assert response.choices[0].message.content == "Unlucky."
+
+
+def test_injected_errors_and_latency(tmp_path: Path) -> None:
+    config = StandinConfig(
+        cassette_dir=tmp_path,
+        latency=LatencyModel.parse("fixed:0.01"),
+        error_rate=1.0,
+        error_statuses=(429,),
+    )
+    transport = httpx.ASGITransport(app=create_app(config))
+
+    async def post() -> httpx.Response:
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.post(
+                "http://standin/v1/chat/completions",
+                json={"model": "gpt-4", "messages": MESSAGES},
+            )
+
+    response = asyncio.run(post())
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+
+
+def test_registry_uses_configured_base_urls() -> None:
+    registry = LLMClientRegistry(
+        api_keys={LLMProvider.OPENAI: "key"},
+        base_urls={LLMProvider.OPENAI: "http://localhost:8900/v1"},
+    )
+    assert str(registry.get(LLMProvider.OPENAI).base_url) == "http://localhost:8900/v1/"
+    registry.close()
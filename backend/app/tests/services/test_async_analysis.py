@@ -0,0 +1,140 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from app.models.nlp_tags import SentimentTag
+from app.services.sentiment_analysis import (
+    SentimentAnalysis,
+    SentimentAnalysisBatch,
+    analyze_sentiment,
+    analyze_sentiment_batch,
+    settings,
+)
+
+PROVIDER_LATENCY = 0.2
+CONCURRENT_REQUESTS = 10
+
+
+class SlowAsyncClient:
+    def __init__(self) -> None:
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs: Any) -> SentimentAnalysis:
+        await asyncio.sleep(PROVIDER_LATENCY)
+        return SentimentAnalysis(
+            sentiment=SentimentTag.POSITIVE, confidence=0.9, explanation="Nice drive"
+        )
+
+
+class FakeRegistry:
+    def __init__(self) -> None:
+        self.client = SlowAsyncClient()
+
+    def get_async(self, _provider: Any) -> SlowAsyncClient:
+        return self.client
+
+
+def test_concurrent_sentiment_requests_overlap() -> None:
+    async def run_load() -> list[SentimentAnalysis]:
+        return await asyncio.gather(
+            *(
+                analyze_sentiment(f"what club for {100 + i} yards")
+                for i in range(CONCURRENT_REQUESTS)
+            )
+        )
+
+    with patch(
+        "app.services.completions.get_client_registry", return_value=FakeRegistry()
+    ):
+        start = time.perf_counter()
+        results = asyncio.run(run_load())
+        elapsed = time.perf_counter() - start
+
+    assert len(results) == CONCURRENT_REQUESTS
+    assert all(r.sentiment == SentimentTag.POSITIVE for r in results)
+    # Run one after another, the batch would take CONCURRENT_REQUESTS * latency.
+    assert elapsed < PROVIDER_LATENCY * CONCURRENT_REQUESTS / 2
+
+
+def test_batch_packs_texts_into_each_call() -> None:
+    prompts: list[str] = []
+
+    async def create(**kwargs: Any) -> SentimentAnalysisBatch:
+        prompt = kwargs["messages"][-1]["content"]
+        prompts.append(prompt)
+        count = sum(line[:1].isdigit() for line in prompt.splitlines())
+        await asyncio.sleep(0.01)
+        return SentimentAnalysisBatch(
+            results=[
+                SentimentAnalysis(
+                    sentiment=SentimentTag.NEUTRAL, confidence=0.5, explanation="ok"
+                )
+            ]
+            * count
+        )
+
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    registry = SimpleNamespace(get_async=lambda _provider: client)
+    texts = [f"round note {i}" for i in range(20)]
+
+    async def collect() -> list[int]:
+        return [index async for index, _ in analyze_sentiment_batch(texts)]
+
+    with (
+        patch("app.services.completions.get_client_registry", return_value=registry),
+        patch("app.services.completions.get_analysis_cache", return_value=None),
+        patch.object(settings.sentiment_analysis, "batch_size", 8),
+    ):
+        indexes = asyncio.run(collect())
+
+    assert sorted(indexes) == list(range(20))
+    assert len(prompts) == 3
+
+
+def test_closing_the_batch_stream_cancels_and_awaits_calls() -> None:
+    cancelled = 0
+
+    async def create(**kwargs: Any) -> SentimentAnalysisBatch:
+        nonlocal cancelled
+        prompt = kwargs["messages"][-1]["content"]
+        count = sum(line[:1].isdigit() for line in prompt.splitlines())
+        try:
+            # The first chunk answers at once, the others hang
+            await asyncio.sleep(0 if "note 0" in prompt else 5)
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+        return SentimentAnalysisBatch(
+            results=[
+                SentimentAnalysis(
+                    sentiment=SentimentTag.NEUTRAL, confidence=0.5, explanation="ok"
+                )
+            ]
+            * count
+        )
+
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    registry = SimpleNamespace(get_async=lambda _provider: client)
+    texts = [f"round note {i}" for i in range(6)]
+
+    async def first_then_close() -> int:
+        results = analyze_sentiment_batch(texts)
+        await anext(results)
+        await results.aclose()
+        # Cancelled calls have already unwound when aclose returns
+        return cancelled
+
+    with (
+        patch("app.services.completions.get_client_registry", return_value=registry),
+        patch("app.services.completions.get_analysis_cache", return_value=None),
+        patch.object(settings.sentiment_analysis, "batch_size", 2),
+    ):
+        cancelled_at_close = asyncio.run(first_then_close())
+
+    assert cancelled_at_close == 2
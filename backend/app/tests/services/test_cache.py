@@ -0,0 +1,122 @@
+import asyncio
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from app.models.nlp_tags import SentimentTag
+from app.services.cache import AnalysisCache
+from app.services.sentiment_analysis import SentimentAnalysis, analyze_sentiment
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_analysis() -> SentimentAnalysis:
+    return SentimentAnalysis(
+        sentiment=SentimentTag.NEGATIVE, confidence=0.8, explanation="Three-putted"
+    )
+
+
+def test_memory_tier_evicts_least_recently_used() -> None:
+    cache = AnalysisCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats.evictions == 1
+    assert cache.stats.memory_hits == 3
+    assert cache.stats.misses == 1
+
+
+def test_entries_expire_after_ttl() -> None:
+    clock = FakeClock()
+    cache = AnalysisCache(ttl_seconds=10, clock=clock)
+    cache.set("short", "x", ttl_seconds=1)
+    cache.set("default", "y")
+    clock.now = 5
+    assert cache.get("short") is None
+    assert cache.get("default") == "y"
+    assert cache.stats.expirations == 1
+
+
+def test_disk_tier_survives_restart(tmp_path: Path) -> None:
+    disk_path = str(tmp_path / "cache.sqlite3")
+    cache = AnalysisCache(disk_path=disk_path)
+    cache.set("key", make_analysis())
+    cache.close()
+
+    restarted = AnalysisCache(disk_path=disk_path)
+    cached = restarted.get("key")
+    assert cached == make_analysis()
+    assert restarted.stats.disk_hits == 1
+    assert restarted.get("key") == make_analysis()
+    assert restarted.stats.memory_hits == 1
+    restarted.close()
+
+
+def test_cache_hit_skips_provider_call() -> None:
+    calls = []
+
+    async def create(**kwargs: Any) -> SentimentAnalysis:
+        calls.append(kwargs)
+        return make_analysis()
+
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    registry = SimpleNamespace(get_async=lambda _provider: client)
+    cache = AnalysisCache()
+
+    with (
+        patch("app.services.completions.get_client_registry", return_value=registry),
+        patch("app.services.completions.get_analysis_cache", return_value=cache),
+    ):
+        first = asyncio.run(analyze_sentiment("What club for 150 yards?"))
+        second = asyncio.run(analyze_sentiment("  what club for   150 yards? "))
+
+    assert len(calls) == 1
+    assert second == first
+    assert cache.stats.hits == 1
+
+
+def test_async_disk_access_stays_off_the_event_loop(tmp_path: Path) -> None:
+    disk_path = str(tmp_path / "cache.sqlite3")
+    disk_threads: list[int] = []
+
+    def on_thread(method: Any) -> Any:
+        def wrapper(*args: Any) -> Any:
+            disk_threads.append(threading.get_ident())
+            return method(*args)
+
+        return wrapper
+
+    async def round_trip() -> Any:
+        cache = AnalysisCache(disk_path=disk_path)
+        await cache.aset("key", make_analysis())
+        cache.close()
+        restarted = AnalysisCache(disk_path=disk_path)
+        try:
+            return await restarted.aget("key"), restarted.stats.disk_hits
+        finally:
+            restarted.close()
+
+    with (
+        patch.object(AnalysisCache, "_disk_set", on_thread(AnalysisCache._disk_set)),
+        patch.object(AnalysisCache, "_disk_get", on_thread(AnalysisCache._disk_get)),
+    ):
+        cached, disk_hits = asyncio.run(round_trip())
+
+    assert cached == make_analysis()
+    assert disk_hits == 1
+    assert len(disk_threads) == 2
+    assert threading.get_ident() not in disk_threads
@@ -0,0 +1,76 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.config import CascadeTier
+from app.services.cascade import cascade_snapshot, run_cascade
+from app.services.completions import CompletionRequest
+from app.services.llm_clients import LLMProvider
+
+TIERS = [
+    CascadeTier(provider="groq", model="small", min_confidence=0.8),
+    CascadeTier(provider="groq", model="medium", min_confidence=0.7),
+    CascadeTier(provider="openai", model="large"),
+]
+
+
+def make_request() -> CompletionRequest:
+    return CompletionRequest(
+        provider=LLMProvider.GROQ,
+        model="configured",
+        system_message="system",
+        prompt="Chip or putt from the fringe?",
+        response_model=SimpleNamespace,
+        temperature=0.2,
+        max_tokens=100,
+    )
+
+
+def run_with(
+    confidences: dict[str, float | Exception], analysis: str
+) -> tuple[SimpleNamespace, list[str]]:
+    models: list[str] = []
+
+    async def fake_completion(request: CompletionRequest) -> SimpleNamespace:
+        models.append(request.model)
+        outcome = confidences[request.model]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SimpleNamespace(confidence=outcome, model=request.model)
+
+    with patch("app.services.cascade.create_completion", fake_completion):
+        result = asyncio.run(
+            run_cascade(analysis, TIERS, make_request(), lambda r: r.confidence)
+        )
+    return result, models
+
+
+def test_confident_small_tier_answers_alone() -> None:
+    result, models = run_with({"small": 0.9}, "small_hits")
+
+    assert result.model == "small"
+    assert models == ["small"]
+    stats = cascade_snapshot()["small_hits"]["groq:small"]
+    assert stats["hit_rate"] == 1.0
+    assert stats["p50"] is not None
+
+
+def test_low_confidence_and_errors_escalate() -> None:
+    result, models = run_with(
+        {"small": 0.5, "medium": RuntimeError("bad json"), "large": 0.1}, "escalates"
+    )
+
+    # The last tier answers whatever its confidence
+    assert result.model == "large"
+    assert models == ["small", "medium", "large"]
+    stats = cascade_snapshot()["escalates"]
+    assert stats["groq:small"]["escalated"] == 1
+    assert stats["groq:medium"]["errors"] == 1
+    assert stats["openai:large"]["answered"] == 1
+
+
+def test_last_tier_error_is_raised() -> None:
+    with pytest.raises(RuntimeError):
+        run_with({"small": 0.1, "medium": 0.1, "large": RuntimeError("down")}, "fails")
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+
+
+class ServerError(Exception):
+    status_code = 503
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def succeed() -> str:
+    return "ok"
+
+
+async def fail() -> str:
+    raise ServerError("provider degraded")
+
+
+def make_breaker(clock: FakeClock) -> CircuitBreaker:
+    return CircuitBreaker(
+        "groq:llama3-70b-8192",
+        window=4,
+        min_calls=4,
+        failure_rate_threshold=0.5,
+        open_seconds=30,
+        half_open_calls=1,
+        clock=clock,
+    )
+
+
+def trip(breaker: CircuitBreaker) -> None:
+    for fn in (succeed, succeed, fail, fail):
+        try:
+            asyncio.run(breaker.call(fn))
+        except ServerError:
+            pass
+
+
+def test_opens_on_error_rate_and_fails_fast() -> None:
+    breaker = make_breaker(FakeClock())
+    trip(breaker)
+    assert breaker.state is CircuitState.OPEN
+
+    attempted = False
+
+    async def should_not_run() -> str:
+        nonlocal attempted
+        attempted = True
+        return "ok"
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(breaker.call(should_not_run))
+    assert not attempted
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_half_open_probe_closes_on_success() -> None:
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    trip(breaker)
+    clock.now = 31
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert asyncio.run(breaker.call(succeed)) == "ok"
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_half_open_probe_failure_reopens() -> None:
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    trip(breaker)
+    clock.now = 31
+    with pytest.raises(ServerError):
+        asyncio.run(breaker.call(fail))
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.times_opened == 2
+
+
+def test_client_errors_do_not_trip_the_breaker() -> None:
+    breaker = make_breaker(FakeClock())
+
+    async def bad_request() -> str:
+        raise ValueError("invalid payload")
+
+    for _ in range(8):
+        with pytest.raises(ValueError):
+            asyncio.run(breaker.call(bad_request))
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_calls_cancelled_after_the_slow_threshold_count_as_slow() -> None:
+    breaker = CircuitBreaker(
+        "groq:llama3-70b-8192",
+        window=4,
+        min_calls=4,
+        slow_call_seconds=0.05,
+        slow_call_rate_threshold=0.5,
+    )
+
+    async def hang() -> str:
+        await asyncio.sleep(1)
+        return "ok"
+
+    async def call_with_deadline() -> None:
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(breaker.call(hang), 0.1)
+
+    for _ in range(4):
+        asyncio.run(call_with_deadline())
+    assert breaker.state is CircuitState.OPEN
+
+
+def test_calls_cancelled_early_are_not_recorded() -> None:
+    breaker = make_breaker(FakeClock())
+
+    async def hang() -> str:
+        await asyncio.sleep(1)
+        return "ok"
+
+    async def call_with_deadline() -> None:
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(breaker.call(hang), 0.01)
+
+    for _ in range(4):
+        asyncio.run(call_with_deadline())
+    assert breaker.snapshot()["recent_calls"] == 0
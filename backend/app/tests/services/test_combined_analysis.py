@@ -0,0 +1,51 @@
+import asyncio
+from unittest.mock import patch
+
+from app.config import AgentTypeAnalysis
+from app.models.base import AgentType
+from app.models.nlp_tags import SentimentTag
+from app.models.user_input import UserInput
+from app.services.combined_analysis import (
+    CombinedAnalysis,
+    analyze_combined,
+    build_combined_request,
+)
+from app.services.sentiment_analysis import SentimentAnalysis
+
+
+def test_one_request_carries_both_schemas() -> None:
+    user_input = UserInput(input_type="text", content="Help me read this putt")
+
+    request = build_combined_request(user_input)
+
+    assert request.response_model is CombinedAnalysis
+    assert "Help me read this putt" in request.prompt
+    schema = CombinedAnalysis.model_json_schema()
+    assert set(schema["properties"]) == {"sentiment", "agent_types"}
+    assert "tier" not in str(schema)
+
+
+def test_single_call_returns_both_analyses() -> None:
+    relevance = {"confidence": 0.5, "explanation": "maybe"}
+    response = CombinedAnalysis(
+        sentiment=SentimentAnalysis(
+            sentiment=SentimentTag.NEUTRAL, confidence=0.6, explanation="calm"
+        ),
+        agent_types=AgentTypeAnalysis(
+            **{agent_type.value.lower(): relevance for agent_type in AgentType}
+        ),
+    )
+
+    async def fake_completion(_request: object) -> CombinedAnalysis:
+        return response
+
+    with patch(
+        "app.services.combined_analysis.create_completion", side_effect=fake_completion
+    ) as create:
+        result = asyncio.run(
+            analyze_combined(UserInput(input_type="text", content="Long par 5"))
+        )
+
+    create.assert_called_once()
+    assert result.sentiment.tier == "llm"
+    assert result.agent_types == response.agent_types
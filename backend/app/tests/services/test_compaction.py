@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+from app.services.compaction import compact, estimate_tokens, token_stats
+from app.services.completions import CompletionRequest
+from app.services.llm_clients import LLMProvider
+from app.services.sentiment_analysis import SentimentAnalysis
+
+
+def test_estimate_grows_with_text() -> None:
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("What club?") == 3
+    assert estimate_tokens("word " * 100) == 100
+
+
+def test_short_input_is_untouched() -> None:
+    text = "150 yards, into the wind. What club?"
+    result = compact(text, budget=100)
+    assert result.text == text
+    assert not result.compacted
+
+
+def test_long_input_keeps_golf_relevant_sentences_within_budget() -> None:
+    filler = "We talked about the weekend and the new restaurant downtown. " * 20
+    text = (
+        "I have 150 yards to the pin with a slight wind. "
+        + filler
+        + "Sent from my iPhone\n"
+        + "Should I hit a 7 iron or an 8 iron?"
+    )
+    before = token_stats.snapshot()["compacted_inputs"]
+
+    result = compact(text, budget=30)
+
+    assert result.tokens <= 30
+    assert result.text.startswith("I have 150 yards to the pin")
+    assert result.text.endswith("Should I hit a 7 iron or an 8 iron?")
+    assert "restaurant" not in result.text
+    assert "iPhone" not in result.text
+    assert token_stats.snapshot()["compacted_inputs"] == before + 1
+
+
+def test_duplicates_are_dropped_before_selection() -> None:
+    text = "Long par 5 with water left. " * 30
+    result = compact(text, budget=20)
+    assert result.text == "Long par 5 with water left."
+
+
+def test_usage_reports_estimate_against_actual() -> None:
+    request = CompletionRequest(
+        provider=LLMProvider.GROQ,
+        model="calibration",
+        system_message="You are a caddie.",
+        prompt="Read this putt.",
+        response_model=SentimentAnalysis,
+        temperature=0,
+        max_tokens=50,
+    )
+    usage = SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+    result = SimpleNamespace(_raw_response=SimpleNamespace(usage=usage))
+
+    request.record_usage(result)
+
+    stats = token_stats.snapshot()["usage"]["groq:calibration"]
+    assert stats["estimated_prompt"] == request.estimated_prompt_tokens
+    assert stats["actual_prompt"] == 120
+    assert stats["actual_to_estimated"] == 120 / request.estimated_prompt_tokens
+    assert request.estimated_tokens == request.estimated_prompt_tokens + 50
@@ -0,0 +1,113 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import ProviderLimits
+from app.services.governor import (
+    LLMOverloadedError,
+    ProviderGovernor,
+    TokenBucket,
+    retry_after_seconds,
+)
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code: int, headers: dict[str, str] | None = None) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def test_token_bucket_spaces_out_requests() -> None:
+    now = 0.0
+    bucket = TokenBucket(per_minute=60, clock=lambda: now)
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    now = 2.0
+    assert bucket.reserve(1) == 0
+
+
+def test_full_queue_fails_fast() -> None:
+    governor = ProviderGovernor(ProviderLimits(max_concurrency=1, max_queue=1))
+
+    async def slow() -> str:
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def run() -> list[BaseException | str]:
+        return await asyncio.gather(
+            *(governor.run(slow, estimated_tokens=1) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert results.count("ok") == 2
+    assert sum(isinstance(r, LLMOverloadedError) for r in results) == 1
+    assert governor.rejected == 1
+
+
+def test_rate_limited_calls_are_retried_after_retry_after() -> None:
+    governor = ProviderGovernor(ProviderLimits(), max_retries=2)
+    attempts = 0
+
+    async def flaky() -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise ProviderError(429, {"retry-after-ms": "10"})
+        return "ok"
+
+    assert asyncio.run(governor.run(flaky, estimated_tokens=1)) == "ok"
+    assert attempts == 2
+    assert governor.retries == 1
+
+
+def test_backoff_does_not_hold_a_concurrency_slot() -> None:
+    governor = ProviderGovernor(
+        ProviderLimits(max_concurrency=1, max_queue=0), max_retries=1
+    )
+    order: list[str] = []
+    attempts = 0
+
+    async def rate_limited_once() -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise ProviderError(429, {"retry-after": "0.2"})
+        order.append("retried")
+        return "ok"
+
+    async def other() -> str:
+        order.append("other")
+        return "ok"
+
+    async def run() -> list[str]:
+        first = asyncio.create_task(governor.run(rate_limited_once, estimated_tokens=1))
+        await asyncio.sleep(0.05)
+        # The first call is sleeping out its Retry-After with the only slot free
+        return [await governor.run(other, estimated_tokens=1), await first]
+
+    assert asyncio.run(run()) == ["ok", "ok"]
+    assert order == ["other", "retried"]
+    assert governor.rejected == 0
+
+
+def test_client_errors_are_not_retried() -> None:
+    governor = ProviderGovernor(ProviderLimits(), max_retries=3)
+    attempts = 0
+
+    async def bad_request() -> str:
+        nonlocal attempts
+        attempts += 1
+        raise ProviderError(400)
+
+    with pytest.raises(ProviderError):
+        asyncio.run(governor.run(bad_request, estimated_tokens=1))
+    assert attempts == 1
+
+
+def test_retry_after_header_parsing() -> None:
+    assert retry_after_seconds(ProviderError(429, {"retry-after": "3"})) == 3
+    assert retry_after_seconds(ProviderError(429, {"retry-after-ms": "250"})) == 0.25
+    assert retry_after_seconds(ProviderError(500)) is None
@@ -0,0 +1,28 @@
+from app.services.llm_clients import LLMClientRegistry, LLMProvider
+
+
+def make_registry() -> LLMClientRegistry:
+    return LLMClientRegistry(
+        api_keys={LLMProvider.GROQ: "groq-key", LLMProvider.OPENAI: "openai-key"},
+        max_connections=10,
+        max_keepalive_connections=5,
+    )
+
+
+def test_registry_reuses_client_per_provider() -> None:
+    registry = make_registry()
+    groq_client = registry.get(LLMProvider.GROQ)
+    openai_client = registry.get(LLMProvider.OPENAI)
+    assert registry.get(LLMProvider.GROQ) is groq_client
+    assert registry.get(LLMProvider.OPENAI) is openai_client
+    assert groq_client is not openai_client
+    registry.close()
+
+
+def test_registry_close_rebuilds_clients() -> None:
+    registry = make_registry()
+    client = registry.get(LLMProvider.OPENAI)
+    registry.close()
+    assert client._client.is_closed
+    assert registry.get(LLMProvider.OPENAI) is not client
+    registry.close()
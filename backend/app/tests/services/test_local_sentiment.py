@@ -0,0 +1,46 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.models.nlp_tags import SentimentTag
+from app.services.local_sentiment import score_sentiment
+from app.services.sentiment_analysis import analyze_sentiment, settings
+
+
+def test_obvious_inputs_score_with_high_confidence() -> None:
+    positive = score_sentiment("Great drive!")
+    negative = score_sentiment("three-putted again")
+    assert positive.sentiment == SentimentTag.POSITIVE
+    assert negative.sentiment == SentimentTag.NEGATIVE
+    assert positive.confidence > 0.85
+    assert negative.confidence > 0.85
+
+
+def test_mixed_or_unknown_inputs_score_with_low_confidence() -> None:
+    assert score_sentiment("great drive, then I three-putted").confidence < 0.5
+    unknown = score_sentiment("What club should I hit from 150 yards?")
+    assert unknown.sentiment == SentimentTag.NEUTRAL
+    assert unknown.confidence == 0
+
+
+def test_negation_flips_polarity() -> None:
+    assert score_sentiment("not a great round").sentiment == SentimentTag.NEGATIVE
+
+
+def test_confident_local_answer_skips_provider() -> None:
+    with patch("app.services.sentiment_analysis.create_completion") as create:
+        result = asyncio.run(analyze_sentiment("Birdied the last hole!"))
+    create.assert_not_called()
+    assert result.sentiment == SentimentTag.POSITIVE
+    assert result.tier == "local"
+
+
+def test_threshold_controls_fallback_to_provider() -> None:
+    with (
+        patch.object(settings.sentiment_analysis, "local_confidence_threshold", 1.0),
+        patch("app.services.sentiment_analysis.create_completion") as create,
+    ):
+        create.side_effect = RuntimeError("provider called")
+        with pytest.raises(RuntimeError, match="provider called"):
+            asyncio.run(analyze_sentiment("Birdied the last hole!"))
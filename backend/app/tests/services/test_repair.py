@@ -0,0 +1,77 @@
+import pickle
+
+import pytest
+from instructor.function_calls import openai_schema
+from pydantic import ValidationError
+
+from app.models.nlp_tags import SentimentTag
+from app.services.completions import CompletionRequest
+from app.services.llm_clients import LLMProvider
+from app.services.repair import extract_json, repair_snapshot, repairing
+from app.services.sentiment_analysis import SentimentAnalysis
+
+
+def test_extract_json_ignores_fences_and_trailing_text() -> None:
+    text = 'Sure!\n```json\n{"a": 1}\n```\nHope that helps.'
+    assert extract_json(text) == {"a": 1}
+    assert extract_json('{"a": [1, 2]} trailing') == {"a": [1, 2]}
+
+
+def test_malformed_sentiment_is_repaired_locally() -> None:
+    # instructor validates through its own subclass of the response model
+    model = openai_schema(repairing(SentimentAnalysis))
+    raw = (
+        '{"sentiment": "Positive.", "confidence": 85, "explanation": "'
+        + "x" * 600
+        + '"} and that is my answer'
+    )
+    before = repair_snapshot().get("SentimentAnalysis", {})
+
+    result = model.model_validate_json(raw)
+
+    assert result.sentiment == SentimentTag.POSITIVE
+    assert result.confidence == 0.85
+    assert len(result.explanation) == 500
+    counts = repair_snapshot()["SentimentAnalysis"]
+    for kind in ("repaired", "json_extracted", "enum_normalized", "truncated"):
+        assert counts[kind] == before.get(kind, 0) + 1
+
+
+def test_out_of_range_values_are_clamped() -> None:
+    result = repairing(SentimentAnalysis).model_validate_json(
+        '{"sentiment": "negative", "confidence": -0.2, "explanation": "ugh"}'
+    )
+    assert result.confidence == 0
+
+
+@pytest.mark.parametrize("confidence", ["1.2", '"1.5"'])
+def test_overshooting_confidence_is_clamped_not_rescaled(confidence: str) -> None:
+    result = repairing(SentimentAnalysis).model_validate_json(
+        f'{{"sentiment": "positive", "confidence": {confidence}, "explanation": "ok"}}'
+    )
+    assert result.confidence == 1.0
+
+
+def test_unusable_output_is_left_for_a_reask() -> None:
+    with pytest.raises(ValidationError):
+        repairing(SentimentAnalysis).model_validate_json('{"sentiment": "meh"}')
+    assert repair_snapshot()["SentimentAnalysis"]["unrepairable"] >= 1
+
+
+def test_results_are_rebuilt_as_the_declared_model() -> None:
+    request = CompletionRequest(
+        provider=LLMProvider.GROQ,
+        model="m",
+        system_message="s",
+        prompt="p",
+        response_model=SentimentAnalysis,
+        temperature=0,
+        max_tokens=10,
+    )
+    raw = '{"sentiment": "neutral", "confidence": 0.5, "explanation": "ok"}'
+    result = openai_schema(repairing(SentimentAnalysis)).model_validate_json(raw)
+
+    declared = request.as_declared(result)
+
+    assert type(declared) is SentimentAnalysis
+    assert pickle.loads(pickle.dumps(declared)) == declared
@@ -0,0 +1,130 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from app.models.nlp_tags import SentimentTag
+from app.services.completions import CompletionRequest, create_completion
+from app.services.llm_clients import LLMProvider
+from app.services.routing import LatencyTracker, hedged_call
+from app.services.sentiment_analysis import SentimentAnalysis
+
+GROQ = (LLMProvider.GROQ, "llama3-70b-8192")
+
+
+def test_tracker_reports_rolling_percentiles() -> None:
+    tracker = LatencyTracker(window=100)
+    for ms in range(1, 201):
+        tracker.record(GROQ, ms / 1000)
+    assert tracker.count(GROQ) == 100
+    assert tracker.percentile(GROQ, 0.5) == 0.15
+    assert tracker.percentile(GROQ, 0.95) == 0.195
+    assert tracker.percentile((LLMProvider.OPENAI, "gpt-4"), 0.5) is None
+
+
+def test_fast_primary_never_fires_hedge() -> None:
+    hedged = False
+
+    async def primary() -> str:
+        return "groq"
+
+    async def hedge() -> str:
+        nonlocal hedged
+        hedged = True
+        return "openai"
+
+    assert asyncio.run(hedged_call(primary, hedge, hedge_after=0.1)) == "groq"
+    assert not hedged
+
+
+def test_slow_primary_loses_to_hedge_and_is_cancelled() -> None:
+    primary_cancelled = False
+
+    async def primary() -> str:
+        nonlocal primary_cancelled
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            primary_cancelled = True
+            raise
+        return "groq"
+
+    async def hedge() -> str:
+        await asyncio.sleep(0.01)
+        return "openai"
+
+    assert asyncio.run(hedged_call(primary, hedge, hedge_after=0.02)) == "openai"
+    assert primary_cancelled
+
+
+def test_failed_primary_falls_over_to_hedge() -> None:
+    async def primary() -> str:
+        raise RuntimeError("503 from provider")
+
+    async def hedge() -> str:
+        return "openai"
+
+    assert asyncio.run(hedged_call(primary, hedge, hedge_after=None)) == "openai"
+
+
+def test_censored_samples_only_count_at_or_above_the_median() -> None:
+    tracker = LatencyTracker()
+    tracker.record_censored(GROQ, 0.05)
+    for seconds in (0.1, 0.2, 0.3):
+        tracker.record(GROQ, seconds)
+    tracker.record_censored(GROQ, 0.01)
+    tracker.record_censored(GROQ, 2.0)
+    assert tracker.count(GROQ) == 5
+    assert tracker.percentile(GROQ, 0.5) == 0.2
+
+
+def completion_request(text: str) -> CompletionRequest:
+    return CompletionRequest(
+        provider=GROQ[0],
+        model=GROQ[1],
+        system_message="Classify",
+        prompt=text,
+        response_model=SentimentAnalysis,
+        temperature=0,
+        max_tokens=50,
+    )
+
+
+def test_latency_samples_time_only_the_provider_attempt() -> None:
+    tracker = LatencyTracker()
+
+    async def create(**kwargs: Any) -> SentimentAnalysis:
+        await asyncio.sleep(1 if "slow" in kwargs["messages"][-1]["content"] else 0.01)
+        return SentimentAnalysis(
+            sentiment=SentimentTag.NEUTRAL, confidence=0.5, explanation="ok"
+        )
+
+    class QueueingGovernor:
+        async def run(self, fn: Any, *, estimated_tokens: int) -> Any:
+            await asyncio.sleep(0.2)  # queued and throttled locally
+            return await fn()
+
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    registry = SimpleNamespace(get_async=lambda _provider: client)
+
+    async def hedge_loser() -> None:
+        task = asyncio.create_task(create_completion(completion_request("slow")))
+        await asyncio.sleep(0.25)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    with (
+        patch("app.services.completions.get_client_registry", return_value=registry),
+        patch("app.services.completions.get_analysis_cache", return_value=None),
+        patch("app.services.completions.get_governor", return_value=QueueingGovernor()),
+        patch("app.services.completions.latency_tracker", tracker),
+    ):
+        asyncio.run(create_completion(completion_request("fast")))
+        assert tracker.count(GROQ) == 1
+        assert (tracker.percentile(GROQ, 0.5) or 0) < 0.1
+        # The cancelled attempt leaves a censored sample of its time so far
+        asyncio.run(hedge_loser())
+        assert tracker.count(GROQ) == 2
+        assert 0.04 < (tracker.percentile(GROQ, 1.0) or 0) < 0.1
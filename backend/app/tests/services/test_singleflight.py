@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call() -> None:
+    calls = 0
+
+    async def fetch() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "7 iron"
+
+    async def run() -> list[str]:
+        flights = SingleFlight()
+        results = await asyncio.gather(*(flights.do("key", fetch) for _ in range(5)))
+        assert len(flights) == 0
+        return results
+
+    assert asyncio.run(run()) == ["7 iron"] * 5
+    assert calls == 1
+
+
+def test_failure_reaches_every_waiter() -> None:
+    async def fail() -> str:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    async def run() -> list[BaseException | str]:
+        flights = SingleFlight()
+        return await asyncio.gather(
+            *(flights.do("key", fail) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call() -> None:
+    async def fetch() -> str:
+        await asyncio.sleep(0.05)
+        return "wedge"
+
+    async def run() -> str:
+        flights = SingleFlight()
+        first = asyncio.create_task(flights.do("key", fetch))
+        second = asyncio.create_task(flights.do("key", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "wedge"
+
+
+def test_shared_call_is_cancelled_with_its_last_waiter() -> None:
+    started = asyncio.Event()
+    cancelled = False
+
+    async def fetch() -> str:
+        nonlocal cancelled
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        return "driver"
+
+    async def run() -> None:
+        flights = SingleFlight()
+        waiter = asyncio.create_task(flights.do("key", fetch))
+        await started.wait()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+        assert len(flights) == 0
+
+    asyncio.run(run())
+    assert cancelled
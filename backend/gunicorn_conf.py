@@ -0,0 +1,29 @@
+"""
+gunicorn config for the Docker image, picked up from /app/gunicorn_conf.py.
+
+Keeps the base image's settings (workers, bind, timeouts from its environment
+variables) and adds a `child_exit` hook so exited workers drop out of the
+Prometheus multiprocess gauges.
+"""
+
+import runpy
+from pathlib import Path
+from typing import Any
+
+# The base image's own config, which this file takes precedence over
+BASE_CONFIG = Path("/gunicorn_conf.py")
+
+if BASE_CONFIG.exists():
+    globals().update(
+        {
+            name: value
+            for name, value in runpy.run_path(str(BASE_CONFIG)).items()
+            if not name.startswith("__")
+        }
+    )
+
+
+def child_exit(_server: Any, worker: Any) -> None:
+    from app.core.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
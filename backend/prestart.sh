@@ -1,5 +1,11 @@
 #! /usr/bin/env bash
 
+# Start the workers with empty multiprocess metrics
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 # Let the DB start
 python /app/app/backend_pre_start.py
 